@@ -15,6 +15,16 @@ refer to the unique integer ids associated with each model stored in the storage
 If the export argument is provided, during model evaluation, data is exported to an .hdf5 file, organized by model
 labels.
 
+To evaluate a large number of models, the --batch-size argument can be used to evaluate models in batches. The
+features and objectives of each model are then appended to a compact .hdf5 results table (--results-file-path) as each
+batch completes. An interrupted analysis can be continued with the --resume argument, which skips the models already
+stored in the results table.
+
+On clusters with a shared parallel filesystem, the --temp-output-dir argument can be used to export data from each
+worker to a node-local scratch directory (e.g. /tmp or $TMPDIR), rather than to output-dir. The --merge-by-node argument
+merges the temp files of all workers on each node before a single file per node is copied to output-dir and merged into
+the export file.
+
 To run, put the directory containing the nested repository into $PYTHONPATH.
 From the directory that contains the custom scripts required for model evaluation, execute nested.analyze as a module
 as follows:
@@ -30,7 +40,7 @@ python -m nested.analyze --config-file-path=$PATH_TO_CONFIG_YAML --framework=ipy
 __author__ = 'Aaron D. Milstein, Grace Ng, and Prannath Moolchand'
 from nested.optimize_utils import *
 from nested.parallel import *
-from nested.optimize import evaluate_population
+from nested.optimize import evaluate_population, release_static_args
 import click, yaml, h5py
 from mpi4py import MPI
 
@@ -59,9 +69,23 @@ context = Context()
 @click.option("--check-config", is_flag=True)
 @click.option("--interactive", is_flag=True)
 @click.option("--plot", is_flag=True)
+@click.option("--cache-file-path", type=str, default=None)
+@click.option("--cache-size", type=int, default=None)
+@click.option("--shared-features-file-path", type=str, default=None)
+@click.option("--fuse-objectives", is_flag=True)
+@click.option("--batch-size", type=int, default=None)
+@click.option("--results-file-path", type=str, default=None)
+@click.option("--resume", is_flag=True)
+@click.option("--catch-exceptions", is_flag=True)
+@click.option("--temp-output-dir", type=str, default=None)
+@click.option("--merge-by-node", is_flag=True)
+@click.option("--max-tasks-per-worker", type=int, default=None)
+@click.option("--max-worker-rss", type=float, default=None)
 @click.pass_context
 def main(cli, config_file_path, sobol, storage_file_path, param_file_path, model_key, model_id, export,
-         output_dir, export_file_path, label, disp, check_config, interactive, plot):
+         output_dir, export_file_path, label, disp, check_config, interactive, plot, cache_file_path, cache_size,
+         shared_features_file_path, fuse_objectives, batch_size, results_file_path, resume, catch_exceptions,
+         temp_output_dir, merge_by_node, max_tasks_per_worker, max_worker_rss):
     """
     :param cli: :class:'click.Context': used to process/pass through unknown click arguments
     :param config_file_path: str (path)
@@ -78,6 +102,22 @@ def main(cli, config_file_path, sobol, storage_file_path, param_file_path, model
     :param check_config: bool
     :param interactive: bool
     :param plot: bool
+    :param cache_file_path: str (path); features and objectives of evaluated models are cached in this .hdf5 file
+    :param cache_size: int; maximum number of models in the evaluation cache
+    :param shared_features_file_path: str (path); features computed by compute_features_shared functions are stored in
+    this .hdf5 file, and reused by subsequent runs
+    :param fuse_objectives: bool; evaluate all get_objectives functions in a single job, fused with the last job of
+    the final stage where possible
+    :param batch_size: int; evaluate models in batches of this size, appending the results of each batch to the
+    export file and to a compact results table, rather than holding the results of all models in memory
+    :param results_file_path: str (path); .hdf5 file containing the results table when evaluating models in batches
+    :param resume: bool; skip models already stored in the results table by a previous, partially completed analysis
+    :param catch_exceptions: bool; an Exception raised on a worker while evaluating a model marks that model as failed,
+    rather than stopping the analysis (can also be specified per stage)
+    :param temp_output_dir: str (dir path); each worker exports data to a temp file in this (node-local) directory
+    :param merge_by_node: bool; merge the temp files exported by workers on each node before copying them to output_dir
+    :param max_tasks_per_worker: int; a worker is re-initialized in place after executing this many jobs
+    :param max_worker_rss: float; a worker is re-initialized in place once its resident memory exceeds this many MB
     """
     # requires a global variable context: :class:'Context'
     context.update(locals())
@@ -87,6 +127,16 @@ def main(cli, config_file_path, sobol, storage_file_path, param_file_path, model
     context.interface.ensure_controller()
     try:
         init_analyze_controller_context(**kwargs)
+        if cache_file_path is not None:
+            context.evaluation_cache = EvaluationCache(cache_file_path, config_file_path=context.config_file_path,
+                                                       sources=context.sources, max_size=cache_size,
+                                                       kwargs=context.kwargs)
+        if shared_features_file_path is not None:
+            context.shared_features_store = SharedFeaturesStore(shared_features_file_path,
+                                                                config_file_path=context.config_file_path,
+                                                                kwargs=context.kwargs)
+        if temp_output_dir is not None:
+            context.kwargs['temp_output_dir'] = temp_output_dir
         start_time = time.time()
         context.interface.apply(init_worker_contexts, context.sources, context.update_context_funcs,
                                 context.param_names, context.default_params, context.feature_names,
@@ -122,6 +172,13 @@ def main(cli, config_file_path, sobol, storage_file_path, param_file_path, model
                                     param_file_path=context.param_file_path,
                                     storage_file_path=context.storage_file_path, model_id=context.model_id,
                                     model_key=context.model_key, verbose=context.disp)
+            if batch_size is not None:
+                analyze_in_batches(context, param_arrays, model_ids, model_labels, meta_dict, batch_size,
+                                   results_file_path=results_file_path, resume=resume)
+                if not context.interactive:
+                    context.interface.stop()
+                return
+
             features, objectives = evaluate_population(context, param_arrays, model_ids, context.export)
 
             if context.plot:
@@ -130,10 +187,11 @@ def main(cli, config_file_path, sobol, storage_file_path, param_file_path, model
             if context.export:
                 merge_exported_data(context, param_arrays, model_ids, model_labels, features, objectives,
                                     export_file_path=context.export_file_path, output_dir=context.output_dir,
-                                    verbose=context.disp)
+                                    verbose=context.disp, merge_by_node=context.merge_by_node)
                 write_metadata(context.export_file_path, meta_dict)
             for shutdown_func in context.shutdown_worker_funcs:
                 context.interface.apply(shutdown_func)
+            release_static_args(context)
 
             if disp:
                 for i, params in enumerate(param_arrays):
@@ -166,6 +224,77 @@ def main(cli, config_file_path, sobol, storage_file_path, param_file_path, model
         raise e
 
 
+def analyze_in_batches(context, param_arrays, model_ids, model_labels, meta_dict, batch_size, results_file_path=None,
+                       resume=False):
+    """
+    Models are evaluated in consecutive batches of batch_size. After each batch, data exported by the workers is merged
+    into the export file, and the features and objectives of each model are appended to an AnalysisResultsTable. A
+    model is only recorded in the results table after its exported data has been merged, so when resuming, models that
+    were stored in the table by a previous run are skipped. If the previous run was interrupted while merging a batch,
+    or before that batch was recorded, the partially merged data is first removed from the export file (see
+    AnalysisResultsTable.rollback_export).
+    :param context: :class:'Context'
+    :param param_arrays: list of array
+    :param model_ids: list of int
+    :param model_labels: list of str
+    :param meta_dict: dict
+    :param batch_size: int
+    :param results_file_path: str (path)
+    :param resume: bool
+    """
+    if batch_size < 1:
+        raise RuntimeError('nested.analyze: invalid batch_size: %i' % batch_size)
+    if results_file_path is None:
+        results_file_path = '%s_results.hdf5' % context.export_file_path.split('.hdf5')[0]
+    table = AnalysisResultsTable(results_file_path, context.param_names, context.feature_names,
+                                 context.objective_names, resume=resume)
+    table.check(param_arrays, model_ids)
+    if resume:
+        num_removed = table.rollback_export(context.export_file_path)
+        if num_removed and context.disp:
+            print('nested.analyze: removed %i groups and datasets of an incomplete batch from export file: %s' %
+                  (num_removed, context.export_file_path))
+    remaining = [i for i, this_model_id in enumerate(model_ids) if this_model_id not in table]
+    if context.disp:
+        print('nested.analyze: evaluating %i / %i models in batches of %i; results stored in: %s' %
+              (len(remaining), len(model_ids), batch_size, results_file_path))
+        sys.stdout.flush()
+
+    for start in range(0, len(remaining), batch_size):
+        current_time = time.time()
+        indexes = remaining[start:start + batch_size]
+        batch_param_arrays = [param_arrays[i] for i in indexes]
+        batch_model_ids = [model_ids[i] for i in indexes]
+        population_array, failure_reasons = \
+            evaluate_population(context, batch_param_arrays, batch_model_ids, context.export, as_array=True)
+        if context.export:
+            table.begin_export(context.export_file_path)
+            merge_exported_data(context, export_file_path=context.export_file_path, output_dir=context.output_dir,
+                                verbose=context.disp, merge_by_node=context.merge_by_node)
+            write_metadata(context.export_file_path, meta_dict)
+            table.append(batch_param_arrays, batch_model_ids, population_array, failure_reasons,
+                         export_file_path=context.export_file_path)
+        else:
+            table.append(batch_param_arrays, batch_model_ids, population_array, failure_reasons)
+
+        if context.disp:
+            for j, i in enumerate(indexes):
+                if population_array['failed'][j]:
+                    print('nested.analyze: model_id: %i; model_labels: %s; failed: %s' %
+                          (model_ids[i], model_labels[i], failure_reasons[j]))
+            print('nested.analyze: evaluated %i / %i models; batch took %.2f s' %
+                  (len(table), len(model_ids), time.time() - current_time))
+            sys.stdout.flush()
+
+    if context.plot:
+        context.interface.apply(plt.show)
+    for shutdown_func in context.shutdown_worker_funcs:
+        context.interface.apply(shutdown_func)
+    release_static_args(context)
+    sys.stdout.flush()
+    time.sleep(1.)
+
+
 def write_metadata(file_path, meta_dict):
     if os.path.isfile(file_path):
         with h5py.File(file_path, 'a') as fil:
@@ -50,9 +50,19 @@ context = Context()
 @click.option("--label", type=str, default=None)
 @click.option("--disp", is_flag=True)
 @click.option("--interactive", is_flag=True)
+@click.option("--cache-file-path", type=str, default=None)
+@click.option("--cache-size", type=int, default=None)
+@click.option("--shared-features-file-path", type=str, default=None)
+@click.option("--cost-model", type=click.Choice(['none', 'mean', 'linear']), default='none')
+@click.option("--fuse-objectives", is_flag=True)
+@click.option("--array-transport", is_flag=True)
+@click.option("--catch-exceptions", is_flag=True)
+@click.option("--max-tasks-per-worker", type=int, default=None)
+@click.option("--max-worker-rss", type=float, default=None)
 @click.pass_context
 def main(cli, config_file_path, param_gen, hot_start, storage_file_path, param_file_path, x0_key, output_dir, label,
-         disp, interactive):
+         disp, interactive, cache_file_path, cache_size, shared_features_file_path, cost_model, fuse_objectives,
+         array_transport, catch_exceptions, max_tasks_per_worker, max_worker_rss):
     """
     :param cli: :class:'click.Context': used to process/pass through unknown click arguments
     :param config_file_path: str (path)
@@ -65,6 +75,21 @@ def main(cli, config_file_path, param_gen, hot_start, storage_file_path, param_f
     :param label: str
     :param disp: bool
     :param interactive: bool
+    :param cache_file_path: str (path); features and objectives of evaluated models are cached in this .hdf5 file
+    :param cache_size: int; maximum number of models in the evaluation cache
+    :param shared_features_file_path: str (path); features computed by compute_features_shared functions are stored in
+    this .hdf5 file, and reused by subsequent runs
+    :param cost_model: str; measure the duration of each job, and predict the duration of future jobs from the mean of
+    previous durations ('mean'), or from a linear fit of previous durations as a function of the parameters ('linear').
+    Jobs are then submitted in order of decreasing predicted duration. By default ('none'), durations are not measured.
+    :param fuse_objectives: bool; evaluate all get_objectives functions in a single job, fused with the last job of
+    the final stage where possible
+    :param array_transport: bool; workers return the features and objectives of each model as arrays, and the
+    parameter generator receives each population as a structured array
+    :param catch_exceptions: bool; an Exception raised on a worker while evaluating a model marks that model as failed,
+    rather than stopping the optimization (can also be specified per stage)
+    :param max_tasks_per_worker: int; a worker is re-initialized in place after executing this many jobs
+    :param max_worker_rss: float; a worker is re-initialized in place once its resident memory exceeds this many MB
     """
     # requires a global variable context: :class:'Context'
     context.update(locals())
@@ -74,6 +99,18 @@ def main(cli, config_file_path, param_gen, hot_start, storage_file_path, param_f
     context.interface.ensure_controller()
     try:
         init_optimize_controller_context(**kwargs)
+        if cache_file_path is not None:
+            context.evaluation_cache = EvaluationCache(cache_file_path, config_file_path=context.config_file_path,
+                                                       sources=context.sources, max_size=cache_size,
+                                                       kwargs=context.kwargs)
+        if shared_features_file_path is not None:
+            context.shared_features_store = SharedFeaturesStore(shared_features_file_path,
+                                                                config_file_path=context.config_file_path,
+                                                                kwargs=context.kwargs)
+        if cost_model == 'none':
+            context.cost_model = None
+        else:
+            context.cost_model = CostModel(param_dependent=cost_model == 'linear')
         start_time = time.time()
 
         context.interface.apply(init_worker_contexts, context.sources, context.update_context_funcs,
@@ -133,16 +170,252 @@ def optimize():
     """
 
     """
-    for generation, model_ids in context.param_gen_instance():
-        features, objectives = evaluate_population(context, generation, model_ids)
-        context.param_gen_instance.update_population(features, objectives)
-        del features
-        del objectives
+    if getattr(context.param_gen_instance, 'steady_state', False):
+        optimize_steady_state()
+    elif getattr(context.param_gen_instance, 'speculate', False):
+        optimize_speculative()
+    elif 'array_transport' in context() and context.array_transport and \
+            hasattr(context.param_gen_instance, 'update_population_array'):
+        for generation, model_ids in context.param_gen_instance():
+            population_array, failure_reasons = evaluate_population(context, generation, model_ids, as_array=True)
+            update_shared_feature_names(context)
+            context.param_gen_instance.update_population_array(population_array, failure_reasons)
+            del population_array
+    else:
+        for generation, model_ids in context.param_gen_instance():
+            features, objectives = evaluate_population(context, generation, model_ids)
+            update_shared_feature_names(context)
+            context.param_gen_instance.update_population(features, objectives)
+            del features
+            del objectives
+    if context.cost_model is not None and context.disp:
+        print('nested.optimize: %s' % context.cost_model.report())
+        sys.stdout.flush()
     for shutdown_func in context.shutdown_worker_funcs:
         context.interface.apply(shutdown_func)
+    release_static_args(context)
+
+
+def release_static_args(context):
+    """
+    Arguments returned by get_args_static functions are stored on the workers for the whole run (see
+    EvaluationPipeline.get_static_args). Once no further models will be evaluated, they are released.
+    :param context: :class:'Context'
+    """
+    for stage in context.stages:
+        if 'args_handle' in stage:
+            context.interface.release(stage.pop('args_handle'))
+            stage.pop('args_handles', None)
+
+
+def update_shared_feature_names(context):
+    """
+    Features computed by compute_features_shared functions have the same value for every model. They are identified to
+    the PopulationStorage of the parameter generator, which then records and saves them once per generation.
+    :param context: :class:'Context'
+    """
+    storage = getattr(context.param_gen_instance, 'storage', None)
+    if storage is None or not hasattr(storage, 'set_shared_feature_names'):
+        return
+    shared_feature_names = set()
+    for stage in context.stages:
+        if 'shared_features' in stage:
+            shared_feature_names.update(stage['shared_features'])
+    storage.set_shared_feature_names([name for name in shared_feature_names if name in storage.feature_names])
+
+
+def optimize_steady_state():
+    """
+    Used with a steady-state parameter generator (e.g. SteadyStatePopulationAnnealing). Rather than evaluating a whole
+    generation at a time, a fixed number of models are kept in flight, and a new candidate is requested and submitted
+    as soon as any model completes. reset_worker functions are scheduled each time the parameter generator completes a
+    generation, and each worker applies them before its next job. Stages that act as barriers (see EvaluationPipeline)
+    synchronize all models in flight.
+    """
+    param_gen_instance = context.param_gen_instance
+    num_in_flight = param_gen_instance.num_in_flight
+    if num_in_flight is None:
+        num_in_flight = context.interface.num_workers * max(context.group_sizes)
+    if context.disp:
+        print('nested.optimize: steady-state optimization with %i models in flight' % num_in_flight)
+        sys.stdout.flush()
+    pipeline = EvaluationPipeline(context)
+    cache = context.evaluation_cache if 'evaluation_cache' in context() else None
+    submitted = {}  # model_id: array
+    num_gen = param_gen_instance.num_gen
+    while True:
+        while len(pipeline.models) < num_in_flight:
+            candidate = param_gen_instance.ask()
+            if candidate is None:
+                break
+            x, model_id = candidate
+            if cache is not None:
+                cached = cache.get([x])[0]
+                if cached is not None:
+                    param_gen_instance.tell(model_id, *cached)
+                    continue
+                submitted[model_id] = x
+            pipeline.submit(model_id, x)
+        if not pipeline.models and not pipeline.finished:
+            if cache is not None:
+                cache.flush()
+            break
+        finished = pipeline.wait_any()
+        if not finished and not pipeline.pending:
+            raise RuntimeError('nested.optimize: optimize_steady_state: results for models: %s were not returned' %
+                               list(pipeline.models.keys()))
+        update_shared_feature_names(context)
+        for model_id, features, objectives in finished:
+            param_gen_instance.tell(model_id, features, objectives)
+        if cache is not None and finished:
+            cache.put([submitted.pop(model_id) for model_id, _, _ in finished],
+                      [features for _, features, _ in finished], [objectives for _, _, objectives in finished],
+                      flush=False)
+        if param_gen_instance.num_gen > num_gen:
+            num_gen = param_gen_instance.num_gen
+            if cache is not None:
+                cache.flush()
+                if context.disp:
+                    print('nested.optimize: %s' % cache.report())
+                    sys.stdout.flush()
+            for reset_func in context.reset_worker_funcs:
+                context.interface.apply_deferred(reset_func)
+
+
+def optimize_speculative():
+    """
+    Used with a parameter generator that supports speculative evaluation (e.g. PopulationAnnealing with
+    speculate=True). Each generation is evaluated as in optimize, but once fewer models remain in flight than the
+    number of workers * max group_size, idle slots are used to evaluate speculative children of the provisional parents
+    of the next generation (see PopulationAnnealing.speculate). A single EvaluationPipeline is used for all generations,
+    so that speculative models still in flight when a generation completes continue to run. Speculative models that are
+    not used by the next generation are discarded. Speculation is suspended while any stage acts as a barrier (see
+    EvaluationPipeline), and is disabled if any stage evaluates models in batches. If any reset_worker functions are
+    specified, speculative models still in flight at the end of a generation are allowed to complete (their results
+    remain available to the next generation) before the reset is scheduled, so that no model straddles a reset.
+    """
+    param_gen_instance = context.param_gen_instance
+    num_slots = context.interface.num_workers * max(context.group_sizes)
+    pipeline = EvaluationPipeline(context)
+    cache = context.evaluation_cache if 'evaluation_cache' in context() else None
+    allow_speculation = not any('compute_features_batch_func' in stage for stage in context.stages)
+    if context.disp:
+        if allow_speculation:
+            print('nested.optimize: speculative evaluation of up to %i models in flight' % num_slots)
+        else:
+            print('nested.optimize: speculative evaluation is disabled for stages that evaluate models in batches')
+        sys.stdout.flush()
+    speculative = {}  # speculative model_id: array; submitted and not yet finished
+    speculative_results = {}  # speculative model_id: tuple (array, dict, dict); finished and not yet used
+    stats = defaultdict(float)  # total numbers of speculative models submitted, used, and discarded
+
+    def discard(x):
+        stats['discarded'] += 1
+        if pipeline.cost_model is not None:
+            stats['discarded_time'] += pipeline.cost_model.predict_total(x)
+
+    for generation, model_ids in param_gen_instance():
+        features = {}
+        objectives = {}
+        claimed = {}  # speculative model_id still in flight: model_id in the current generation
+        for model_id, x in zip(model_ids, generation):
+            speculative_id = param_gen_instance.speculative_map.get(model_id, None)
+            if speculative_id is not None:
+                stats['used'] += 1
+                if speculative_id in speculative_results:
+                    _, features[model_id], objectives[model_id] = speculative_results.pop(speculative_id)
+                else:
+                    claimed[speculative_id] = model_id
+                continue
+            if cache is not None:
+                cached = cache.get([x])[0]
+                if cached is not None:
+                    features[model_id], objectives[model_id] = cached
+                    continue
+            pipeline.submit(model_id, x)
+        for x, _, _ in viewvalues(speculative_results):
+            discard(x)
+        speculative_results = {}
+        # speculative models still in flight that were not used by this generation
+        orphaned = set(speculative_id for speculative_id in speculative if speculative_id not in claimed)
 
+        while len(features) < len(model_ids):
+            if allow_speculation and not any(pipeline.is_barrier(stage_index)
+                                             for stage_index in range(len(context.stages) + 1)):
+                num_idle = num_slots - len(pipeline.models)
+                if num_idle > 0:
+                    for x, speculative_id in param_gen_instance.speculate(features, objectives, num_idle):
+                        speculative[speculative_id] = x
+                        pipeline.submit(speculative_id, x)
+                        stats['submitted'] += 1
+            if not pipeline.models and not pipeline.finished:
+                raise RuntimeError('nested.optimize: optimize_speculative: results for models: %s were not returned' %
+                                   [model_id for model_id in model_ids if model_id not in features])
+            finished = pipeline.wait_any()
+            if not finished and not pipeline.pending:
+                raise RuntimeError('nested.optimize: optimize_speculative: results for models: %s were not returned' %
+                                   list(pipeline.models.keys()))
+            for model_id, this_features, this_objectives in finished:
+                if model_id in speculative:
+                    x = speculative.pop(model_id)
+                    if cache is not None:
+                        cache.put([x], [this_features], [this_objectives], flush=False)
+                    if model_id in claimed:
+                        this_model_id = claimed.pop(model_id)
+                        features[this_model_id], objectives[this_model_id] = this_features, this_objectives
+                    elif model_id in orphaned:
+                        orphaned.discard(model_id)
+                        discard(x)
+                    else:
+                        speculative_results[model_id] = (x, this_features, this_objectives)
+                else:
+                    features[model_id], objectives[model_id] = this_features, this_objectives
+                    if cache is not None:
+                        cache.put([generation[model_ids.index(model_id)]], [this_features], [this_objectives],
+                                  flush=False)
+
+        if cache is not None:
+            cache.flush()
+        update_shared_feature_names(context)
+        param_gen_instance.update_population([features[model_id] for model_id in model_ids],
+                                             [objectives[model_id] for model_id in model_ids])
+        if context.disp:
+            num_resolved = stats['used'] + stats['discarded']
+            print('nested.optimize: speculative evaluation: %i submitted; %i used; %i discarded; hit rate: %.1f%%' %
+                  (stats['submitted'], stats['used'], stats['discarded'],
+                   100. * stats['used'] / num_resolved if num_resolved else 0.))
+            if pipeline.cost_model is not None and stats['discarded']:
+                print('nested.optimize: speculative evaluation: discarded models used an estimated %.1f s of worker '
+                      'time' % stats['discarded_time'])
+            if cache is not None:
+                print('nested.optimize: %s' % cache.report())
+            sys.stdout.flush()
+        if context.reset_worker_funcs:
+            while pipeline.models or pipeline.finished:
+                finished = pipeline.wait_any()
+                if not finished and not pipeline.pending:
+                    raise RuntimeError('nested.optimize: optimize_speculative: results for models: %s were not '
+                                       'returned' % list(pipeline.models.keys()))
+                for model_id, this_features, this_objectives in finished:
+                    x = speculative.pop(model_id)
+                    if cache is not None:
+                        cache.put([x], [this_features], [this_objectives], flush=False)
+                    speculative_results[model_id] = (x, this_features, this_objectives)
+            if cache is not None:
+                cache.flush()
+            for reset_func in context.reset_worker_funcs:
+                context.interface.apply_deferred(reset_func)
+
+    while pipeline.models or pipeline.finished:
+        finished = pipeline.wait_any()
+        if not finished and not pipeline.pending:
+            raise RuntimeError('nested.optimize: optimize_speculative: results for models: %s were not returned' %
+                               list(pipeline.models.keys()))
+        for model_id, _, _ in finished:
+            discard(speculative.pop(model_id))
 
-def evaluate_population(context, population, model_ids=None, export=False):
+
+def evaluate_population(context, population, model_ids=None, export=False, as_array=False):
     """
     The instructions for computing features and objectives specified in the config_file_path are now followed for each
     individual member of a population of parameter arrays (models). If any compute_features or filter_feature function
@@ -150,139 +423,966 @@ def evaluate_population(context, population, model_ids=None, export=False):
     from any further computation. This frees resources for remaining individuals. If any dictionary of features or
     objectives does not contain the full set of expected items, the param_gen_instance will mark those models as failed
     when update_population is called.
+    Each model advances through its stages as soon as its own jobs have completed (see EvaluationPipeline).
+    reset_worker functions are not applied with a blocking apply operation after the population has been evaluated.
+    Instead, each worker applies them before the next job it executes (see the apply_deferred method of each parallel
+    interface).
+    If an EvaluationCache is provided as context.evaluation_cache, models found in the cache are not evaluated again,
+    unless data is being exported.
+    If as_array, the features and objectives of the population are returned as a structured array, along with the
+    reason for failure of each model (see get_population_array). Unless data is being exported or an EvaluationCache is
+    used, the workers then return the features and objectives of each successful model as arrays.
     :param context: :class:'Context'
     :param population: list of arr
     :param model_ids: list of str
     :param export: bool; whether to export data to file during model evaluation
-    :return: tuple of list of dict
+    :param as_array: bool
+    :return: tuple of list of dict, or tuple (structured array, list of str or None)
     """
     if model_ids is None:
-        working_model_ids = list(range(len(population)))
+        model_ids = list(range(len(population)))
     else:
-        working_model_ids = list(model_ids)
-    if len(set(working_model_ids)) != len(population):
+        model_ids = list(model_ids)
+    if len(set(model_ids)) != len(population):
         raise RuntimeError('nested.optimize: evaluate_population: provided model_ids must be unique')
-    orig_model_ids = list(working_model_ids)
-    params_pop_dict = dict(zip(working_model_ids, population))
-    features_pop_dict = {model_id: dict() for model_id in working_model_ids}
-    objectives_pop_dict = {model_id: dict() for model_id in working_model_ids}
-    for stage in context.stages:
-        if not working_model_ids:
-            break
-        params_pop_list = [params_pop_dict[model_id] for model_id in working_model_ids]
-        if 'args' in stage:
-            group_size = len(stage['args'][0])
-            args_population = [stage['args'] for model_id in working_model_ids]
-        elif 'get_args_static_func' in stage:
-            stage['args'] = context.interface.execute(stage['get_args_static_func'])
-            group_size = len(stage['args'][0])
-            args_population = [stage['args'] for model_id in working_model_ids]
-        elif 'get_args_dynamic_func' in stage:
-            features_pop_list = [features_pop_dict[model_id] for model_id in working_model_ids]
-            args_population = context.interface.map_sync(stage['get_args_dynamic_func'], params_pop_list,
-                                                         features_pop_list)
-            group_size = len(args_population[0][0])
+    use_cache = 'evaluation_cache' in context() and context.evaluation_cache is not None and not export
+    pipeline = EvaluationPipeline(context, export=export, array_transport=as_array and not use_cache)
+    if use_cache:
+        features_pop_list, objectives_pop_list = \
+            evaluate_population_cached(context.evaluation_cache, pipeline, population, model_ids)
+        if context.disp:
+            print('nested.optimize: %s' % context.evaluation_cache.report())
+    else:
+        features_pop_list, objectives_pop_list = pipeline.run(population, model_ids)
+    if not pipeline.num_succeeded and context.disp:
+        print('nested.optimize: all models failed to compute required features or objectives')
+    if pipeline.num_cancelled and context.disp:
+        print('nested.optimize: cancelled %i jobs for models that failed' % pipeline.num_cancelled)
+    if pipeline.num_screened and context.disp:
+        print('nested.optimize: %i models were rejected by screening stages' % pipeline.num_screened)
+    if pipeline.num_exceptions and context.disp:
+        print('nested.optimize: %i models failed after a job raised an Exception on a worker' % pipeline.num_exceptions)
+    if pipeline.num_timed_out and context.disp:
+        print('nested.optimize: %i models exceeded the timeout of a stage' % pipeline.num_timed_out)
+    if pipeline.num_duplicated and context.disp:
+        print('nested.optimize: submitted duplicates of %i straggling jobs; %i duplicates returned first' %
+              (pipeline.num_duplicated, pipeline.num_duplicates_won))
+    worker_speeds = get_worker_speeds(context.interface)
+    if len(worker_speeds) > 1 and context.disp:
+        print('nested.optimize: relative speed of %i measured workers ranges from %.2f to %.2f' %
+              (len(worker_speeds), min(viewvalues(worker_speeds)), max(viewvalues(worker_speeds))))
+    if pipeline.makespan is not None and context.disp:
+        if pipeline.predicted_makespan is not None:
+            print('nested.optimize: evaluation took %.2f s; predicted: %.2f s' %
+                  (pipeline.makespan, pipeline.predicted_makespan))
+        else:
+            print('nested.optimize: evaluation took %.2f s' % pipeline.makespan)
+    sys.stdout.flush()
+    for reset_func in context.reset_worker_funcs:
+        context.interface.apply_deferred(reset_func)
+
+    if as_array:
+        return get_population_array(features_pop_list, objectives_pop_list, context.feature_names,
+                                    context.objective_names)
+    return features_pop_list, objectives_pop_list
+
+
+def evaluate_population_cached(cache, pipeline, population, model_ids):
+    """
+    Only models not found in the evaluation cache are submitted to the EvaluationPipeline. Models with identical
+    parameter arrays are only evaluated once, and count as cache hits. Newly computed features and objectives are then
+    stored in the cache.
+    :param cache: :class:'EvaluationCache'
+    :param pipeline: :class:'EvaluationPipeline'
+    :param population: list of arr
+    :param model_ids: list
+    :return: tuple of list of dict
+    """
+    features_pop_list = [None] * len(population)
+    objectives_pop_list = [None] * len(population)
+    evaluate_indexes = {}  # key: index of the first model in the population with that key
+    duplicates = []  # tuple of int: (index, index of model with the same key)
+    for i, cached in enumerate(cache.get(population)):
+        if cached is not None:
+            features_pop_list[i], objectives_pop_list[i] = cached
+            continue
+        key = cache.get_key(population[i])
+        if key in evaluate_indexes:
+            duplicates.append((i, evaluate_indexes[key]))
+            cache.misses -= 1
+            cache.hits += 1
+        else:
+            evaluate_indexes[key] = i
+    if evaluate_indexes:
+        indexes = sorted(viewvalues(evaluate_indexes))
+        this_population = [population[i] for i in indexes]
+        this_features, this_objectives = pipeline.run(this_population, [model_ids[i] for i in indexes])
+        for i, features, objectives in zip(indexes, this_features, this_objectives):
+            features_pop_list[i] = features
+            objectives_pop_list[i] = objectives
+        cache.put(this_population, this_features, this_objectives)
+    for i, j in duplicates:
+        features_pop_list[i] = dict(features_pop_list[j])
+        objectives_pop_list[i] = dict(objectives_pop_list[j])
+    return features_pop_list, objectives_pop_list
+
+
+class EvaluationPipeline(object):
+    """
+    Schedules the evaluation of models through the stages specified in the config_file_path. Rather than treating each
+    stage as a population-wide barrier, each model advances through its own chain of jobs (get_args_dynamic,
+    compute_features, filter_features, and finally get_objectives) as soon as its previous jobs have completed.
+    A stage remains a population-wide barrier if it contains a compute_features_shared function that has not yet been
+    computed, or if it sets "barrier: True" in the config_file_path. A stage that contains a synchronize function
+    forms a barrier after it, so that synchronize is executed only once all models have completed that stage.
+    Jobs are submitted with the model_id as a tag. As soon as any compute_features job returns an empty dict or a dict
+    that contains the key 'failed', the remaining jobs for that model are cancelled, and the model is removed.
+    A stage that specifies a compute_features_batch function evaluates blocks of models in a single job. The function
+    receives a 2-D array of parameters (one row per model), a list of model_ids, and the export flag, and must return a
+    list of features dicts, one per row. Models that reach such a stage are queued, and submitted in blocks of up to
+    batch_size models. If batch_size is not specified in the config_file_path, the active models are divided evenly
+    across the available workers. A partial block is submitted once no other active model can still reach the stage.
+    If a stage specifies a chunksize (an int, or 'auto'), the group of compute_features jobs for each model is submitted
+    in chunks (see the map_async method of each parallel interface). If a stage instead sets "affinity: True", the group
+    is divided into only as many chunks as are needed to keep all workers busy, so that when there are at least as many
+    active models as workers, all jobs of a model run on the same worker, and model state is built once per chunk rather
+    than once per job (see update_source_contexts).
+    Arguments returned by a get_args_static function are sent to each worker only once, and jobs refer to them by handle
+    (see the put method of each parallel interface).
+    A stage that specifies a screen_objectives function is followed by a screening step. The function receives the
+    features computed so far, the model_id, and the export flag, and returns a score (lower is better). If the stage
+    specifies a screen_threshold, models with a greater score are rejected. If the stage specifies a keep_fraction, the
+    screening step forms a barrier, and only that fraction of the models with the lowest scores proceed. Rejected
+    models are returned as failed, with the reason recorded as the value of the key 'failed' in their objectives.
+    A stage that sets "filter_on_worker: True" submits a single job for each model, which computes the whole group of
+    compute_features functions and then the filter_features function on one worker (see compute_and_filter_features).
+    Primitives then never leave the worker, and only the filtered features are returned to the controller.
+    If context.fuse_objectives, all get_objectives functions for a model are evaluated in a single job (see
+    get_all_objectives). If the final stage of a model ends with a single job (a filter_features job, a stage with
+    "filter_on_worker: True", or a single compute_features job), and no barrier follows it, the objectives are instead
+    evaluated within that same job (see compute_features_and_objectives).
+    With array_transport, all get_objectives functions for a model are evaluated in a single job, which returns the
+    features and objectives of a successful model as arrays ordered by feature_names and objective_names. wait_any then
+    returns these arrays in place of dicts for those models.
+    If a CostModel is provided as context.cost_model, the duration of each job is measured on the worker and recorded,
+    indexed by step, stage, and position within its group. Each group of jobs is submitted in order of decreasing
+    predicted duration, and run submits the models of a population in order of decreasing total predicted duration, so
+    that the longest jobs do not start last.
+    If a stage specifies a timeout (in seconds), each of its compute_features jobs is interrupted on the worker once it
+    has run for that long (see TimeLimitedCall), and the controller also removes the model once any of its jobs has
+    been observed running for that long. With procs_per_worker > 1, jobs are not interrupted on the worker, and the
+    timeout is only enforced by the controller. The model is returned as failed, with the reason recorded as the value
+    of the key 'failed' in its objectives. If a stage specifies a straggler_factor, a compute_features job that has been
+    running for longer than straggler_factor times the median duration of recent jobs of that stage is submitted again
+    if there is an idle worker, and whichever copy returns first is used. Start times of running jobs are available
+    from MPIFuturesInterface and ParallelContextInterface (see the start_time method of each AsyncResultWrapper).
+    If context.catch_exceptions, or if a stage specifies catch_exceptions, an Exception raised on a worker by a job for
+    a single model is returned as a JobFailure (see FailSafeCall). The remaining jobs of that model are cancelled, and
+    the model is returned as failed, with the error text and traceback as its reason for failure.
+    If context.max_tasks_per_worker or context.max_worker_rss (in MB) is specified, a worker that has executed that
+    many jobs since it was initialized, or whose resident memory exceeds that limit, is re-initialized in place before
+    its next job (see RecyclingCall and recycle_worker_context), to recover memory leaked by model sources.
+    """
+
+    def __init__(self, context, export=False, array_transport=False):
+        """
+
+        :param context: :class:'Context'
+        :param export: bool; whether to export data to file during model evaluation
+        :param array_transport: bool; the final job of each model returns its features and objectives as arrays
+        """
+        self.context = context
+        self.interface = context.interface
+        self.stages = context.stages
+        self.get_objectives_funcs = context.get_objectives_funcs
+        self.export = export
+        if 'shared_features_store' in context() and not export:
+            self.shared_features_store = context.shared_features_store
+        else:
+            self.shared_features_store = None
+        self.models = {}  # active models, indexed by model_id
+        # AsyncResultWrapper: [model_id, step, num_remaining, results, order, cost_keys, fused]; if jobs were
+        # submitted in order of predicted duration, order maps the position of each submitted job to its index within
+        # the group; fused indicates that the job also evaluated the get_objectives functions
+        self.pending = {}
+        self.waiting = defaultdict(list)  # stage index of a barrier: list of model_ids
+        self.batch_queues = defaultdict(list)  # stage index of a compute_features_batch stage: list of model_ids
+        self.finished = []  # tuple of (model_id, features, objectives) not yet returned by wait_any
+        self.submit_count = 0
+        self.num_succeeded = 0
+        self.num_failed = 0
+        self.num_cancelled = 0  # number of jobs cancelled after the failure of another job for the same model
+        self.num_screened = 0  # number of models rejected by screening stages
+        # AsyncResultWrapper of jobs with a timeout or straggler_factor: (func, sequences), used to submit duplicates
+        self.tracked = {}
+        # AsyncResultWrapper of a duplicate job: (AsyncResultWrapper of the straggling group, index of the straggler)
+        self.duplicates = {}
+        self.won_by_duplicate = defaultdict(set)  # AsyncResultWrapper: indexes of jobs whose duplicate returned first
+        self.num_duplicated = 0  # number of straggling jobs submitted again
+        self.num_duplicates_won = 0  # number of duplicate jobs that returned before the original
+        self.num_timed_out = 0  # number of models removed by the controller after exceeding a stage timeout
+        # durations of recent compute_features jobs, indexed by stage, used to detect stragglers
+        self.stage_durations = defaultdict(lambda: collections.deque(maxlen=100))
+        if any(stage.get('timeout', None) is not None or stage.get('straggler_factor', None) is not None
+               for stage in self.stages):
+            self.poll_interval = 1.  # seconds between checks of running jobs
+        else:
+            self.poll_interval = None
+        self.cost_model = context.cost_model if 'cost_model' in context() else None
+        self.fuse_objectives = context.fuse_objectives if 'fuse_objectives' in context() else False
+        self.catch_exceptions = context.catch_exceptions if 'catch_exceptions' in context() else False
+        self.num_exceptions = 0  # number of models removed after a job raised an Exception on a worker
+        self.max_tasks_per_worker = context.max_tasks_per_worker if 'max_tasks_per_worker' in context() else None
+        if self.max_tasks_per_worker is not None:
+            self.max_tasks_per_worker = int(self.max_tasks_per_worker)
+        self.max_worker_rss = context.max_worker_rss if 'max_worker_rss' in context() else None
+        if self.max_worker_rss is not None:
+            self.max_worker_rss = float(self.max_worker_rss)
+        if array_transport:
+            self.names = (context.feature_names, context.objective_names)
+        else:
+            self.names = None
+        self.predicted_makespan = None  # predicted duration of the last call to run, in seconds
+        self.makespan = None  # measured duration of the last call to run, in seconds
+        for stage in self.stages:
+            if 'args' in stage or 'get_args_static_func' in stage:
+                self.get_static_args(stage)
+        if self.interface.procs_per_worker > 1 and \
+                any(stage.get('timeout', None) is not None for stage in self.stages):
+            print('nested.optimize: EvaluationPipeline: stage timeouts are only enforced by the controller with '
+                  'procs_per_worker > 1; a worker that runs past a timeout remains occupied until its job returns')
+            sys.stdout.flush()
+
+    def is_barrier(self, stage_index):
+        """
+        A barrier placed before the stage with the provided index prevents any model from starting that stage until all
+        active models have reached it. The stage index len(stages) refers to the get_objectives step.
+        :param stage_index: int
+        :return: bool
+        """
+        if stage_index > 0 and 'synchronize_func' in self.stages[stage_index - 1]:
+            return True
+        if stage_index > 0 and 'screen_objectives_func' in self.stages[stage_index - 1] and \
+                self.stages[stage_index - 1].get('keep_fraction', None) is not None:
+            return True
+        if stage_index < len(self.stages):
+            stage = self.stages[stage_index]
+            if stage.get('barrier', False):
+                return True
+            if 'compute_features_shared_func' in stage and 'shared_features' not in stage:
+                return True
+        return False
+
+    def submit(self, model_id, x, advance=True):
+        """
+        Begin evaluation of a single model. If not advance, the model is only registered as active, and its first jobs
+        are submitted by a later call to advance. run registers a whole population before submitting any jobs, so that
+        the number of active models is known when each model is submitted (see get_affinity_chunksize).
+        :param model_id: int or str
+        :param x: array
+        :param advance: bool
+        """
+        if model_id in self.models:
+            raise RuntimeError('nested.optimize: EvaluationPipeline: model_id: %s has already been submitted' %
+                               str(model_id))
+        self.models[model_id] = {'x': x, 'features': dict(), 'objectives': dict(), 'stage': 0, 'released': None,
+                                 'order': self.submit_count}
+        self.submit_count += 1
+        if advance:
+            self.advance(model_id)
+
+    def submit_jobs(self, model_id, step, func, *sequences, **kwargs):
+        """
+
+        :param model_id: int or str
+        :param step: str
+        :param func: callable
+        :param sequences: list of list
+        :param chunksize: int or 'auto'
+        :param fuse_objectives: bool; a single job also evaluates the get_objectives functions
+        :param tracked: bool; the start times of jobs are tracked to enforce a timeout or detect stragglers
+        """
+        fused = kwargs.get('fuse_objectives', False)
+        tracked = kwargs.get('tracked', False)
+        if fused:
+            sequences = [[func], [self.get_objectives_funcs], [self.names], [self.models[model_id]['features']]] + \
+                        list(sequences)
+            func = compute_features_and_objectives
+        if self.catches_exceptions(self.models[model_id]['stage']):
+            func = FailSafeCall(func)
+        group_size = len(sequences[0])
+        order = None
+        cost_keys = None
+        if self.cost_model is not None:
+            model = self.models[model_id]
+            position = model['objectives_index'] if step == 'get_objectives' else model['stage']
+            cost_keys = [(step, position, index) for index in range(group_size)]
+            predicted = [self.cost_model.predict(key, model['x']) for key in cost_keys]
+            # jobs without a recorded duration are submitted first
+            order = sorted(range(group_size),
+                           key=lambda index: -predicted[index] if predicted[index] is not None else -float('inf'))
+            sequences = [[sequence[index] for index in order] for sequence in sequences]
+            func = TimedCall(func)
+        func = self.get_recycling_func(func)
+        async_result = self.interface.map_async(func, *sequences, tag=model_id,
+                                                chunksize=kwargs.get('chunksize', None), track_start=tracked,
+                                                notify=self.poll_interval is not None)
+        self.pending[async_result] = [model_id, step, group_size, [None] * group_size, order, cost_keys, fused]
+        if tracked:
+            self.tracked[async_result] = (func, sequences)
+
+    def catches_exceptions(self, stage_index):
+        """
+        If a stage specifies catch_exceptions, it overrides context.catch_exceptions for the jobs of that stage. The
+        stage index len(stages) refers to the get_objectives step.
+        :param stage_index: int
+        :return: bool
+        """
+        if stage_index < len(self.stages) and self.stages[stage_index].get('catch_exceptions', None) is not None:
+            return self.stages[stage_index]['catch_exceptions'] in [True, 'True', 'true']
+        return self.catch_exceptions in [True, 'True', 'true']
+
+    def get_recycling_func(self, func):
+        """
+        If context.max_tasks_per_worker or context.max_worker_rss is specified, jobs are wrapped so that a worker that
+        exceeds either limit is recycled before its next job (see RecyclingCall).
+        :param func: callable
+        :return: callable
+        """
+        if self.max_tasks_per_worker is None and self.max_worker_rss is None:
+            return func
+        return RecyclingCall(func, self.max_tasks_per_worker, self.max_worker_rss)
+
+    def advance(self, model_id):
+        """
+        Submit the next jobs required to evaluate the specified model, or hold the model at a barrier.
+        :param model_id: int or str
+        """
+        model = self.models[model_id]
+        while model['stage'] < len(self.stages):
+            stage_index = model['stage']
+            if model['released'] != stage_index and self.is_barrier(stage_index):
+                self.waiting[stage_index].append(model_id)
+                self.check_barriers()
+                return
+            stage = self.stages[stage_index]
+            if 'shared_features' in stage:
+                model['features'].update(stage['shared_features'])
+                if 'screen_objectives_func' in stage:
+                    self.next_stage(model_id)
+                    return
+                model['stage'] += 1
+            elif 'compute_features_batch_func' in stage:
+                self.batch_queues[stage_index].append(model_id)
+                return
+            elif 'args' in stage or 'get_args_static_func' in stage:
+                self.submit_compute_features(model_id, self.get_static_args(stage))
+                return
+            elif 'get_args_dynamic_func' in stage:
+                self.submit_jobs(model_id, 'args', stage['get_args_dynamic_func'], [model['x']],
+                                 [model['features']])
+                return
+            else:
+                self.submit_compute_features(model_id, [])
+                return
+        if model['released'] != len(self.stages) and self.is_barrier(len(self.stages)):
+            self.waiting[len(self.stages)].append(model_id)
+            self.check_barriers()
+        else:
+            self.submit_get_objectives(model_id, 0)
+
+    def get_static_args(self, stage):
+        """
+        Arguments returned by a get_args_static function are computed once, and sent once to all workers with
+        interface.put. Returns the arguments as sequences of handles that are resolved on the workers, so that the same
+        arguments are not sent again with every job. This is done for every stage when the pipeline is created, before
+        any model is submitted, since interface.put can wait for all workers to finish their current jobs. The stored
+        arguments are released by release_static_args.
+        :param stage: dict
+        :return: list of list of :class:'ObjectHandle'
+        """
+        if 'args' not in stage:
+            stage['args'] = self.interface.execute(stage['get_args_static_func'])
+        if 'args_handles' not in stage:
+            if stage['args']:
+                handle = self.interface.put(stage['args'])
+                stage['args_handle'] = handle
+                stage['args_handles'] = [[handle.item(i).item(j) for j in range(len(sequence))]
+                                         for i, sequence in enumerate(stage['args'])]
+            else:
+                stage['args_handles'] = []
+        return stage['args_handles']
+
+    def submit_compute_features(self, model_id, args):
+        """
+
+        :param model_id: int or str
+        :param args: list of list
+        """
+        model = self.models[model_id]
+        stage = self.stages[model['stage']]
+        if args:
+            group_size = len(args[0])
         else:
-            args_population = [[] for model_id in working_model_ids]
             group_size = 1
-        if 'shared_features' in stage:
-            for model_id in working_model_ids:
-                features_pop_dict[model_id].update(stage['shared_features'])
-        elif 'compute_features_shared_func' in stage:
-            args = args_population[0]
-            this_x = params_pop_list[0]
-            this_model_id = 'shared'
-            sequences = [[this_x] * group_size] + args + [[this_model_id] * group_size] + [[export] * group_size]
-            primitives = context.interface.map_sync(stage['compute_features_shared_func'], *sequences)
-            for features_dict in primitives:
+        compute_features_func = stage['compute_features_func']
+        if stage.get('timeout', None) is not None:
+            compute_features_func = TimeLimitedCall(compute_features_func, stage['timeout'])
+        if stage.get('filter_on_worker', False):
+            self.submit_jobs(model_id, 'compute_filter_features', compute_and_filter_features,
+                             [compute_features_func], [stage.get('filter_features_func', None)],
+                             [model['x']], [list(args)], [model['features']], [model_id], [self.export],
+                             fuse_objectives=self.can_fuse_objectives(model_id))
+            return
+        sequences = [[model['x']] * group_size] + list(args) + [[model_id] * group_size] + \
+                    [[self.export] * group_size]
+        fuse_objectives = group_size == 1 and 'filter_features_func' not in stage and \
+                          self.can_fuse_objectives(model_id)
+        tracked = stage.get('timeout', None) is not None or stage.get('straggler_factor', None) is not None
+        chunksize = stage.get('chunksize', None)
+        if chunksize is None and stage.get('affinity', False) and group_size > 1:
+            chunksize = self.get_affinity_chunksize(group_size)
+        self.submit_jobs(model_id, 'compute_features', compute_features_func, *sequences, chunksize=chunksize,
+                         fuse_objectives=fuse_objectives, tracked=tracked)
+
+    def get_affinity_chunksize(self, group_size):
+        """
+        The parallel interfaces do not route jobs to specific workers, but all jobs in a chunk run on the same worker.
+        The group of jobs for a model is divided into as many chunks as its share of the workers, so that jobs are only
+        spread across workers that would otherwise be idle.
+        :param group_size: int
+        :return: int
+        """
+        num_chunks = int(math.ceil(float(self.interface.num_workers) / max(1, len(self.models))))
+        num_chunks = max(1, min(group_size, num_chunks))
+        return int(math.ceil(float(group_size) / num_chunks))
+
+    def can_fuse_objectives(self, model_id):
+        """
+        The get_objectives functions can be evaluated in the same job as the last job of the final stage, unless a
+        barrier or a screening step follows the final stage.
+        :param model_id: int or str
+        :return: bool
+        """
+        return self.fuse_objectives and len(self.get_objectives_funcs) > 0 and \
+               self.models[model_id]['stage'] == len(self.stages) - 1 and not self.is_barrier(len(self.stages)) and \
+               'screen_objectives_func' not in self.stages[-1]
+
+    def get_batch_size(self, stage_index):
+        """
+
+        :param stage_index: int
+        :return: int
+        """
+        batch_size = self.stages[stage_index].get('batch_size', None)
+        if batch_size is None or batch_size == 'auto':
+            batch_size = int(math.ceil(float(len(self.models)) / self.interface.num_workers))
+        return max(1, int(batch_size))
+
+    def submit_batches(self):
+        """
+        Submit blocks of queued models to compute_features_batch stages. A partial block is only submitted if no active
+        model remains at an earlier stage.
+        """
+        for stage_index in sorted(self.batch_queues):
+            queue = self.batch_queues[stage_index]
+            batch_size = self.get_batch_size(stage_index)
+            while len(queue) >= batch_size or \
+                    (queue and not any(model['stage'] < stage_index for model in viewvalues(self.models))):
+                batch_model_ids = queue[:batch_size]
+                del queue[:batch_size]
+                param_block = np.array([self.models[model_id]['x'] for model_id in batch_model_ids])
+                func = self.stages[stage_index]['compute_features_batch_func']
+                if self.catches_exceptions(stage_index):
+                    func = FailSafeCall(func)
+                func = self.get_recycling_func(func)
+                async_result = self.interface.map_async(func, [param_block], [batch_model_ids], [self.export],
+                                                        notify=self.poll_interval is not None)
+                self.pending[async_result] = [batch_model_ids, 'compute_features_batch', 1, [None], None, None, False]
+            if not queue:
+                del self.batch_queues[stage_index]
+
+    def submit_get_objectives(self, model_id, index):
+        """
+
+        :param model_id: int or str
+        :param index: int; index into the list of get_objectives functions
+        """
+        if index >= len(self.get_objectives_funcs):
+            self.finish(model_id)
+            return
+        model = self.models[model_id]
+        if 'fused_objectives' in model:
+            self.process(model_id, 'get_all_objectives', [model.pop('fused_objectives')])
+            return
+        if self.fuse_objectives or self.names is not None:
+            self.submit_jobs(model_id, 'get_all_objectives', get_all_objectives, [self.get_objectives_funcs],
+                             [model['features']], [model_id], [self.export], [self.names])
+            return
+        model['objectives_index'] = index
+        self.submit_jobs(model_id, 'get_objectives', self.get_objectives_funcs[index], [model['features']],
+                         [model_id], [self.export])
+
+    def next_stage(self, model_id):
+        """
+        If the completed stage specifies a screen_objectives function, the model is scored before it can proceed.
+        :param model_id: int or str
+        """
+        model = self.models[model_id]
+        stage = self.stages[model['stage']]
+        if 'screen_objectives_func' in stage:
+            self.submit_jobs(model_id, 'screen', stage['screen_objectives_func'], [model['features']], [model_id],
+                             [self.export])
+            return
+        model['stage'] += 1
+        self.advance(model_id)
+
+    def screen(self, model_ids, stage_index):
+        """
+        Only the keep_fraction of models with the lowest screening scores proceed past a screening stage. The rest are
+        rejected.
+        :param model_ids: list
+        :param stage_index: int
+        :return: list; model_ids of models that proceed, in the order provided
+        """
+        num_keep = max(1, int(math.ceil(self.stages[stage_index]['keep_fraction'] * len(model_ids))))
+        ranked_model_ids = sorted(model_ids, key=lambda model_id: self.models[model_id]['screen_score'])
+        for model_id in ranked_model_ids[num_keep:]:
+            self.reject(model_id, stage_index)
+        kept_model_ids = set(ranked_model_ids[:num_keep])
+        return [model_id for model_id in model_ids if model_id in kept_model_ids]
+
+    def reject(self, model_id, stage_index):
+        """
+        Remove a model that did not pass a screening stage. The model retains the features computed so far, and the
+        reason for rejection is recorded as the value of the key 'failed' in its objectives.
+        :param model_id: int or str
+        :param stage_index: int
+        """
+        self.models[model_id]['objectives']['failed'] = 'screened out by %s after stage %i' % \
+                                                        (self.stages[stage_index]['screen_objectives'], stage_index)
+        self.num_screened += 1
+        self.finish(model_id, failed=True)
+
+    def process(self, model_id, step, results, fused=False):
+        """
+        Handle the results of a completed group of jobs for a single model.
+        :param model_id: int or str
+        :param step: str
+        :param results: list
+        :param fused: bool; the single job also evaluated the get_objectives functions
+        """
+        if fused:
+            features_dict, objectives_result = results[0]
+            results = [features_dict]
+            if objectives_result is not None:
+                self.models[model_id]['fused_objectives'] = objectives_result
+        if step == 'compute_features_batch':
+            if len(results[0]) != len(model_id):
+                raise RuntimeError('nested.optimize: compute_features_batch function returned %i features dicts for %i '
+                                   'models' % (len(results[0]), len(model_id)))
+            for this_model_id, features_dict in zip(model_id, results[0]):
+                self.process(this_model_id, 'compute_features', [features_dict])
+            return
+        model = self.models[model_id]
+        stage = self.stages[model['stage']] if model['stage'] < len(self.stages) else None
+        if step == 'args':
+            self.submit_compute_features(model_id, results[0])
+        elif step == 'compute_features':
+            for features_dict in results:
                 if not features_dict or 'failed' in features_dict:
-                    raise RuntimeError('nested.optimize: compute_features_shared function: %s failed' %
-                                       stage['compute_features_shared_func'])
+                    self.fail(model_id, get_failure_reason(features_dict or {}, {}))
+                    return
             if 'filter_features_func' in stage:
-                this_shared_features = context.interface.execute(
-                    stage['filter_features_func'], primitives, {}, this_model_id, export)
-                if not this_shared_features or 'failed' in this_shared_features:
-                    raise RuntimeError('nested.optimize: shared filter_features function: %s failed' %
-                                       stage['filter_features_func'])
+                self.submit_jobs(model_id, 'filter_features', stage['filter_features_func'], [results],
+                                 [model['features']], [model_id], [self.export],
+                                 fuse_objectives=self.can_fuse_objectives(model_id))
             else:
-                this_shared_features = dict()
-                for features_dict in primitives:
-                    this_shared_features.update(features_dict)
-            del primitives
-            stage['shared_features'] = this_shared_features
-            for model_id in working_model_ids:
-                features_pop_dict[model_id].update(stage['shared_features'])
-            del this_shared_features
-        else:
-            pending = []
-            for this_x, args, this_model_id in zip(params_pop_list, args_population, working_model_ids):
-                sequences = [[this_x] * group_size] + args + [[this_model_id] * group_size] + [[export] * group_size]
-                pending.append(context.interface.map_async(stage['compute_features_func'], *sequences))
-            while not all(result.ready(wait=0.1) for result in pending):
-                time.sleep(0.1)
-            temp_model_ids = list(working_model_ids)
-            primitives_pop_dict = {}
-            for model_id, result in zip(temp_model_ids, pending):
-                this_primitives = result.get()
-                for this_features_dict in this_primitives:
-                    if not this_features_dict or 'failed' in this_features_dict:
-                        working_model_ids.remove(model_id)
-                        break
-                else:
-                    primitives_pop_dict[model_id] = this_primitives
-            del pending
-            if 'filter_features_func' in stage:
-                primitives_pop_list = []
-                features_pop_list = []
-                for model_id in working_model_ids:
-                    primitives_pop_list.append(primitives_pop_dict[model_id])
-                    features_pop_list.append(features_pop_dict[model_id])
-                new_features_pop_list = context.interface.map_sync(
-                    stage['filter_features_func'], primitives_pop_list, features_pop_list, working_model_ids,
-                    [export] * len(working_model_ids))
-                del primitives_pop_list
-                del features_pop_list
-                temp_model_ids = list(working_model_ids)
-                for model_id, this_features_dict in zip(temp_model_ids, new_features_pop_list):
-                    if not this_features_dict or 'failed' in this_features_dict:
-                        working_model_ids.remove(model_id)
-                    else:
-                        features_pop_dict[model_id].update(this_features_dict)
-                del new_features_pop_list
+                for features_dict in results:
+                    model['features'].update(features_dict)
+                self.next_stage(model_id)
+        elif step in ['filter_features', 'compute_filter_features']:
+            features_dict = results[0]
+            if not features_dict or 'failed' in features_dict:
+                self.fail(model_id, get_failure_reason(features_dict or {}, {}))
             else:
-                for model_id in working_model_ids:
-                    for this_features_dict in primitives_pop_dict[model_id]:
-                        features_pop_dict[model_id].update(this_features_dict)
-            del primitives_pop_dict
-            del temp_model_ids
-        if 'synchronize_func' in stage:
-            context.interface.synchronize(stage['synchronize_func'])
-    for get_objectives_func in context.get_objectives_funcs:
-        features_pop_list = [features_pop_dict[model_id] for model_id in working_model_ids]
-        result_pop_list = context.interface.map_sync(get_objectives_func, features_pop_list, working_model_ids,
-                                                [export] * len(working_model_ids))
-        del features_pop_list
-        temp_model_ids = list(working_model_ids)
-        for model_id, (this_features, this_objectives) in zip(temp_model_ids, result_pop_list):
+                model['features'].update(features_dict)
+                self.next_stage(model_id)
+        elif step == 'get_objectives':
+            this_features, this_objectives = results[0]
             if not this_objectives or 'failed' in this_objectives or 'failed' in this_features:
-                working_model_ids.remove(model_id)
+                self.finish(model_id, failed=True)
             else:
-                features_pop_dict[model_id].update(this_features)
-                objectives_pop_dict[model_id].update(this_objectives)
-        del result_pop_list
-        del temp_model_ids
-        if not working_model_ids:
-            if context.disp:
-                print('nested.optimize: all models failed to compute required features or objectives')
-                sys.stdout.flush()
-            break
-    sys.stdout.flush()
-    features_pop_list = [features_pop_dict[model_id] for model_id in orig_model_ids]
-    objectives_pop_list = [objectives_pop_dict[model_id] for model_id in orig_model_ids]
-    for reset_func in context.reset_worker_funcs:
-        context.interface.apply(reset_func)
+                model['features'].update(this_features)
+                model['objectives'].update(this_objectives)
+                self.submit_get_objectives(model_id, model['objectives_index'] + 1)
+        elif step == 'screen':
+            score = results[0]
+            if score is None:
+                self.finish(model_id, failed=True)
+                return
+            model['screen_score'] = score
+            if stage.get('screen_threshold', None) is not None and score > stage['screen_threshold']:
+                self.reject(model_id, model['stage'])
+                return
+            model['stage'] += 1
+            self.advance(model_id)
+        elif step == 'get_all_objectives':
+            this_features, this_objectives, failed = results[0]
+            if isinstance(this_objectives, np.ndarray):
+                model['rows'] = (this_features, this_objectives)
+            else:
+                model['features'].update(this_features)
+                model['objectives'].update(this_objectives)
+            self.finish(model_id, failed=failed)
 
-    return features_pop_list, objectives_pop_list
+    def cancel(self, async_result, reason=None):
+        """
+        One job in a group of compute_features jobs has failed. Cancel the remaining jobs for the same model, and remove
+        the model without waiting for the rest of the group to return.
+        :param async_result: :class:'AsyncResultWrapper'
+        :param reason: str; reason for failure
+        """
+        model_id, _, num_remaining = self.pop_pending(async_result)[:3]
+        self.interface.cancel(model_id)
+        self.num_cancelled += num_remaining
+        self.fail(model_id, reason)
+
+    def pop_pending(self, async_result):
+        """
+        Stop tracking a group of jobs, and cancel any duplicates of its straggling jobs that have not yet returned.
+        :param async_result: :class:'AsyncResultWrapper'
+        :return: list; [model_id, step, num_remaining, results, order, cost_keys, fused]
+        """
+        entry = self.pending.pop(async_result)
+        if self.tracked.pop(async_result, None) is not None:
+            self.interface.cancel((entry[0], 'duplicate'))
+            for duplicate, (original, _) in list(viewitems(self.duplicates)):
+                if original is async_result:
+                    del self.duplicates[duplicate]
+        if self.won_by_duplicate.pop(async_result, None):
+            # stragglers that lost to their duplicates are still running
+            self.interface.cancel(entry[0])
+        return entry
+
+    def fail(self, model_id, reason=None):
+        """
+        Remove a failed model. If a reason for failure is provided, it is recorded as the value of the key 'failed' in
+        the objectives of the model.
+        :param model_id: int or str
+        :param reason: str
+        """
+        if reason is not None:
+            self.models[model_id]['objectives']['failed'] = reason
+        self.finish(model_id, failed=True)
+
+    def finish(self, model_id, failed=False):
+        """
+        Remove a model from the pipeline. Failed models retain any features or objectives computed before failure. If
+        the final job of the model returned its features and objectives as arrays, the arrays are returned instead.
+        :param model_id: int or str
+        :param failed: bool
+        """
+        model = self.models.pop(model_id)
+        if 'rows' in model:
+            self.finished.append((model_id,) + model['rows'])
+        else:
+            self.finished.append((model_id, model['features'], model['objectives']))
+        if failed:
+            self.num_failed += 1
+        else:
+            self.num_succeeded += 1
+        self.check_barriers()
+
+    def check_barriers(self):
+        """
+        Release the first barrier once every active model has reached it.
+        """
+        if not self.waiting:
+            return
+        stage_index = min(self.waiting)
+        for model in viewvalues(self.models):
+            if model['stage'] < stage_index:
+                return
+        self.release_barrier(stage_index)
+
+    def release_barrier(self, stage_index):
+        """
+        Execute any synchronize or compute_features_shared functions associated with a barrier, then allow waiting
+        models to proceed.
+        :param stage_index: int
+        """
+        waiting_model_ids = sorted(self.waiting.pop(stage_index), key=lambda model_id: self.models[model_id]['order'])
+        if stage_index > 0 and 'synchronize_func' in self.stages[stage_index - 1]:
+            self.interface.synchronize(self.stages[stage_index - 1]['synchronize_func'])
+        if stage_index > 0 and 'screen_objectives_func' in self.stages[stage_index - 1] and \
+                self.stages[stage_index - 1].get('keep_fraction', None) is not None:
+            waiting_model_ids = self.screen(waiting_model_ids, stage_index - 1)
+        if stage_index < len(self.stages):
+            stage = self.stages[stage_index]
+            if 'compute_features_shared_func' in stage and 'shared_features' not in stage:
+                self.compute_shared_features(stage, self.models[waiting_model_ids[0]])
+        for model_id in waiting_model_ids:
+            self.models[model_id]['released'] = stage_index
+            self.advance(model_id)
+
+    def compute_shared_features(self, stage, model):
+        """
+        Features computed by a compute_features_shared function are computed once, and shared by all models. If a
+        SharedFeaturesStore is provided as context.shared_features_store, shared features computed by a previous run
+        with the same config file, source module, and stage arguments are loaded from file instead.
+        :param stage: dict
+        :param model: dict
+        """
+        if 'args' in stage or 'get_args_static_func' in stage:
+            task_args = self.get_static_args(stage)
+            args = stage['args']
+        elif 'get_args_dynamic_func' in stage:
+            args = self.interface.execute(stage['get_args_dynamic_func'], model['x'], model['features'])
+            task_args = args
+        else:
+            args = []
+            task_args = args
+        if self.shared_features_store is not None:
+            stored_shared_features = self.shared_features_store.get(stage, args)
+            if stored_shared_features is not None:
+                if self.context.disp:
+                    print('nested.optimize: loaded shared features computed by: %s from file: %s' %
+                          (stage['compute_features_shared'], self.shared_features_store.file_path))
+                    sys.stdout.flush()
+                stage['shared_features'] = stored_shared_features
+                return
+        if args:
+            group_size = len(args[0])
+        else:
+            group_size = 1
+        this_model_id = 'shared'
+        sequences = [[model['x']] * group_size] + list(task_args) + [[this_model_id] * group_size] + \
+                    [[self.export] * group_size]
+        primitives = self.interface.map_sync(stage['compute_features_shared_func'], *sequences,
+                                             chunksize=stage.get('chunksize', None))
+        for features_dict in primitives:
+            if not features_dict or 'failed' in features_dict:
+                raise RuntimeError('nested.optimize: compute_features_shared function: %s failed' %
+                                   stage['compute_features_shared_func'])
+        if 'filter_features_func' in stage:
+            this_shared_features = self.interface.execute(
+                stage['filter_features_func'], primitives, {}, this_model_id, self.export)
+            if not this_shared_features or 'failed' in this_shared_features:
+                raise RuntimeError('nested.optimize: shared filter_features function: %s failed' %
+                                   stage['filter_features_func'])
+        else:
+            this_shared_features = dict()
+            for features_dict in primitives:
+                this_shared_features.update(features_dict)
+        stage['shared_features'] = this_shared_features
+        if self.shared_features_store is not None:
+            self.shared_features_store.put(stage, args, this_shared_features)
+
+    def wait_any(self, timeout=None):
+        """
+        Process the results of submitted jobs as they complete, until at least one model has either finished or failed,
+        or until timeout (in seconds) has elapsed.
+        :param timeout: int or float
+        :return: list of tuple (model_id, dict, dict): (model_id, features, objectives)
+        """
+        time_stamp = time.time()
+        while not self.finished:
+            self.submit_batches()
+            if not self.pending:
+                break
+            wait_timeout = timeout
+            if self.poll_interval is not None:
+                if timeout is None:
+                    wait_timeout = self.poll_interval
+                else:
+                    wait_timeout = max(0., min(self.poll_interval, timeout - (time.time() - time_stamp)))
+            completed = self.interface.wait_any(list(self.pending.keys()) + list(self.duplicates.keys()),
+                                                timeout=wait_timeout)
+            if self.poll_interval is not None:
+                self.check_running_jobs()
+            if not completed:
+                if timeout is None and self.poll_interval is None:
+                    raise RuntimeError('nested.optimize: EvaluationPipeline: results for models: %s were not '
+                                       'returned' % [entry[0] for entry in viewvalues(self.pending)])
+                if timeout is not None and time.time() - time_stamp >= timeout:
+                    break
+                continue
+            for async_result, index, result in completed:
+                start_time = async_result.start_time(index)
+                if async_result in self.duplicates:
+                    async_result, index = self.duplicates.pop(async_result)
+                    if async_result not in self.pending or index in async_result.completed:
+                        continue
+                    self.won_by_duplicate[async_result].add(index)
+                    self.num_duplicates_won += 1
+                elif index in self.won_by_duplicate.get(async_result, ()):
+                    continue
+                if async_result not in self.pending:
+                    continue
+                entry = self.pending[async_result]
+                position = index
+                order, cost_keys = entry[4:6]
+                if order is not None:
+                    result, duration, worker = result
+                    index = order[index]
+                    self.record_duration(cost_keys[index], self.models[entry[0]]['x'], duration, worker)
+                elif start_time is not None:
+                    duration = time.time() - start_time
+                if async_result in self.tracked and (order is not None or start_time is not None):
+                    self.stage_durations[self.models[entry[0]]['stage']].append(duration)
+                entry[3][index] = result
+                entry[2] -= 1
+                if isinstance(result, JobFailure):
+                    self.num_exceptions += 1
+                    if entry[1] == 'compute_features_batch':
+                        for this_model_id in self.pop_pending(async_result)[0]:
+                            self.fail(this_model_id, str(result))
+                    else:
+                        self.cancel(async_result, str(result))
+                elif entry[2] == 0:
+                    model_id, step, _, results, _, _, fused = self.pop_pending(async_result)
+                    self.process(model_id, step, results, fused)
+                elif entry[1] == 'compute_features' and (not result or 'failed' in result):
+                    self.cancel(async_result, get_failure_reason(result or {}, {}))
+                elif async_result in self.tracked:
+                    self.cancel_duplicate(async_result, position)
+        finished = self.finished
+        self.finished = []
+        return finished
+
+    def record_duration(self, key, x, duration, worker):
+        """
+        Workers differ in speed, so the speed of each worker is measured against the duration predicted for each job,
+        and durations are recorded by the CostModel as if measured on the median worker (see get_worker_speeds).
+        :param key: tuple
+        :param x: array
+        :param duration: float
+        :param worker: str; name of the worker that executed the job
+        """
+        expected_duration = self.cost_model.predict(key, x)
+        if expected_duration is not None:
+            record_worker_speed(self.interface, worker, expected_duration, duration)
+        speed = get_worker_speeds(self.interface).get(worker, 1.)
+        self.cost_model.record(key, x, duration * speed)
+
+    def check_running_jobs(self):
+        """
+        Remove models with a compute_features job that has been running for longer than the timeout of its stage, and
+        submit duplicates of straggling compute_features jobs to idle workers.
+        """
+        now = time.time()
+        num_queued = sum(async_result.pending() for async_result in list(self.pending) + list(self.duplicates))
+        for async_result in list(self.tracked):
+            if async_result not in self.tracked:
+                # removed while handling a previous group
+                continue
+            model_id, _, _, results = self.pending[async_result][:4]
+            stage_index = self.models[model_id]['stage']
+            stage = self.stages[stage_index]
+            timeout = stage.get('timeout', None)
+            straggler_factor = stage.get('straggler_factor', None)
+            median_duration = None
+            if straggler_factor is not None:
+                median_duration = self.get_median_duration(stage_index)
+            for index in range(len(results)):
+                if index in async_result.completed or index in async_result.cancelled or \
+                        index in async_result.newly_completed or index in self.won_by_duplicate.get(async_result, ()):
+                    continue
+                start_time = async_result.start_time(index)
+                if start_time is None:
+                    continue
+                elapsed = now - start_time
+                if timeout is not None and elapsed > timeout:
+                    self.num_timed_out += 1
+                    self.cancel(async_result, 'timed out after %.1f s in stage %i' % (timeout, stage_index))
+                    break
+                if median_duration is not None and elapsed > straggler_factor * median_duration and \
+                        num_queued < self.interface.num_workers and not self.is_duplicated(async_result, index):
+                    self.submit_duplicate(async_result, index)
+                    num_queued += 1
+
+    def get_median_duration(self, stage_index):
+        """
+        Returns the median duration of recent compute_features jobs of a stage, or None if too few have completed.
+        :param stage_index: int
+        :return: float or None
+        """
+        durations = self.stage_durations[stage_index]
+        if len(durations) < 3:
+            return None
+        return float(np.median(list(durations)))
+
+    def is_duplicated(self, async_result, index):
+        """
+
+        :param async_result: :class:'AsyncResultWrapper'
+        :param index: int
+        :return: bool
+        """
+        return (async_result, index) in viewvalues(self.duplicates)
+
+    def submit_duplicate(self, async_result, index):
+        """
+        Submit a straggling job again. Duplicates are tagged separately from the jobs of their model, and are cancelled
+        once the group of the straggler is no longer pending.
+        :param async_result: :class:'AsyncResultWrapper'
+        :param index: int; position of the straggling job in its submitted group
+        """
+        model_id = self.pending[async_result][0]
+        func, sequences = self.tracked[async_result]
+        duplicate = self.interface.map_async(func, *[[sequence[index]] for sequence in sequences],
+                                             tag=(model_id, 'duplicate'), track_start=True,
+                                             notify=self.poll_interval is not None)
+        self.duplicates[duplicate] = (async_result, index)
+        self.num_duplicated += 1
+
+    def cancel_duplicate(self, async_result, index):
+        """
+        The original copy of a duplicated job returned first, so the duplicate is no longer needed.
+        :param async_result: :class:'AsyncResultWrapper'
+        :param index: int; position of the job in its submitted group
+        """
+        for duplicate, item in list(viewitems(self.duplicates)):
+            if item == (async_result, index):
+                duplicate.cancel()
+                del self.duplicates[duplicate]
+
+    def run(self, population, model_ids):
+        """
+        Evaluate a population of models, and return their features and objectives in the order of submission.
+        :param population: list of arr
+        :param model_ids: list
+        :return: tuple of list of dict
+        """
+        start_time = time.time()
+        submit_order = list(range(len(population)))
+        if self.cost_model is not None:
+            self.predicted_makespan = self.cost_model.predict_makespan(population, self.interface.num_workers,
+                                                                       get_worker_speeds(self.interface))
+            predicted = [self.cost_model.predict_total(x) for x in population]
+            submit_order.sort(key=lambda i: -predicted[i])
+        for i in submit_order:
+            self.submit(model_ids[i], population[i], advance=False)
+        for i in submit_order:
+            if model_ids[i] in self.models:
+                self.advance(model_ids[i])
+        features_pop_dict = {}
+        objectives_pop_dict = {}
+        while self.models or self.finished:
+            finished = self.wait_any()
+            if not finished and not self.pending:
+                raise RuntimeError('nested.optimize: EvaluationPipeline: results for models: %s were not returned' %
+                                   list(self.models.keys()))
+            for model_id, features, objectives in finished:
+                features_pop_dict[model_id] = features
+                objectives_pop_dict[model_id] = objectives
+        self.makespan = time.time() - start_time
+        if self.cost_model is not None:
+            self.cost_model.record_makespan(self.predicted_makespan, self.makespan)
+        features_pop_list = [features_pop_dict[model_id] for model_id in model_ids]
+        objectives_pop_list = [objectives_pop_dict[model_id] for model_id in model_ids]
+        return features_pop_list, objectives_pop_list
 
 
 if __name__ == '__main__':
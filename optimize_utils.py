@@ -3,14 +3,17 @@ Library of functions and classes to support nested.optimize
 """
 __author__ = 'Aaron D. Milstein, Grace Ng, and Prannath Moolchand'
 from nested.utils import *
-from nested.parallel import find_context, find_context_name
+from nested.parallel import find_context, find_context_name, resolve_object_handles, get_worker_name
 import collections
 from scipy._lib._util import check_random_state
 from copy import deepcopy
 import uuid
+import hashlib
 import warnings
 import shutil
+import socket
 import yaml
+import signal as os_signal  # scipy.signal is imported as signal by nested.utils
 
 
 class Individual(object):
@@ -33,6 +36,7 @@ class Individual(object):
         self.fitness = None
         self.survivor = False
         self.model_id = model_id
+        self.failure_reason = None  # str; recorded for failed models that were rejected for a specific reason
 
 
 class PopulationStorage(object):
@@ -90,6 +94,9 @@ class PopulationStorage(object):
             self.attributes = {}
             self.count = 0
             self.total_models = 0  # total_models != count
+            # features computed by compute_features_shared functions have the same value for every model
+            self.shared_feature_names = []
+            self.shared_features = []  # a list of array of float (or None), one per generation
 
     def append(self, population, survivors=None, specialists=None, prev_survivors=None,
                prev_specialists=None, failed=None, min_objectives=None, max_objectives=None, **kwargs):
@@ -129,6 +136,7 @@ class PopulationStorage(object):
         self.total_models += len(population)
         self.min_objectives.append(deepcopy(min_objectives))
         self.max_objectives.append(deepcopy(max_objectives))
+        self.shared_features.append(self.get_shared_features(population))
 
         for key in kwargs:
             if key not in self.attributes:
@@ -139,6 +147,31 @@ class PopulationStorage(object):
             else:
                 self.attributes[key].append(None)
 
+    def set_shared_feature_names(self, shared_feature_names):
+        """
+        Identify the features computed by compute_features_shared functions. The value of each shared feature is then
+        recorded once per generation, and is saved to file once per generation, rather than once per model.
+        :param shared_feature_names: list of str
+        """
+        for name in shared_feature_names:
+            if name not in self.feature_names:
+                raise ValueError('PopulationStorage: shared feature: %s is not in feature_names' % name)
+        self.shared_feature_names = [name for name in self.feature_names if name in shared_feature_names]
+
+    def get_shared_features(self, population):
+        """
+
+        :param population: list of :class:'Individual'
+        :return: array of float, or None
+        """
+        if not self.shared_feature_names:
+            return None
+        for individual in population:
+            if individual.features is not None:
+                return np.array([individual.features[self.feature_names.index(name)]
+                                 for name in self.shared_feature_names], dtype='float64')
+        return None
+
     def plot(self, subset=None, show_failed=False, mark_specialists=True, energy_scale='log', energy_color='relative'):
         """
 
@@ -861,6 +894,13 @@ class PopulationStorage(object):
                     for key in self.attributes:
                         set_h5py_attr(f[str(gen_index)].attrs, key, self.attributes[key][gen_index])
                     f[str(gen_index)].attrs['count'] = self.count
+                    shared_features = self.shared_features[gen_index] if gen_index < len(self.shared_features) \
+                        else None
+                    if shared_features is not None:
+                        set_h5py_attr(f[str(gen_index)].attrs, 'shared_feature_names', self.shared_feature_names)
+                        f[str(gen_index)].create_dataset('shared_features', data=shared_features)
+                        shared_indexes = [self.feature_names.index(name) for name in self.shared_feature_names]
+                        unshared_indexes = [i for i in range(len(self.feature_names)) if i not in shared_indexes]
                     if self.min_objectives[gen_index] is not None and len(self.min_objectives[gen_index]) > 0 and \
                             self.max_objectives[gen_index] is not None and len(self.max_objectives[gen_index]) > 0:
                         f[str(gen_index)].create_dataset(
@@ -883,6 +923,9 @@ class PopulationStorage(object):
                             f[str(gen_index)][group_name][str(i)].attrs['id'] = None2nan(individual.model_id)
                             f[str(gen_index)][group_name][str(i)].create_dataset(
                                 'x', data=[None2nan(val) for val in individual.x], compression='gzip')
+                            if group_name == 'failed' and getattr(individual, 'failure_reason', None) is not None:
+                                set_h5py_attr(f[str(gen_index)][group_name][str(i)].attrs, 'failure_reason',
+                                              individual.failure_reason)
                             if group_name != 'failed':
                                 f[str(gen_index)][group_name][str(i)].attrs['energy'] = None2nan(individual.energy)
                                 f[str(gen_index)][group_name][str(i)].attrs['rank'] = None2nan(individual.rank)
@@ -893,9 +936,13 @@ class PopulationStorage(object):
                                 f[str(gen_index)][group_name][str(i)].attrs['survivor'] = \
                                     None2nan(individual.survivor)
                                 if individual.features is not None:
+                                    features = [None2nan(val) for val in individual.features]
+                                    if shared_features is not None and \
+                                            np.array_equal(np.array(features)[shared_indexes], shared_features):
+                                        # shared features are expanded on read (see read_stored_features)
+                                        features = [features[index] for index in unshared_indexes]
                                     f[str(gen_index)][group_name][str(i)].create_dataset(
-                                        'features', data=[None2nan(val) for val in individual.features],
-                                        compression='gzip')
+                                        'features', data=features, compression='gzip')
                                 if individual.objectives is not None:
                                     f[str(gen_index)][group_name][str(i)].create_dataset(
                                         'objectives', data=[None2nan(val) for val in individual.objectives],
@@ -928,6 +975,8 @@ class PopulationStorage(object):
         self.failed = []  # a list of populations (some may be empty)
         self.min_objectives = []  # list of array of float
         self.max_objectives = []  # list of array of float
+        self.shared_feature_names = []
+        self.shared_features = []  # a list of array of float (or None), one per generation
         self.attributes = {}  # a dict containing lists of user specified attributes
         with h5py.File(file_path, 'r') as f:
             self.param_names = list(get_h5py_attr(f.attrs, 'param_names'))
@@ -952,6 +1001,12 @@ class PopulationStorage(object):
                     self.max_objectives.append(f[str(gen_index)]['max_objectives'][:])
                 else:
                     self.max_objectives.append([])
+                if 'shared_features' in f[str(gen_index)]:
+                    self.shared_feature_names = \
+                        list(get_h5py_attr(f[str(gen_index)].attrs, 'shared_feature_names'))
+                    self.shared_features.append(f[str(gen_index)]['shared_features'][:])
+                else:
+                    self.shared_features.append(None)
                 history, survivors, specialists, prev_survivors, prev_specialists, failed = [], [], [], [], [], []
                 for group_name, population in \
                         zip(['population', 'survivors', 'specialists', 'prev_survivors', 'prev_specialists', 'failed'],
@@ -963,9 +1018,12 @@ class PopulationStorage(object):
                         indiv_data = group[str(i)]
                         model_id = nan2None(indiv_data.attrs['id'])
                         individual = Individual(indiv_data['x'][:], model_id=model_id)
+                        if 'failure_reason' in indiv_data.attrs:
+                            individual.failure_reason = str(get_h5py_attr(indiv_data.attrs, 'failure_reason'))
                         if group_name != 'failed':
                             if 'features' in indiv_data:
-                                individual.features = indiv_data['features'][:]
+                                individual.features = \
+                                    read_stored_features(f[str(gen_index)], indiv_data, self.feature_names)
                             if 'objectives' in indiv_data:
                                 individual.objectives = indiv_data['objectives'][:]
                             if 'normalized_objectives' in indiv_data:
@@ -993,6 +1051,29 @@ class PopulationStorage(object):
             assign_relative_energy(this_population)
 
 
+def read_stored_features(gen_group, indiv_data, feature_names):
+    """
+    Read the features of a model saved to file by PopulationStorage. The values of shared features are stored once
+    per generation group, and are omitted from the features of each model that shares them. They are inserted back
+    into the array of features on read.
+    :param gen_group: :class:'h5py.Group'
+    :param indiv_data: :class:'h5py.Group'
+    :param feature_names: list of str
+    :return: array
+    """
+    features = indiv_data['features'][:]
+    if 'shared_features' not in gen_group or len(features) == len(feature_names):
+        return features
+    shared_feature_names = list(get_h5py_attr(gen_group.attrs, 'shared_feature_names'))
+    shared_features = gen_group['shared_features'][:]
+    shared = np.array([name in shared_feature_names for name in feature_names])
+    expanded = np.empty(len(feature_names))
+    expanded[shared] = [shared_features[shared_feature_names.index(name)]
+                        for name in feature_names if name in shared_feature_names]
+    expanded[~shared] = features
+    return expanded
+
+
 class RelativeBoundedStep(object):
     """
     Step-taking method for use with PopulationAnnealing. Steps each parameter within specified absolute and/or relative
@@ -1342,6 +1423,58 @@ class RelativeBoundedStep(object):
         return True
 
 
+class FailurePredictor(object):
+    """
+    Predicts the probability that a model will fail to compute its required features or objectives, from the outcomes
+    of previously evaluated models. Parameters are normalized by their bounds, and the predicted probability of failure
+    is the fraction of failed models among the num_neighbors nearest evaluated models. The training set is updated
+    incrementally with each generation, and only the most recent max_size models are retained.
+    """
+
+    def __init__(self, xmin, xmax, num_neighbors=10, max_size=10000):
+        """
+
+        :param xmin: array
+        :param xmax: array
+        :param num_neighbors: int
+        :param max_size: int
+        """
+        self.xmin = np.array(xmin, dtype='float64')
+        x_range = np.subtract(xmax, xmin).astype('float64')
+        x_range[x_range == 0.] = 1.
+        self.x_range = x_range
+        self.num_neighbors = int(num_neighbors)
+        self.max_size = int(max_size)
+        self.x = np.empty((0, len(self.xmin)))
+        self.failed = np.empty(0, dtype=bool)
+
+    def update(self, population, failed):
+        """
+
+        :param population: list of :class:'Individual'; successfully evaluated models
+        :param failed: list of :class:'Individual'
+        """
+        individuals = list(population) + list(failed)
+        if not individuals:
+            return
+        x = np.array([(individual.x - self.xmin) / self.x_range for individual in individuals])
+        self.x = np.append(self.x, x, axis=0)[-self.max_size:]
+        self.failed = np.append(self.failed, [False] * len(population) + [True] * len(failed))[-self.max_size:]
+
+    def predict(self, x):
+        """
+        Until any failed models have been observed, the predicted probability of failure is zero.
+        :param x: array
+        :return: float in [0., 1.]
+        """
+        if not np.any(self.failed):
+            return 0.
+        distances = np.sum(np.square(self.x - (np.array(x) - self.xmin) / self.x_range), axis=1)
+        num_neighbors = min(self.num_neighbors, len(distances))
+        nearest = np.argpartition(distances, num_neighbors - 1)[:num_neighbors]
+        return float(np.mean(self.failed[nearest]))
+
+
 class PopulationAnnealing(object):
     """
     This class is inspired by scipy.optimize.basinhopping. It provides a generator interface to produce a list of
@@ -1355,7 +1488,8 @@ class PopulationAnnealing(object):
                  rel_bounds=None, wrap_bounds=False, take_step=None, evaluate=None, select=None, seed=None,
                  normalize='global', max_iter=50, path_length=3, initial_step_size=0.5, adaptive_step_factor=0.9,
                  survival_rate=0.2, diversity_rate=0.05, fitness_range=2, disp=False, hot_start=False,
-                 storage_file_path=None, specialists_survive=True, **kwargs):
+                 storage_file_path=None, specialists_survive=True, speculate=False, predict_failures=False,
+                 failure_threshold=0.5, failure_neighbors=10, max_resamples=10, **kwargs):
         """
         :param param_names: list of str
         :param feature_names: list of str
@@ -1381,6 +1515,13 @@ class PopulationAnnealing(object):
         :param hot_start: bool
         :param storage_file_path: str (path)
         :param specialists_survive: bool; whether to include specialists as survivors
+        :param speculate: bool; whether idle workers evaluate speculative children during the tail of each generation
+        (see speculate and nested.optimize.optimize_speculative)
+        :param predict_failures: bool; whether to resample steps that a FailurePredictor trained on the history of
+        evaluated models predicts are likely to fail (see get_step)
+        :param failure_threshold: float in [0., 1.]; steps with a higher predicted probability of failure are resampled
+        :param failure_neighbors: int; number of nearest evaluated models used to predict failure
+        :param max_resamples: int; maximum number of times a step is resampled
         :param kwargs: dict of additional options, catches generator-specific options that do not apply
         """
         if x0 is None:
@@ -1484,6 +1625,21 @@ class PopulationAnnealing(object):
         self.fitness_range = int(fitness_range)
         self.disp = disp
         self.specialists_survive = specialists_survive
+        self.speculate = speculate in [True, 'True', 'true']
+        self.speculative_children = {}  # parent model_id: list of tuple (array, str): (x, speculative model_id)
+        self.speculative_map = {}  # model_id in the current generation: speculative model_id it reuses
+        self.speculative_count = 0
+        self.provisional_parents = (None, [])  # tuple (number of finished models, list of :class:'Individual')
+        self.failure_threshold = float(failure_threshold)
+        self.max_resamples = int(max_resamples)
+        self.num_resampled = 0
+        if predict_failures in [True, 'True', 'true']:
+            self.failure_predictor = FailurePredictor(self.xmin, self.xmax, num_neighbors=int(failure_neighbors))
+            if hot_start:
+                for population, failed in zip(self.storage.history, self.storage.failed):
+                    self.failure_predictor.update(population, failed)
+        else:
+            self.failure_predictor = None
         self.local_time = time.time()
 
     def __call__(self):
@@ -1494,6 +1650,7 @@ class PopulationAnnealing(object):
         self.start_time = time.time()
         self.local_time = self.start_time
         while self.num_gen < self.max_gens:
+            self.speculative_map = {}
             if self.num_gen == 0:
                 self.init_population()
             elif not self.objectives_stored:
@@ -1503,6 +1660,8 @@ class PopulationAnnealing(object):
                 self.step_survivors()
             else:
                 self.step_population()
+            self.speculative_children = {}
+            self.provisional_parents = (None, [])
             self.objectives_stored = False
             if self.disp:
                 print('PopulationAnnealing: Gen %i, yielding parameters for population size %i' %
@@ -1529,24 +1688,31 @@ class PopulationAnnealing(object):
         :param features: list of dict
         :param objectives: list of dict
         """
+        self.update_population_array(*get_population_array(features, objectives, self.storage.feature_names,
+                                                            self.storage.objective_names))
+
+    def update_population_array(self, population_array, failure_reasons=None):
+        """
+        Expects a structured array of features and objectives (see get_population_dtype), with rows in the same order as
+        the list of parameter arrays yielded from the current generation.
+        :param population_array: structured array
+        :param failure_reasons: list of str or None
+        """
         filtered_population = []
         failed = []
-        for i, objective_dict in enumerate(objectives):
-            feature_dict = features[i]
-            if not isinstance(objective_dict, dict):
-                raise TypeError('PopulationAnnealing.update_population: objectives must be a list of dict')
-            if not isinstance(feature_dict, dict):
-                raise TypeError('PopulationAnnealing.update_population: features must be a list of dict')
-            if not (all(key in objective_dict for key in self.storage.objective_names) and
-                    all(key in feature_dict for key in self.storage.feature_names)):
+        features_matrix = population_array['features']
+        objectives_matrix = population_array['objectives']
+        for i, this_failed in enumerate(population_array['failed']):
+            if this_failed:
+                if failure_reasons is not None:
+                    self.population[i].failure_reason = failure_reasons[i]
                 failed.append(self.population[i])
             else:
-                this_objectives = np.array([objective_dict[key] for key in self.storage.objective_names])
-                self.population[i].objectives = this_objectives
-                this_features = np.array([feature_dict[key] for key in self.storage.feature_names])
-                self.population[i].features = this_features
+                self.population[i].objectives = np.array(objectives_matrix[i])
+                self.population[i].features = np.array(features_matrix[i])
                 filtered_population.append(self.population[i])
         self.population = filtered_population
+        self.update_failure_predictor(self.population, failed)
         self.storage.append(self.population, prev_survivors=self.prev_survivors,
                             prev_specialists=self.prev_specialists, failed=failed,
                             step_size=self.take_step.stepsize)
@@ -1605,6 +1771,48 @@ class PopulationAnnealing(object):
             unique_candidates.extend(self.storage.history[-i])
         return unique_candidates
 
+    def get_step(self, x, **kwargs):
+        """
+        Take a step from x. If a FailurePredictor is used, a step with a predicted probability of failure above
+        failure_threshold is resampled up to max_resamples times, and the step with the lowest predicted probability of
+        failure is returned.
+        :param x: array
+        :param kwargs: dict; passed to take_step
+        :return: array
+        """
+        new_x = self.take_step(x, **kwargs)
+        if self.failure_predictor is None:
+            return new_x
+        probability = self.failure_predictor.predict(new_x)
+        num_resamples = 0
+        while probability > self.failure_threshold and num_resamples < self.max_resamples:
+            this_x = self.take_step(x, **kwargs)
+            this_probability = self.failure_predictor.predict(this_x)
+            if this_probability < probability:
+                new_x, probability = this_x, this_probability
+            num_resamples += 1
+        self.num_resampled += num_resamples
+        return new_x
+
+    def update_failure_predictor(self, population, failed):
+        """
+        Compare the failure rate predicted for the most recently evaluated models to the realized failure rate, then add
+        them to the training set of the FailurePredictor.
+        :param population: list of :class:'Individual'; successfully evaluated models
+        :param failed: list of :class:'Individual'
+        """
+        if self.failure_predictor is None:
+            return
+        num_models = len(population) + len(failed)
+        if num_models > 0 and self.disp:
+            predicted = np.mean([self.failure_predictor.predict(individual.x)
+                                 for individual in list(population) + list(failed)])
+            print('%s: Gen %i, predicted failure rate: %.3f; realized failure rate: %.3f; resampled %i steps' %
+                  (self.__class__.__name__, self.num_gen, predicted, float(len(failed)) / num_models,
+                   self.num_resampled))
+        self.num_resampled = 0
+        self.failure_predictor.update(population, failed)
+
     def init_population(self):
         """
         """
@@ -1615,7 +1823,7 @@ class PopulationAnnealing(object):
             pop_size -= 1
             self.count += 1
         for i in range(pop_size):
-            self.population.append(Individual(self.take_step(self.x0, stepsize=1., wrap=True), model_id=self.count))
+            self.population.append(Individual(self.get_step(self.x0, stepsize=1., wrap=True), model_id=self.count))
             self.count += 1
 
     def step_survivors(self):
@@ -1641,9 +1849,7 @@ class PopulationAnnealing(object):
             for individual in group:
                 individual.survivor = False
             for i in range(self.pop_size):
-                individual = Individual(self.take_step(group[i % group_size].x), model_id=self.count)
-                new_population.append(individual)
-                self.count += 1
+                new_population.append(self.get_child(group[i % group_size]))
             self.population = new_population
         self.survivors = []
         self.specialists = []
@@ -1657,11 +1863,274 @@ class PopulationAnnealing(object):
         else:
             new_population = []
             for i in range(self.pop_size):
-                individual = Individual(self.take_step(self.population[i % this_pop_size].x), model_id=self.count)
-                new_population.append(individual)
-                self.count += 1
+                new_population.append(self.get_child(self.population[i % this_pop_size]))
             self.population = new_population
 
+    def get_child(self, parent):
+        """
+        Take a step from a parent. If a speculative child of the same parent has already been generated, it is used
+        instead, and the speculative model_id is recorded in speculative_map so that its evaluation can be reused.
+        :param parent: :class:'Individual'
+        :return: :class:'Individual'
+        """
+        if self.speculative_children.get(parent.model_id, None):
+            x, speculative_id = self.speculative_children[parent.model_id].pop(0)
+            individual = Individual(x, model_id=self.count)
+            self.speculative_map[individual.model_id] = speculative_id
+        else:
+            individual = Individual(self.get_step(parent.x), model_id=self.count)
+        self.count += 1
+        return individual
+
+    def speculate(self, features, objectives, num_candidates):
+        """
+        Used by nested.optimize.optimize_speculative to occupy idle workers during the tail of a generation. Children
+        are generated from the provisional parents of the next generation, ranked from the models of the current
+        generation that have finished so far. If a provisional parent is then selected as a parent of the next
+        generation, its speculative children are used in place of new steps (see get_child). At most pop_size
+        speculative children are generated per generation.
+        :param features: dict; {model_id: dict} for the finished models of the current generation
+        :param objectives: dict; {model_id: dict}
+        :param num_candidates: int
+        :return: list of tuple (array, str): (x, speculative model_id)
+        """
+        num_children = sum(len(children) for children in viewvalues(self.speculative_children))
+        num_candidates = min(num_candidates, self.pop_size - num_children)
+        if num_candidates <= 0 or self.num_gen + 1 >= self.max_gens:
+            return []
+        parents = self.get_provisional_parents(features, objectives)
+        if not parents:
+            return []
+        if (self.num_gen + 1) % self.path_length == 0:
+            stepsize = self.take_step.stepsize * self.adaptive_step_factor
+        else:
+            stepsize = self.take_step.stepsize
+        candidates = []
+        for i in range(num_children, num_children + num_candidates):
+            parent = parents[i % len(parents)]
+            x = self.get_step(parent.x, stepsize=stepsize)
+            speculative_id = 'speculative_%i' % self.speculative_count
+            self.speculative_count += 1
+            self.speculative_children.setdefault(parent.model_id, []).append((x, speculative_id))
+            candidates.append((x, speculative_id))
+        return candidates
+
+    def get_provisional_parents(self, features, objectives):
+        """
+        Returns the parents that would seed the next generation if the current generation contained only the models
+        that have finished so far. If the next generation begins a new iteration, survivors (and specialists) are
+        selected as in update_population, from copies of the candidate models.
+        :param features: dict; {model_id: dict}
+        :param objectives: dict; {model_id: dict}
+        :return: list of :class:'Individual'
+        """
+        if self.provisional_parents[0] == len(objectives):
+            return self.provisional_parents[1]
+        finished = []
+        for individual in self.population:
+            model_id = individual.model_id
+            if model_id not in objectives or \
+                    not (all(key in objectives[model_id] for key in self.storage.objective_names) and
+                         all(key in features[model_id] for key in self.storage.feature_names)):
+                continue
+            this_individual = Individual(individual.x, model_id=model_id)
+            this_individual.objectives = np.array([objectives[model_id][key] for key in self.storage.objective_names])
+            this_individual.features = np.array([features[model_id][key] for key in self.storage.feature_names])
+            finished.append(this_individual)
+        if (self.num_gen + 1) % self.path_length != 0 or not finished:
+            parents = finished
+        else:
+            if self.path_length > 1:
+                candidates = list(self.storage.prev_survivors[-(self.path_length - 1)])
+                if self.specialists_survive:
+                    candidates.extend(self.storage.prev_specialists[-(self.path_length - 1)])
+                history = self.storage.history[-(self.path_length - 1):]
+            else:
+                candidates = list(self.prev_survivors)
+                if self.specialists_survive:
+                    candidates.extend(self.prev_specialists)
+                history = []
+            unique_model_ids = set()
+            unique_candidates = []
+            for indiv in candidates:
+                if indiv.model_id not in unique_model_ids:
+                    unique_model_ids.add(indiv.model_id)
+                    unique_candidates.append(indiv)
+            for population in history:
+                unique_candidates.extend(population)
+            candidates = deepcopy(unique_candidates) + finished
+            min_objectives, max_objectives = \
+                get_objectives_edges(candidates, min_objectives=self.min_objectives,
+                                     max_objectives=self.max_objectives, normalize=self.normalize)
+            self.evaluate(candidates, min_objectives=min_objectives, max_objectives=max_objectives)
+            parents = self.select(candidates, self.num_survivors, self.num_diversity_survivors,
+                                  fitness_range=self.fitness_range, disp=False)
+            if self.specialists_survive:
+                parents = list(parents) + get_specialists(candidates)
+        self.provisional_parents = (len(objectives), parents)
+        return parents
+
+
+class SteadyStatePopulationAnnealing(PopulationAnnealing):
+    """
+    An asynchronous, steady-state variant of PopulationAnnealing. Rather than yielding a whole generation at once, a new
+    candidate is generated by taking a step from the current survivors whenever a slot to evaluate a model becomes
+    available (see nested.optimize.optimize_steady_state). Every pop_size completed models are recorded in
+    PopulationStorage as one generation, after which survivors are selected from a rolling window that contains the
+    current survivors and the most recent path_length generations. The step_size is reduced every path_length
+    generations.
+    """
+    steady_state = True
+
+    def __init__(self, num_in_flight=None, **kwargs):
+        """
+        :param num_in_flight: int; number of models to evaluate concurrently; default is num_workers * max group_size
+        :param kwargs: dict; see PopulationAnnealing
+        """
+        super(SteadyStatePopulationAnnealing, self).__init__(**kwargs)
+        if num_in_flight is not None:
+            num_in_flight = int(num_in_flight)
+        self.num_in_flight = num_in_flight
+        self.in_flight = {}  # model_id: :class:'Individual'
+        self.completed = []  # evaluated models not yet appended to storage
+        self.failed = []  # failed models not yet appended to storage
+        self.num_issued = self.num_gen * self.pop_size
+        self.parent_index = 0
+        self.start_time = time.time()
+        if 0 < self.num_gen < self.max_gens and self.num_gen % self.path_length == 0:
+            # after a hot start, the stored step_size precedes the reduction at the end of the last stored generation
+            self.take_step.stepsize *= self.adaptive_step_factor
+
+    def __call__(self):
+        raise RuntimeError('SteadyStatePopulationAnnealing: candidates must be generated with ask() and evaluated '
+                           'results returned with tell()')
+
+    def ask(self):
+        """
+        Generate a new candidate, unless enough candidates have already been generated to complete max_gens
+        generations.
+        :return: tuple of (array, int): (x, model_id), or None
+        """
+        if self.num_issued >= self.max_gens * self.pop_size:
+            return None
+        if not self.survivors:
+            if self.x0 is not None and self.count == 0:
+                x = self.x0
+            else:
+                x = self.get_step(self.x0, stepsize=1., wrap=True)
+        else:
+            group = list(self.survivors)
+            if self.specialists_survive:
+                group.extend(self.specialists)
+            x = self.get_step(group[self.parent_index % len(group)].x)
+            self.parent_index += 1
+        individual = Individual(x, model_id=self.count)
+        self.in_flight[individual.model_id] = individual
+        self.count += 1
+        self.num_issued += 1
+        return individual.x, individual.model_id
+
+    def tell(self, model_id, features, objectives):
+        """
+        Record the features and objectives of a completed model. Once pop_size models have completed, they are stored as
+        one generation, and survivors are selected.
+        :param model_id: int
+        :param features: dict
+        :param objectives: dict
+        """
+        individual = self.in_flight.pop(model_id)
+        if not (all(key in objectives for key in self.storage.objective_names) and
+                all(key in features for key in self.storage.feature_names)):
+            individual.failure_reason = get_failure_reason(features, objectives)
+            self.failed.append(individual)
+        else:
+            individual.objectives = np.array([objectives[key] for key in self.storage.objective_names])
+            individual.features = np.array([features[key] for key in self.storage.feature_names])
+            self.completed.append(individual)
+        if len(self.completed) + len(self.failed) >= self.pop_size:
+            self.update_generation()
+
+    def update_generation(self):
+        """
+        Append the most recently completed pop_size models to storage as one generation, and select survivors from the
+        rolling window of candidates.
+        """
+        self.population = self.completed
+        failed = self.failed
+        self.completed = []
+        self.failed = []
+        self.prev_survivors = deepcopy(self.survivors)
+        self.prev_specialists = deepcopy(self.specialists)
+        self.update_failure_predictor(self.population, failed)
+        self.storage.append(self.population, prev_survivors=self.prev_survivors,
+                            prev_specialists=self.prev_specialists, failed=failed, step_size=self.take_step.stepsize)
+        # model_ids of models still in flight must not be reused after a hot start
+        self.storage.count = self.count
+        if self.disp:
+            print('SteadyStatePopulationAnnealing: Gen %i, computing features for population size %i took %.2f s; %i '
+                  'individuals failed' % (self.num_gen, len(self.population), time.time() - self.local_time,
+                                          len(failed)))
+        self.local_time = time.time()
+        candidates = self.get_candidates()
+        if len(candidates) > 0:
+            self.min_objectives, self.max_objectives = \
+                get_objectives_edges(candidates, min_objectives=self.min_objectives,
+                                     max_objectives=self.max_objectives, normalize=self.normalize)
+            self.evaluate(candidates, min_objectives=self.min_objectives, max_objectives=self.max_objectives)
+            self.specialists = get_specialists(candidates)
+            self.survivors = \
+                self.select(candidates, self.num_survivors, self.num_diversity_survivors,
+                            fitness_range=self.fitness_range, disp=self.disp)
+            for individual in candidates:
+                individual.survivor = False
+            for individual in self.survivors:
+                individual.survivor = True
+            if self.specialists_survive:
+                for individual in self.specialists:
+                    individual.survivor = True
+            self.storage.survivors[-1] = deepcopy(self.survivors)
+            self.storage.specialists[-1] = deepcopy(self.specialists)
+            self.storage.min_objectives[-1] = deepcopy(self.min_objectives)
+            self.storage.max_objectives[-1] = deepcopy(self.max_objectives)
+            if self.disp:
+                print('SteadyStatePopulationAnnealing: Gen %i, evaluating rolling window of %i candidates took %.2f s' %
+                      (self.num_gen, len(candidates), time.time() - self.local_time))
+        if self.storage_file_path is not None:
+            self.storage.save(self.storage_file_path, n=1)
+        self.objectives_stored = True
+        self.num_gen += 1
+        if self.num_gen % self.path_length == 0 and self.num_gen < self.max_gens:
+            new_step_size = self.take_step.stepsize * self.adaptive_step_factor
+            if self.disp:
+                print('SteadyStatePopulationAnnealing: Gen %i, previous step_size: %.3f, new step_size: %.3f' %
+                      (self.num_gen, self.take_step.stepsize, new_step_size))
+            self.take_step.stepsize = new_step_size
+        if self.disp and self.num_gen == self.max_gens:
+            print('SteadyStatePopulationAnnealing: %i generations took %.2f s' %
+                  (self.max_gens, time.time() - self.start_time))
+        self.local_time = time.time()
+        sys.stdout.flush()
+
+    def get_candidates(self):
+        """
+        The rolling window of candidates contains the current survivors and specialists, and the most recent path_length
+        generations.
+        :return: list of :class:'Individual'
+        """
+        candidates = list(self.survivors)
+        if self.specialists_survive:
+            candidates.extend(self.specialists)
+        for i in range(1, min(self.path_length, len(self.storage.history)) + 1):
+            candidates.extend(self.storage.history[-i])
+        # remove duplicates
+        unique_model_ids = set()
+        unique_candidates = []
+        for indiv in candidates:
+            if indiv.model_id not in unique_model_ids:
+                unique_model_ids.add(indiv.model_id)
+                unique_candidates.append(indiv)
+        return unique_candidates
+
 
 class Pregenerated(object):
     def __init__(self, param_names=None, feature_names=None, objective_names=None, hot_start=False,
@@ -1778,22 +2247,33 @@ class Pregenerated(object):
                   list(self.curr_gid_range)
 
     def update_population(self, features, objectives):
+        """
+
+        :param features: list of dict
+        :param objectives: list of dict
+        """
+        self.update_population_array(*get_population_array(features, objectives, self.storage.feature_names,
+                                                            self.storage.objective_names))
+
+    def update_population_array(self, population_array, failure_reasons=None):
+        """
+        Expects a structured array of features and objectives (see get_population_dtype), with rows in the same order as
+        the current population.
+        :param population_array: structured array
+        :param failure_reasons: list of str or None
+        """
         filtered_population = []
         failed = []
-        for i, objective_dict in enumerate(objectives):
-            feature_dict = features[i]
-            if not isinstance(objective_dict, dict):
-                raise TypeError('Pregenerated.update_population: objectives must be a list of dict')
-            if not isinstance(feature_dict, dict):
-                raise TypeError('Pregenerated.update_population: features must be a list of dict')
-            if not (all(key in objective_dict for key in self.storage.objective_names) and
-                    all(key in feature_dict for key in self.storage.feature_names)):
+        features_matrix = population_array['features']
+        objectives_matrix = population_array['objectives']
+        for i, this_failed in enumerate(population_array['failed']):
+            if this_failed:
+                if failure_reasons is not None:
+                    self.population[i].failure_reason = failure_reasons[i]
                 failed.append(self.population[i])
             else:
-                this_objectives = np.array([objective_dict[key] for key in self.storage.objective_names])
-                self.population[i].objectives = this_objectives
-                this_features = np.array([feature_dict[key] for key in self.storage.feature_names])
-                self.population[i].features = this_features
+                self.population[i].objectives = np.array(objectives_matrix[i])
+                self.population[i].features = np.array(features_matrix[i])
                 filtered_population.append(self.population[i])
         self.population = filtered_population
         self.storage.append(self.population, prev_survivors=self.prev_survivors,
@@ -1983,6 +2463,1008 @@ class Sobol(Pregenerated):
         return self.num_points // (2 * len(self.param_names) + 2)
 
 
+def get_failure_reason(features, objectives):
+    """
+    A model is marked as failed by a dict of features or objectives that contains the key 'failed'. If the value of
+    that key is a str, it is returned as the reason for failure.
+    :param features: dict
+    :param objectives: dict
+    :return: str or None
+    """
+    for this_dict in [objectives, features]:
+        reason = this_dict.get('failed', None)
+        if isinstance(reason, basestring):
+            return str(reason)
+    return None
+
+
+def get_population_dtype(feature_names, objective_names):
+    """
+    Returns the dtype of a structured array that holds the features and objectives of a population, with one row per
+    model. The 'features' and 'objectives' fields are ordered by feature_names and objective_names, so that for an array
+    of n models, population_array['features'] is a matrix of shape (n, len(feature_names)).
+    :param feature_names: list of str
+    :param objective_names: list of str
+    :return: :class:'np.dtype'
+    """
+    return np.dtype([('features', float, (len(feature_names),)), ('objectives', float, (len(objective_names),)),
+                     ('failed', bool)])
+
+
+def get_rows(features, objectives, feature_names, objective_names):
+    """
+    Returns the features and objectives of a model as arrays ordered by feature_names and objective_names, or None if
+    any feature or objective is missing.
+    :param features: dict
+    :param objectives: dict
+    :param feature_names: list of str
+    :param objective_names: list of str
+    :return: tuple of array, or None
+    """
+    if not (all(key in objectives for key in objective_names) and all(key in features for key in feature_names)):
+        return None
+    return np.array([features[key] for key in feature_names], dtype=float), \
+           np.array([objectives[key] for key in objective_names], dtype=float)
+
+
+def get_population_array(features, objectives, feature_names, objective_names):
+    """
+    Assembles the features and objectives of a population into a structured array (see get_population_dtype). The
+    results for each model are provided either as dicts, or as rows already ordered by feature_names and objective_names
+    (see get_all_objectives). A model that is missing any feature or objective is marked as failed.
+    :param features: list of dict or array
+    :param objectives: list of dict or array
+    :param feature_names: list of str
+    :param objective_names: list of str
+    :return: tuple (structured array, list of str or None): (population_array, reason for failure of each model)
+    """
+    population_array = np.zeros(len(objectives), dtype=get_population_dtype(feature_names, objective_names))
+    failure_reasons = [None] * len(objectives)
+    for i, (this_features, this_objectives) in enumerate(zip(features, objectives)):
+        if isinstance(this_objectives, np.ndarray):
+            rows = this_features, this_objectives
+        elif not isinstance(this_objectives, dict):
+            raise TypeError('nested.optimize_utils: get_population_array: objectives must be a list of dict or array')
+        elif not isinstance(this_features, dict):
+            raise TypeError('nested.optimize_utils: get_population_array: features must be a list of dict or array')
+        else:
+            rows = get_rows(this_features, this_objectives, feature_names, objective_names)
+        if rows is None:
+            population_array['failed'][i] = True
+            failure_reasons[i] = get_failure_reason(this_features, this_objectives)
+        else:
+            population_array['features'][i], population_array['objectives'][i] = rows
+    return population_array, failure_reasons
+
+
+class EvaluationCache(object):
+    """
+    Persistent on-disk cache of the features and objectives computed for each model by evaluate_population. Each model
+    is keyed by a hash of its parameter array, the contents of the config file, the contents of the source modules that
+    compute features and objectives, and any extra arguments passed to the sources, so that cached results are
+    invalidated when any of these change. Entries are stored in an .hdf5 file. When the number of entries exceeds
+    max_size, the least recently used entries are evicted. Entries stored with put(flush=False) are held in memory,
+    and are available to get, until they are written to file together by flush. Only models that succeeded are
+    cached, since a model can fail for reasons that do not depend only on its parameters (e.g. a timeout, an Exception
+    caught on a worker, or screening relative to the rest of its population).
+    """
+
+    def __init__(self, file_path, config_file_path=None, sources=None, max_size=None, kwargs=None):
+        """
+
+        :param file_path: str (path)
+        :param config_file_path: str (path)
+        :param sources: list of str; names of source modules
+        :param max_size: int; maximum number of cached models
+        :param kwargs: dict; extra arguments passed to the source modules
+        """
+        self.file_path = file_path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.namespace = get_source_hash(config_file_path, sources, kwargs)
+        self.last_access = {}  # key: float; time of most recent read or write
+        self.touched = set()  # keys with last_access not yet written to file
+        self.buffer = {}  # key: tuple of dict (features, objectives); entries not yet written to file
+        if os.path.isfile(self.file_path):
+            with h5py.File(self.file_path, 'r') as f:
+                for key, group in viewitems(f):
+                    self.last_access[key] = group.attrs['last_access']
+
+    def get_key(self, x):
+        """
+
+        :param x: array
+        :return: str
+        """
+        hasher = hashlib.sha1(self.namespace.encode())
+        hasher.update(np.ascontiguousarray(x, dtype='float64').tobytes())
+        return hasher.hexdigest()
+
+    def get(self, population):
+        """
+        Return the cached features and objectives for each model in a population, or None for models that have not been
+        cached.
+        :param population: list of array
+        :return: list of tuple of dict: (features, objectives), or None
+        """
+        results = []
+        keys = [self.get_key(x) for x in population]
+        f = None
+        try:
+            for key in keys:
+                if key not in self.last_access:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                self.hits += 1
+                self.last_access[key] = time.time()
+                self.touched.add(key)
+                if key in self.buffer:
+                    features, objectives = self.buffer[key]
+                    results.append((dict(features), dict(objectives)))
+                    continue
+                if f is None:
+                    f = h5py.File(self.file_path, 'r')
+                features = {name: get_h5py_attr(f[key]['features'].attrs, name)
+                            for name in f[key]['features'].attrs}
+                objectives = {name: get_h5py_attr(f[key]['objectives'].attrs, name)
+                              for name in f[key]['objectives'].attrs}
+                results.append((features, objectives))
+        finally:
+            if f is not None:
+                f.close()
+        return results
+
+    def put(self, population, features, objectives, flush=True):
+        """
+        Store the features and objectives computed for each model in a population. Failed models are not cached. Unless
+        flush is False, the entries are written to file immediately (see flush).
+        :param population: list of array
+        :param features: list of dict
+        :param objectives: list of dict
+        :param flush: bool
+        """
+        for x, this_features, this_objectives in zip(population, features, objectives):
+            if not this_features or not this_objectives or 'failed' in this_features or 'failed' in this_objectives:
+                continue
+            key = self.get_key(x)
+            self.buffer[key] = (dict(this_features), dict(this_objectives))
+            self.last_access[key] = time.time()
+            self.touched.add(key)
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all entries stored since the last flush to file, then evict the least recently used entries if the cache
+        exceeds max_size. Models with feature or objective values that cannot be stored as .hdf5 attributes are not
+        cached.
+        """
+        if not self.buffer and not self.touched:
+            return
+        with h5py.File(self.file_path, 'a') as f:
+            for key, (this_features, this_objectives) in viewitems(self.buffer):
+                if key in f:
+                    del f[key]
+                group = f.create_group(key)
+                try:
+                    for name, this_dict in [('features', this_features), ('objectives', this_objectives)]:
+                        sub_group = group.create_group(name)
+                        for item_name, val in viewitems(this_dict):
+                            set_h5py_attr(sub_group.attrs, item_name, val)
+                except (TypeError, ValueError):
+                    del f[key]
+                    self.last_access.pop(key, None)
+            self.buffer.clear()
+            for key in self.touched:
+                if key in f:
+                    f[key].attrs['last_access'] = self.last_access[key]
+            self.touched.clear()
+            if self.max_size is not None and len(self.last_access) > self.max_size:
+                expired = sorted(self.last_access, key=lambda key: self.last_access[key])
+                for key in expired[:len(self.last_access) - self.max_size]:
+                    del f[key]
+                    del self.last_access[key]
+
+    def report(self):
+        """
+
+        :return: str
+        """
+        return 'evaluation cache: %i hits; %i misses; %i models stored in file: %s' % \
+               (self.hits, self.misses, len(self.last_access), self.file_path)
+
+
+class SharedFeaturesStore(object):
+    """
+    Persistent on-disk storage of the features computed by compute_features_shared functions, so that they do not need
+    to be recomputed when nested.optimize or nested.analyze is run again. Shared features are keyed by a hash of the
+    contents of the config file and the source module, any extra arguments passed to the sources, the name of the
+    compute_features_shared function, and the arguments provided to it by the stage.
+    """
+
+    def __init__(self, file_path, config_file_path=None, kwargs=None):
+        """
+
+        :param file_path: str (path)
+        :param config_file_path: str (path)
+        :param kwargs: dict; extra arguments passed to the source modules
+        """
+        self.file_path = file_path
+        self.namespace = get_source_hash(config_file_path, kwargs=kwargs)
+
+    def get_key(self, stage, args):
+        """
+
+        :param stage: dict
+        :param args: list of list
+        :return: str
+        """
+        hasher = hashlib.sha1(self.namespace.encode())
+        hasher.update(get_source_hash(sources=[stage['source']]).encode())
+        hasher.update(stage['compute_features_shared'].encode())
+        if 'filter_features' in stage and stage['filter_features'] is not None:
+            hasher.update(stage['filter_features'].encode())
+        hasher.update(pickle.dumps(args, 2))
+        return hasher.hexdigest()
+
+    def get(self, stage, args):
+        """
+        Return previously stored shared features, or None.
+        :param stage: dict
+        :param args: list of list
+        :return: dict
+        """
+        if not os.path.isfile(self.file_path):
+            return None
+        key = self.get_key(stage, args)
+        with h5py.File(self.file_path, 'r') as f:
+            if key not in f:
+                return None
+            return {name: get_h5py_attr(f[key].attrs, name) for name in f[key].attrs}
+
+    def put(self, stage, args, shared_features):
+        """
+        Shared features with values that cannot be stored as .hdf5 attributes are not stored.
+        :param stage: dict
+        :param args: list of list
+        :param shared_features: dict
+        :return: bool; whether the shared features were stored
+        """
+        key = self.get_key(stage, args)
+        with h5py.File(self.file_path, 'a') as f:
+            if key in f:
+                del f[key]
+            group = f.create_group(key)
+            try:
+                for name, val in viewitems(shared_features):
+                    set_h5py_attr(group.attrs, name, val)
+            except (TypeError, ValueError):
+                del f[key]
+                return False
+        return True
+
+
+def get_hdf5_paths(source):
+    """
+    Returns the paths of all groups and datasets in an .hdf5 file, or the paths stored in a dataset of str by
+    set_hdf5_paths.
+    :param source: str (path to .hdf5 file), or :class:'h5py.File', or :class:'h5py.Dataset'
+    :return: list of str
+    """
+    if isinstance(source, h5py.Dataset):
+        return [path.decode() if isinstance(path, bytes) else str(path) for path in source[:]]
+    if isinstance(source, basestring):
+        if not os.path.isfile(source):
+            return []
+        with h5py.File(source, 'r') as f:
+            return get_hdf5_paths(f)
+    paths = []
+    source.visit(paths.append)
+    return paths
+
+
+def set_hdf5_paths(group, key, paths):
+    """
+    Stores a list of paths as a dataset of str, replacing any existing dataset.
+    :param group: :class:'h5py.File' or :class:'h5py.Group'
+    :param key: str
+    :param paths: list of str
+    """
+    if key in group:
+        del group[key]
+    group.create_dataset(key, data=np.array(sorted(paths), dtype=object), dtype=h5py.special_dtype(vlen=str))
+
+
+class AnalysisResultsTable(object):
+    """
+    Compact on-disk table of the parameters, features and objectives of the models evaluated by nested.analyze, with
+    one row per model. Rows are appended to resizable datasets in an .hdf5 file as each batch of models completes, so
+    that results do not accumulate in memory, and so that a partially completed analysis can be resumed by skipping the
+    model_ids already stored in the table.
+    Data exported by each batch is merged into an export file before the batch is appended to the table. The table also
+    records the paths of all groups and datasets in the export file after each completed batch, and marks a merge as
+    pending while it is in progress (see begin_export). If an analysis is interrupted between the merge and the append,
+    rollback_export removes the partially merged batch from the export file, so that it is not exported twice when the
+    batch is evaluated again.
+    """
+
+    def __init__(self, file_path, param_names, feature_names, objective_names, resume=False):
+        """
+
+        :param file_path: str (path)
+        :param param_names: list of str
+        :param feature_names: list of str
+        :param objective_names: list of str
+        :param resume: bool; whether to append to an existing table
+        """
+        self.file_path = file_path
+        self.param_names = list(param_names)
+        self.feature_names = list(feature_names)
+        self.objective_names = list(objective_names)
+        self.model_ids = {}  # model_id: int; row of each stored model
+        if os.path.isfile(self.file_path):
+            if not resume:
+                raise RuntimeError('AnalysisResultsTable: file_path: %s already exists; provide a different '
+                                   'file_path, or resume the previous analysis' % self.file_path)
+            with h5py.File(self.file_path, 'r') as f:
+                for key, names in [('param_names', self.param_names), ('feature_names', self.feature_names),
+                                   ('objective_names', self.objective_names)]:
+                    if key not in f.attrs or list(get_h5py_attr(f.attrs, key)) != names:
+                        raise RuntimeError('AnalysisResultsTable: %s stored in file_path: %s do not match the current '
+                                           'configuration' % (key, self.file_path))
+                for row, model_id in enumerate(f['model_id'][:]):
+                    self.model_ids[int(model_id)] = row
+        else:
+            with h5py.File(self.file_path, 'w') as f:
+                for key, names in [('param_names', self.param_names), ('feature_names', self.feature_names),
+                                   ('objective_names', self.objective_names)]:
+                    set_h5py_attr(f.attrs, key, names)
+                f.create_dataset('model_id', shape=(0,), maxshape=(None,), dtype='int64')
+                for key, names in [('x', self.param_names), ('features', self.feature_names),
+                                   ('objectives', self.objective_names)]:
+                    f.create_dataset(key, shape=(0, len(names)), maxshape=(None, len(names)), dtype='float64',
+                                     chunks=True)
+                f.create_dataset('failed', shape=(0,), maxshape=(None,), dtype=bool)
+                f.create_dataset('failure_reason', shape=(0,), maxshape=(None,), dtype=h5py.special_dtype(vlen=str))
+
+    def __len__(self):
+        return len(self.model_ids)
+
+    def __contains__(self, model_id):
+        return int(model_id) in self.model_ids
+
+    def check(self, param_arrays, model_ids):
+        """
+        When resuming, verify that stored models were evaluated with the same parameters as currently requested.
+        :param param_arrays: list of array
+        :param model_ids: list of int
+        """
+        stored = [(i, self.model_ids[int(model_id)]) for i, model_id in enumerate(model_ids) if model_id in self]
+        if not stored:
+            return
+        with h5py.File(self.file_path, 'r') as f:
+            x = f['x'][:]
+        for i, row in stored:
+            if not np.allclose(x[row], param_arrays[i], equal_nan=True):
+                raise RuntimeError('AnalysisResultsTable: parameters of model_id: %i stored in file_path: %s do not '
+                                   'match the requested model' % (model_ids[i], self.file_path))
+
+    def begin_export(self, export_file_path):
+        """
+        Called before the data exported by a batch is merged into the export file.
+        :param export_file_path: str (path)
+        """
+        with h5py.File(self.file_path, 'a') as f:
+            if 'export_paths' not in f:
+                set_hdf5_paths(f, 'export_paths', get_hdf5_paths(export_file_path))
+            f.attrs['export_pending'] = True
+
+    def rollback_export(self, export_file_path):
+        """
+        If a previous analysis was interrupted after data exported by a batch was merged into the export file, but
+        before the batch was appended to the table, the groups and datasets added by that merge are removed.
+        :param export_file_path: str (path)
+        :return: int; number of removed groups and datasets
+        """
+        with h5py.File(self.file_path, 'r') as f:
+            if not f.attrs.get('export_pending', False):
+                return 0
+            stored_paths = set(get_hdf5_paths(f['export_paths']))
+        removed = []
+        if os.path.isfile(export_file_path):
+            with h5py.File(export_file_path, 'a') as f:
+                for path in get_hdf5_paths(f):
+                    parent = path.rsplit('/', 1)[0] if '/' in path else None
+                    if path not in stored_paths and (parent is None or parent in stored_paths):
+                        removed.append(path)
+                for path in removed:
+                    del f[path]
+        with h5py.File(self.file_path, 'a') as f:
+            f.attrs['export_pending'] = False
+        return len(removed)
+
+    def append(self, param_arrays, model_ids, population_array, failure_reasons, export_file_path=None):
+        """
+        Features and objectives of failed models are stored as nan. If data exported by this batch has been merged into
+        export_file_path, the paths stored in the export file are recorded, and the merge is marked as complete.
+        :param param_arrays: list of array
+        :param model_ids: list of int
+        :param population_array: structured array (see get_population_dtype)
+        :param failure_reasons: list of str or None
+        :param export_file_path: str (path)
+        """
+        num_models = len(model_ids)
+        if num_models < 1:
+            return
+        features = np.array(population_array['features'], dtype='float64')
+        objectives = np.array(population_array['objectives'], dtype='float64')
+        features[population_array['failed']] = np.nan
+        objectives[population_array['failed']] = np.nan
+        with h5py.File(self.file_path, 'a') as f:
+            start = f['model_id'].shape[0]
+            end = start + num_models
+            for key in ['model_id', 'x', 'features', 'objectives', 'failed', 'failure_reason']:
+                f[key].resize(end, axis=0)
+            f['model_id'][start:end] = model_ids
+            f['x'][start:end] = np.array(param_arrays, dtype='float64')
+            f['features'][start:end] = features
+            f['objectives'][start:end] = objectives
+            f['failed'][start:end] = population_array['failed']
+            f['failure_reason'][start:end] = ['' if reason is None else str(reason) for reason in failure_reasons]
+            if export_file_path is not None:
+                set_hdf5_paths(f, 'export_paths', get_hdf5_paths(export_file_path))
+                f.attrs['export_pending'] = False
+        for i, model_id in enumerate(model_ids):
+            self.model_ids[int(model_id)] = start + i
+
+
+def get_source_hash(config_file_path=None, sources=None, kwargs=None):
+    """
+    Returns a hash of the contents of a config file, of the files that contain the specified source modules, and of any
+    extra arguments passed to the sources (e.g. from the command line). Used to invalidate stored results when the
+    configuration or the source code of an optimization changes.
+    :param config_file_path: str (path)
+    :param sources: list of str; names of imported source modules
+    :param kwargs: dict
+    :return: str
+    """
+    hasher = hashlib.sha1()
+    if config_file_path is not None:
+        with open(config_file_path, 'rb') as f:
+            hasher.update(f.read())
+    if kwargs:
+        hasher.update(repr(sorted((str(key), repr(val)) for key, val in viewitems(kwargs))).encode())
+    if sources is not None:
+        for source in sorted(sources):
+            hasher.update(source.encode())
+            source_path = getattr(sys.modules.get(source), '__file__', None)
+            if source_path is not None:
+                if source_path.endswith('.pyc'):
+                    source_path = source_path[:-1]
+                if os.path.isfile(source_path):
+                    with open(source_path, 'rb') as f:
+                        hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+
+class CostModel(object):
+    """
+    Records the measured durations of the jobs submitted by EvaluationPipeline, and predicts the durations of future
+    jobs. Jobs are indexed by a key (step, stage index, group index). By default, the predicted duration of a job is the
+    mean of its recorded durations, which is maintained as a running sum. If param_dependent, once enough durations
+    have been recorded for a key, the predicted duration is instead a least squares linear fit of duration as a
+    function of the parameter array. The fit is computed when first needed, and only recomputed once refit_interval
+    more durations have been recorded for that key.
+    """
+
+    def __init__(self, param_dependent=False, max_samples=1000, refit_interval=10):
+        """
+
+        :param param_dependent: bool
+        :param max_samples: int; maximum number of recent durations retained for each key
+        :param refit_interval: int; number of new durations recorded for a key before its linear fit is recomputed
+        """
+        self.param_dependent = param_dependent
+        self.max_samples = max_samples
+        self.refit_interval = refit_interval
+        self.samples = {}  # key: deque of tuple (array, float)
+        self.duration_sums = {}  # key: sum of the durations retained in samples
+        self.num_recorded = defaultdict(int)  # key: total number of durations recorded
+        self.fits = {}  # key: tuple (array of coefficients, num_recorded when the fit was computed)
+        # tuple of float: (predicted, measured) duration of each population evaluated by EvaluationPipeline.run; the
+        # predicted duration is None until any job durations have been recorded
+        self.makespans = []
+
+    def record(self, key, x, duration):
+        """
+
+        :param key: tuple
+        :param x: array
+        :param duration: float
+        """
+        duration = float(duration)
+        if key not in self.samples:
+            self.samples[key] = collections.deque(maxlen=self.max_samples)
+            self.duration_sums[key] = 0.
+        samples = self.samples[key]
+        if len(samples) == samples.maxlen:
+            self.duration_sums[key] -= samples[0][1]
+        samples.append((np.array(x, dtype=float), duration))
+        self.duration_sums[key] += duration
+        self.num_recorded[key] += 1
+
+    def predict(self, key, x):
+        """
+        Returns the predicted duration of a job, or None if no duration has been recorded for its key.
+        :param key: tuple
+        :param x: array
+        :return: float
+        """
+        if key not in self.samples:
+            return None
+        samples = self.samples[key]
+        if not self.param_dependent or len(samples) < 2 * (len(x) + 1):
+            return max(0., self.duration_sums[key] / len(samples))
+        if key not in self.fits or self.num_recorded[key] - self.fits[key][1] >= self.refit_interval:
+            A = np.array([np.append(this_x, 1.) for this_x, _ in samples])
+            durations = np.array([duration for _, duration in samples])
+            self.fits[key] = (np.linalg.lstsq(A, durations, rcond=-1)[0], self.num_recorded[key])
+        return max(0., float(np.dot(np.append(np.array(x, dtype=float), 1.), self.fits[key][0])))
+
+    def predict_total(self, x):
+        """
+        Returns the predicted sum of the durations of all jobs required to evaluate a model.
+        :param x: array
+        :return: float
+        """
+        return sum(self.predict(key, x) for key in self.samples)
+
+    def predict_makespan(self, population, num_workers, worker_speeds=None):
+        """
+        Returns a lower bound on the time required to evaluate a population of models: the greater of the total
+        predicted duration of all jobs divided across the available workers, and the longest predicted chain of
+        dependent jobs for any single model (the sum across steps of the longest job in each group). If the relative
+        speeds of the workers are provided, the total is divided across their combined speed, and the longest chain is
+        executed by the fastest worker. Returns None if no durations have been recorded.
+        :param population: list of array
+        :param num_workers: int
+        :param worker_speeds: dict: {worker name: float}; relative speed of each measured worker
+        :return: float
+        """
+        if not self.samples or not len(population):
+            return None
+        total = 0.
+        longest_chain = 0.
+        for x in population:
+            group_durations = defaultdict(float)  # (step, stage index): duration of the longest job in the group
+            for key in self.samples:
+                duration = self.predict(key, x)
+                total += duration
+                group_durations[key[:2]] = max(group_durations[key[:2]], duration)
+            longest_chain = max(longest_chain, sum(viewvalues(group_durations)))
+        if not worker_speeds:
+            return max(total / max(1, num_workers), longest_chain)
+        capacity = sum(viewvalues(worker_speeds)) + max(0, num_workers - len(worker_speeds))
+        return max(total / capacity, longest_chain / max(1., max(viewvalues(worker_speeds))))
+
+    def record_makespan(self, predicted, measured):
+        """
+
+        :param predicted: float or None
+        :param measured: float
+        """
+        self.makespans.append((predicted, measured))
+
+    def report(self):
+        """
+
+        :return: str
+        """
+        predicted = [(this_predicted, measured) for this_predicted, measured in self.makespans
+                     if this_predicted is not None and measured > 0.]
+        report = 'cost model: %i populations evaluated in %.1f s' % \
+                 (len(self.makespans), sum(measured for _, measured in self.makespans))
+        if predicted:
+            report += '; mean ratio of predicted to measured duration: %.2f' % \
+                      np.mean([this_predicted / measured for this_predicted, measured in predicted])
+        return report
+
+
+def compute_and_filter_features(compute_features_func, filter_features_func, x, args, current_features, model_id,
+                                export=False):
+    """
+    Used by EvaluationPipeline for stages that specify "filter_on_worker: True". The whole group of compute_features
+    jobs for one model is computed on a single worker, and the resulting primitives are filtered on the same worker, so
+    that only the filtered features are returned to the controller. Stops at the first member of the group that fails.
+    If no filter_features function is specified, the primitives are merged into a single dict.
+    :param compute_features_func: callable
+    :param filter_features_func: callable or None
+    :param x: array
+    :param args: list of list; one sequence per argument, each with one item per member of the group
+    :param current_features: dict
+    :param model_id: int or str
+    :param export: bool
+    :return: dict
+    """
+    args = [resolve_object_handles(sequence) for sequence in args]
+    if args:
+        group_size = len(args[0])
+    else:
+        group_size = 1
+    primitives = []
+    for i in range(group_size):
+        these_args = [x] + [sequence[i] for sequence in args] + [model_id, export]
+        features_dict = compute_features_func(*these_args)
+        if not features_dict or 'failed' in features_dict:
+            return features_dict
+        primitives.append(features_dict)
+    if filter_features_func is not None:
+        return filter_features_func(primitives, current_features, model_id, export)
+    features = dict()
+    for features_dict in primitives:
+        features.update(features_dict)
+    return features
+
+
+def get_all_objectives(get_objectives_funcs, features, model_id, export=False, names=None):
+    """
+    Used by EvaluationPipeline to evaluate all get_objectives functions for one model in a single job. Each function
+    receives the features returned by the functions before it. Stops at the first function that fails. Returns only the
+    features added by the get_objectives functions, and the objectives computed before any failure. If names are
+    provided and no function failed, instead returns all features and objectives of the model as arrays (see get_rows),
+    so that the controller does not need to assemble them from dicts.
+    :param get_objectives_funcs: list of callable
+    :param features: dict
+    :param model_id: int or str
+    :param export: bool
+    :param names: tuple of list of str: (feature_names, objective_names)
+    :return: tuple (dict or array, dict or array, bool): (features, objectives, failed)
+    """
+    features = dict(features)
+    new_features = dict()
+    objectives = dict()
+    for get_objectives_func in get_objectives_funcs:
+        this_features, this_objectives = get_objectives_func(features, model_id, export)
+        if not this_objectives or 'failed' in this_objectives or 'failed' in this_features:
+            return new_features, objectives, True
+        features.update(this_features)
+        new_features.update(this_features)
+        objectives.update(this_objectives)
+    if names is not None:
+        rows = get_rows(features, objectives, *names)
+        if rows is not None:
+            return rows[0], rows[1], False
+    return new_features, objectives, False
+
+
+def compute_features_and_objectives(func, get_objectives_funcs, names, current_features, *args):
+    """
+    Used by EvaluationPipeline to evaluate all get_objectives functions for one model in the same job as the last job
+    of its final stage. The last two arguments to func are the model_id and the export flag.
+    :param func: callable; compute_features, filter_features, or compute_and_filter_features
+    :param get_objectives_funcs: list of callable
+    :param names: tuple of list of str: (feature_names, objective_names), or None (see get_all_objectives)
+    :param current_features: dict; features computed by previous stages
+    :param args: list; arguments to func
+    :return: tuple (dict, tuple): features returned by func, and the result of get_all_objectives, or None if func
+    failed
+    """
+    features_dict = func(*args)
+    if not features_dict or 'failed' in features_dict:
+        return features_dict, None
+    features = dict(current_features)
+    features.update(features_dict)
+    model_id, export = args[-2:]
+    return features_dict, get_all_objectives(get_objectives_funcs, features, model_id, export, names)
+
+
+class TimedCall(object):
+    """
+    Wraps a function so that each call returns a tuple (result, duration in seconds, worker name). Used by
+    EvaluationPipeline to measure the duration of jobs on the workers, and the speed of each worker. Instances that wrap
+    the same function compare equal, so that the parallel interfaces can track the durations of chunked jobs by
+    function.
+    """
+
+    def __init__(self, func):
+        """
+
+        :param func: callable
+        """
+        self.func = func
+
+    def __call__(self, *args):
+        start_time = time.time()
+        result = self.func(*args)
+        return result, time.time() - start_time, get_worker_name()
+
+    def __eq__(self, other):
+        return isinstance(other, TimedCall) and self.func == other.func
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((TimedCall, self.func))
+
+
+class TaskTimeout(Exception):
+    """
+    Raised on a worker when a job wrapped by TimeLimitedCall exceeds its time limit.
+    """
+    pass
+
+
+def get_worker_subworld_comm(local_context=None):
+    """
+    Executed on a worker. Returns the communicator shared by all ranks of a ParallelContextInterface worker subworld,
+    which execute each job together, or None if each worker is a single process.
+    :param local_context: :class:'Context'
+    :return: :class:'MPI.Comm' or None
+    """
+    if local_context is None:
+        local_context = find_context()
+    if 'interface' in local_context() and getattr(local_context.interface, 'procs_per_worker', 1) > 1:
+        return local_context.interface.comm
+    return None
+
+
+def raise_task_timeout(signum, frame):
+    """
+    Signal handler used by TimeLimitedCall.
+    :param signum: int
+    :param frame: frame
+    """
+    raise TaskTimeout()
+
+
+class TimeLimitedCall(object):
+    """
+    Wraps a compute_features function so that a call that runs for longer than timeout (in seconds) is interrupted on
+    the worker, and returns a features dict that marks the model as failed, which frees the worker for the next job.
+    The time limit is enforced with SIGALRM, so it is only armed where that signal is available, and when called from
+    the main thread of a worker. Code that does not return control to the python interpreter (e.g. a single call into a
+    compiled simulator) is only interrupted once it does. EvaluationPipeline also enforces the timeout from the
+    controller for jobs whose start time is known.
+    The ranks of a ParallelContextInterface worker subworld exchange messages while executing a job, and a rank that is
+    interrupted on its own would leave the others blocked in a collective operation, so the time limit is not armed on
+    workers with procs_per_worker > 1. Jobs executed by a subworld are only timed out by the controller, and the
+    subworld remains occupied until the job returns.
+    """
+
+    def __init__(self, func, timeout):
+        """
+
+        :param func: callable
+        :param timeout: float
+        """
+        self.func = func
+        self.timeout = float(timeout)
+
+    def __call__(self, *args):
+        if not hasattr(os_signal, 'setitimer') or get_worker_subworld_comm() is not None:
+            return self.func(*args)
+        try:
+            previous_handler = os_signal.signal(os_signal.SIGALRM, raise_task_timeout)
+        except ValueError:
+            # signal handlers can only be set in the main thread
+            return self.func(*args)
+        os_signal.setitimer(os_signal.ITIMER_REAL, self.timeout)
+        try:
+            return self.func(*args)
+        except TaskTimeout:
+            return {'failed': 'timed out after %.1f s' % self.timeout}
+        finally:
+            os_signal.setitimer(os_signal.ITIMER_REAL, 0)
+            os_signal.signal(os_signal.SIGALRM, previous_handler)
+
+    def __eq__(self, other):
+        return isinstance(other, TimeLimitedCall) and self.func == other.func and self.timeout == other.timeout
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((TimeLimitedCall, self.func, self.timeout))
+
+
+class JobFailure(object):
+    """
+    Returned in place of the result of a job wrapped by FailSafeCall that raised an Exception on a worker. Records the
+    type and message of the Exception, the formatted traceback, and the process that raised it.
+    """
+
+    def __init__(self, exc_type, message, formatted_traceback, pid=None):
+        """
+
+        :param exc_type: str; name of the Exception class
+        :param message: str
+        :param formatted_traceback: str
+        :param pid: int
+        """
+        self.exc_type = exc_type
+        self.message = message
+        self.traceback = formatted_traceback
+        self.pid = pid
+
+    def __str__(self):
+        return 'raised %s: %s on process: %s\n%s' % (self.exc_type, self.message, self.pid, self.traceback)
+
+
+class FailSafeCall(object):
+    """
+    Wraps a function executed remotely for a single model, so that an Exception raised on a worker is returned as a
+    JobFailure instead of stopping the parallel interface. EvaluationPipeline then removes the model as failed, and
+    records the error text as its reason for failure.
+    Only the root rank of a ParallelContextInterface worker subworld returns a result to the controller, so with
+    procs_per_worker > 1, the ranks of the subworld share their status once the job returns, and all ranks return the
+    first JobFailure, if any rank raised an Exception. A rank that raises while the others are blocked in a collective
+    operation with it cannot be recovered this way.
+    """
+
+    def __init__(self, func):
+        """
+
+        :param func: callable
+        """
+        self.func = func
+
+    def __call__(self, *args):
+        failure = None
+        try:
+            result = self.func(*args)
+        except Exception as e:
+            formatted_traceback = traceback.format_exc()
+            print('nested: Exception occurred on process: %i; model marked as failed' % os.getpid())
+            print(formatted_traceback)
+            sys.stdout.flush()
+            failure = JobFailure(type(e).__name__, str(e), formatted_traceback, pid=os.getpid())
+            result = None
+        comm = get_worker_subworld_comm()
+        if comm is not None:
+            failures = [this_failure for this_failure in comm.allgather(failure) if this_failure is not None]
+            failure = failures[0] if failures else None
+        if failure is not None:
+            return failure
+        return result
+
+    def __eq__(self, other):
+        return isinstance(other, FailSafeCall) and self.func == other.func
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((FailSafeCall, self.func))
+
+
+class RecyclingCall(object):
+    """
+    Wraps a function executed remotely, so that before each job, a worker that has executed max_tasks jobs since it was
+    last initialized, or that has grown beyond max_rss MB of resident memory, is first recycled (see
+    check_worker_recycle). The parallel interfaces cannot replace a single worker process, so the worker is drained and
+    re-initialized in place, and the job then runs as usual. Instances that wrap the same function with the same limits
+    compare equal, so that the parallel interfaces can track the durations of chunked jobs by function.
+    """
+
+    def __init__(self, func, max_tasks=None, max_rss=None):
+        """
+
+        :param func: callable
+        :param max_tasks: int
+        :param max_rss: float (MB)
+        """
+        self.func = func
+        self.max_tasks = max_tasks
+        self.max_rss = max_rss
+
+    def __call__(self, *args):
+        check_worker_recycle(self.max_tasks, self.max_rss)
+        return self.func(*args)
+
+    def __eq__(self, other):
+        return isinstance(other, RecyclingCall) and self.func == other.func and \
+               self.max_tasks == other.max_tasks and self.max_rss == other.max_rss
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((RecyclingCall, self.func, self.max_tasks, self.max_rss))
+
+
+def get_worker_rss():
+    """
+    Returns the current resident memory of this process in MB, or None if it cannot be measured on this platform.
+    :return: float
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            num_pages = int(f.read().split()[1])
+        return float(num_pages * os.sysconf('SC_PAGE_SIZE')) / 1024. ** 2
+    except (IOError, OSError, ValueError, IndexError):
+        return None
+
+
+def check_worker_recycle(max_tasks=None, max_rss=None, local_context=None):
+    """
+    Executed on a worker before each job wrapped by RecyclingCall. Once the worker has executed max_tasks jobs since it
+    was last initialized, or its resident memory exceeds max_rss MB, it is recycled (see recycle_worker_context) before
+    the job starts. All ranks of a ParallelContextInterface worker subworld execute each job, and are recycled together.
+    If recycling does not bring the resident memory of a worker back below max_rss (memory leaked by compiled
+    extensions is often not released until the process exits), that worker is no longer recycled based on memory.
+    :param max_tasks: int
+    :param max_rss: float (MB)
+    :param local_context: :class:'Context'
+    """
+    if local_context is None:
+        local_context = find_context()
+    if 'num_tasks_since_recycle' not in local_context():
+        local_context.num_tasks_since_recycle = 0
+        local_context.num_worker_recycles = 0
+        local_context.recycle_on_rss = True
+    reason = None
+    if max_tasks is not None and local_context.num_tasks_since_recycle >= max_tasks:
+        reason = 'after %i jobs' % local_context.num_tasks_since_recycle
+    elif max_rss is not None and local_context.recycle_on_rss:
+        rss = get_worker_rss()
+        if rss is not None and rss > max_rss:
+            reason = 'with %.1f MB resident memory' % rss
+    comm = get_worker_subworld_comm(local_context)
+    if comm is not None:
+        reasons = [this_reason for this_reason in comm.allgather(reason) if this_reason is not None]
+        reason = reasons[0] if reasons else None
+    if reason is not None:
+        start_time = time.time()
+        recycle_worker_context(local_context)
+        disp = 'disp' in local_context() and local_context.disp
+        if disp:
+            print('nested: worker %s recycled %s; took %.1f s' % (get_worker_name(), reason, time.time() - start_time))
+        if max_rss is not None and local_context.recycle_on_rss:
+            rss = get_worker_rss()
+            if rss is not None and rss > max_rss:
+                local_context.recycle_on_rss = False
+                print('nested: worker %s still has %.1f MB resident memory after being recycled; it will no longer '
+                      'be recycled based on memory' % (get_worker_name(), rss))
+        sys.stdout.flush()
+    local_context.num_tasks_since_recycle += 1
+
+
+def recycle_worker_context(local_context=None):
+    """
+    Re-initializes a worker in place. Each source may define a recycle_worker function, which is called first to
+    release any state accumulated by previous jobs. init_worker_contexts is then executed again with its original
+    arguments, which executes the config_worker function of each source again. Data already exported by the worker
+    remains in its temp output file. config_synchronize functions are collective operations across all workers, and
+    cannot be executed by a single worker; a source that depends on them should restore that state in recycle_worker.
+    :param local_context: :class:'Context'
+    """
+    if local_context is None:
+        local_context = find_context()
+    for source in local_context.sources:
+        m = importlib.import_module(source)
+        if hasattr(m, 'recycle_worker'):
+            recycle_func = getattr(m, 'recycle_worker')
+            if not isinstance(recycle_func, collections.Callable):
+                raise Exception('nested.optimize: recycle_worker for source: %s is not a callable function.' % source)
+            recycle_func()
+    temp_output_path = local_context.temp_output_path
+    temp_output_dir = local_context.temp_output_dir if 'temp_output_dir' in local_context() else None
+    init_worker_contexts(local_context.sources, local_context.update_context_funcs, local_context.param_names,
+                         local_context.default_params, local_context.feature_names, local_context.objective_names,
+                         local_context.target_val, local_context.target_range, local_context.output_dir,
+                         local_context.disp, optimization_title=local_context.optimization_title,
+                         label=local_context.label, temp_output_dir=temp_output_dir, **local_context.kwargs)
+    local_context.temp_output_path = temp_output_path
+    # model state that depends on the parameters must be rebuilt by the next job (see update_source_contexts)
+    local_context.x_array_updated = None
+    local_context.num_tasks_since_recycle = 0
+    local_context.num_worker_recycles += 1
+
+
 class OptimizationReport(object):
     """
     Convenience object to browse optimization results.
@@ -2022,7 +3504,8 @@ class OptimizationReport(object):
                     indiv_data = group[str(i)]
                     model_id = nan2None(indiv_data.attrs['id'])
                     individual = Individual(indiv_data['x'][:], model_id=model_id)
-                    individual.features = indiv_data['features'][:]
+                    individual.features = read_stored_features(f[last_gen_key], indiv_data,
+                                                               list(self.feature_names))
                     individual.objectives = indiv_data['objectives'][:]
                     individual.normalized_objectives = indiv_data['normalized_objectives'][:]
                     individual.energy = nan2None(indiv_data.attrs['energy'])
@@ -2037,7 +3520,8 @@ class OptimizationReport(object):
                     indiv_data = group[str(i)]
                     model_id = nan2None(indiv_data.attrs['id'])
                     individual = Individual(indiv_data['x'][:], model_id=model_id)
-                    individual.features = indiv_data['features'][:]
+                    individual.features = read_stored_features(f[last_gen_key], indiv_data,
+                                                               list(self.feature_names))
                     individual.objectives = indiv_data['objectives'][:]
                     individual.normalized_objectives = indiv_data['normalized_objectives'][:]
                     individual.energy = nan2None(indiv_data.attrs['energy'])
@@ -2098,6 +3582,7 @@ class StorageModelReport():
         self.N_pop = len(group0['failed']) + len(group0['population'])
         self.param_names = self.f.attrs['param_names']
         self.feature_names = self.f.attrs['feature_names']
+        self.stored_feature_names = list(get_h5py_attr(self.f.attrs, 'feature_names'))
         self.objective_names = self.f.attrs['objective_names']
         self.N_params = len(self.param_names)
         self.N_features = len(self.feature_names)
@@ -2141,7 +3626,20 @@ class StorageModelReport():
 
     def get_best_model(self):
         group = self.f['{:d}'.format(self.N_gen-1)]['survivors']['0']
-        return group.attrs['id'], np.array(group['x']), np.array(group['features']), np.array(group['objectives'])
+        return group.attrs['id'], np.array(group['x']), np.array(self.read_att(self.N_gen-1, group, 'features')), \
+               np.array(group['objectives'])
+
+    def read_att(self, gen, indiv_data, att):
+        """
+        Shared features stored once per generation are expanded into the features of each model on read.
+        :param gen: int or str
+        :param indiv_data: :class:'h5py.Group'
+        :param att: str
+        :return: array or :class:'h5py.Dataset'
+        """
+        if att == 'features':
+            return read_stored_features(self.f['{!s}'.format(gen)], indiv_data, self.stored_feature_names)
+        return indiv_data[att]
 
     def get_models_arr(self):
         if not hasattr(self, 'model_arr'):
@@ -2192,7 +3690,8 @@ class StorageModelReport():
         model_hier = self.get_model_hier(model_lst) 
         att_arr = np.empty(shape=(N_models, self.att_size[att]))
         for midx, model in enumerate(model_hier):
-            att_arr[midx, :] = self.f[model['gen']][popdict[model['Failed']]][model['group']][att] 
+            indiv_data = self.f[model['gen']][popdict[model['Failed']]][model['group']]
+            att_arr[midx, :] = self.read_att(model['gen'], indiv_data, att)
         return att_arr
 
     def get_category_att(self, gen=None, cat='spe', att='x', lst=None):
@@ -2201,7 +3700,7 @@ class StorageModelReport():
         att_arr = np.empty(shape=(self.N_objectives, self.att_size[att]))
         group = self.f['{:d}'.format(val_gen)][cat_dict[cat]]
         for i in range(self.N_objectives):
-            att_arr[i, :] = group['{:d}'.format(i)][att]
+            att_arr[i, :] = self.read_att(val_gen, group['{:d}'.format(i)], att)
         if lst is not None:
             att_arr = p0_arr[lst, :]
         return att_arr
@@ -2703,6 +4202,48 @@ def get_specialists(population):
     return specialists
 
 
+def init_compute_features_batch_stage(stage, module, caller):
+    """
+    Used by init_optimize_controller_context, init_analyze_controller_context, and config_optimize_interactive to
+    validate a stage that specifies compute_features_batch, and to find the batch function in the source module.
+    :param stage: dict
+    :param module: module
+    :param caller: str; prefix of error messages (e.g. 'nested.optimize')
+    """
+    func_name = stage['compute_features_batch']
+    source = stage['source']
+    if any(key in stage and stage[key] is not None for key in ['get_args_static', 'get_args_dynamic', 'group_size']):
+        raise Exception('%s: compute_features_batch: %s for source: %s does not accept get_args_static, '
+                        'get_args_dynamic, or group_size.' % (caller, func_name, source))
+    func = getattr(module, func_name)
+    if not isinstance(func, collections.Callable):
+        raise Exception('%s: compute_features_batch: %s for source: %s is not a callable function.'
+                        % (caller, func_name, source))
+    stage['compute_features_batch_func'] = func
+
+
+def init_screen_objectives_stage(stage, module, caller):
+    """
+    Used by init_optimize_controller_context, init_analyze_controller_context, and config_optimize_interactive to
+    validate a stage that specifies screen_objectives, and to find the screening function in the source module.
+    :param stage: dict
+    :param module: module
+    :param caller: str; prefix of error messages (e.g. 'nested.optimize')
+    """
+    if 'screen_objectives' not in stage or stage['screen_objectives'] is None:
+        return
+    func_name = stage['screen_objectives']
+    source = stage['source']
+    if stage.get('keep_fraction', None) is None and stage.get('screen_threshold', None) is None:
+        raise Exception('%s: screen_objectives: %s for source: %s requires either keep_fraction or screen_threshold.'
+                        % (caller, func_name, source))
+    func = getattr(module, func_name)
+    if not isinstance(func, collections.Callable):
+        raise Exception('%s: screen_objectives: %s for source: %s is not a callable function.'
+                        % (caller, func_name, source))
+    stage['screen_objectives_func'] = func
+
+
 def init_optimize_controller_context(config_file_path=None, storage_file_path=None, param_file_path=None, x0_key=None,
                                      param_gen=None, label=None, output_dir=None, **kwargs):
     """
@@ -2800,7 +4341,7 @@ def init_optimize_controller_context(config_file_path=None, storage_file_path=No
 
     if 'param_gen' in config_dict and config_dict['param_gen'] is not None:
         context.param_gen = config_dict['param_gen']
-    else:
+    elif param_gen is not None or 'param_gen' not in context():
         context.param_gen = param_gen
     context.ParamGenClassName = context.param_gen
     # ParamGenClass points to the parameter generator class, while ParamGenClassName points to its name as a string
@@ -2971,6 +4512,8 @@ def init_optimize_controller_context(config_file_path=None, storage_file_path=No
                 raise Exception('nested.optimize: compute_features_shared: %s for source: %s is not a callable '
                                 'function.' % (func_name, source))
             stage['compute_features_shared_func'] = func
+        elif 'compute_features_batch' in stage and stage['compute_features_batch'] is not None:
+            init_compute_features_batch_stage(stage, module, 'nested.optimize')
         if 'filter_features' in stage and stage['filter_features'] is not None:
             func_name = stage['filter_features']
             func = getattr(module, func_name)
@@ -2985,6 +4528,7 @@ def init_optimize_controller_context(config_file_path=None, storage_file_path=No
                 raise Exception('nested.optimize: synchronize: %s for source: %s is not a callable function.'
                                 % (func_name, source))
             stage['synchronize_func'] = func
+        init_screen_objectives_stage(stage, module, 'nested.optimize')
 
     context.get_objectives_funcs = []
     for source, func_name in viewitems(context.get_objectives_dict):
@@ -3287,6 +4831,8 @@ def init_analyze_controller_context(config_file_path=None, storage_file_path=Non
                 raise Exception('nested.analyze: compute_features_shared: %s for source: %s is not a callable '
                                 'function.' % (func_name, source))
             stage['compute_features_shared_func'] = func
+        elif 'compute_features_batch' in stage and stage['compute_features_batch'] is not None:
+            init_compute_features_batch_stage(stage, module, 'nested.analyze')
         if 'filter_features' in stage and stage['filter_features'] is not None:
             func_name = stage['filter_features']
             func = getattr(module, func_name)
@@ -3301,6 +4847,7 @@ def init_analyze_controller_context(config_file_path=None, storage_file_path=Non
                 raise Exception('nested.analyze: synchronize: %s for source: %s is not a callable function.'
                                 % (func_name, source))
             stage['synchronize_func'] = func
+        init_screen_objectives_stage(stage, module, 'nested.analyze')
     context.get_objectives_funcs = []
     for source, func_name in viewitems(context.get_objectives_dict):
         module = sys.modules[source]
@@ -3312,9 +4859,11 @@ def init_analyze_controller_context(config_file_path=None, storage_file_path=Non
 
 
 def init_worker_contexts(sources, update_context_funcs, param_names, default_params, feature_names, objective_names,
-                         target_val, target_range, output_dir, disp, optimization_title=None, label=None, **kwargs):
+                         target_val, target_range, output_dir, disp, optimization_title=None, label=None,
+                         temp_output_dir=None, **kwargs):
     """
-
+    If temp_output_dir is provided (e.g. a node-local scratch directory like /tmp or $TMPDIR), each worker exports data
+    to a temp file in that directory, rather than in output_dir. See stage_temp_output_files.
     :param sources: set of str (source names)
     :param update_context_funcs: list of callable
     :param param_names: list of str
@@ -3327,6 +4876,7 @@ def init_worker_contexts(sources, update_context_funcs, param_names, default_par
     :param disp: bool
     :param optimization_title: str
     :param label: str
+    :param temp_output_dir: str (dir path); environment variables are expanded on each worker
     """
     context = find_context()
 
@@ -3344,8 +4894,20 @@ def init_worker_contexts(sources, update_context_funcs, param_names, default_par
         output_dir_str = ''
     else:
         output_dir_str = context.output_dir + '/'
+    if temp_output_dir is not None:
+        temp_output_dir = os.path.expandvars(os.path.expanduser(temp_output_dir))
+        if not os.path.isdir(temp_output_dir):
+            try:
+                os.makedirs(temp_output_dir)
+            except OSError:
+                # another worker on the same node may have created it first
+                if not os.path.isdir(temp_output_dir):
+                    raise
+        temp_output_dir_str = temp_output_dir + '/'
+    else:
+        temp_output_dir_str = output_dir_str
     temp_output_path = '%snested_optimize_temp_output_%s%s_pid%i_uuid%i.hdf5' % \
-                       (output_dir_str, datetime.datetime.today().strftime('%Y%m%d_%H%M%S'), label, os.getpid(),
+                       (temp_output_dir_str, datetime.datetime.today().strftime('%Y%m%d_%H%M%S'), label, os.getpid(),
                         uuid.uuid1())
     context.update(locals())
     context.update(kwargs)
@@ -3629,6 +5191,8 @@ def config_optimize_interactive(source_file_name, config_file_path=None, output_
                     raise Exception('nested.optimize: compute_features_shared: %s for source: %s is not a callable '
                                     'function.' % (func_name, source))
                 stage['compute_features_shared_func'] = func
+            elif 'compute_features_batch' in stage and stage['compute_features_batch'] is not None:
+                init_compute_features_batch_stage(stage, module, 'nested.optimize')
             if 'filter_features' in stage and stage['filter_features'] is not None:
                 func_name = stage['filter_features']
                 func = getattr(module, func_name)
@@ -3643,6 +5207,7 @@ def config_optimize_interactive(source_file_name, config_file_path=None, output_
                     raise Exception('nested.optimize: synchronize: %s for source: %s is not a callable function.'
                                     % (func_name, source))
                 stage['synchronize_func'] = func
+            init_screen_objectives_stage(stage, module, 'nested.optimize')
 
     context.get_objectives_funcs = []
     for source, func_name in viewitems(context.get_objectives_dict):
@@ -3775,7 +5340,7 @@ def config_parallel_interface(source_file_name, config_file_path=None, output_di
 
 
 def merge_exported_data(context, param_arrays=None, model_ids=None, model_labels=None, features=None, 
-                        objectives=None, export_file_path=None, output_dir=None, verbose=False):
+                        objectives=None, export_file_path=None, output_dir=None, verbose=False, merge_by_node=False):
     """
 
     :param context: :class:'Context'
@@ -3787,10 +5352,11 @@ def merge_exported_data(context, param_arrays=None, model_ids=None, model_labels
     :param export_file_path: str (path)
     :param output_dir: str (dir)
     :param verbose: bool
+    :param merge_by_node: bool; see stage_temp_output_files
     :return: str (path)
     """
-    temp_output_path_list = [temp_output_path for temp_output_path in context.interface.get('context.temp_output_path')
-                             if os.path.isfile(temp_output_path)]
+    temp_output_path_list = stage_temp_output_files(context, output_dir=output_dir, merge_by_node=merge_by_node,
+                                                    verbose=verbose)
     if len(temp_output_path_list) > 0:
         export_file_path = \
             merge_hdf5_temp_output_files(temp_output_path_list, export_file_path, output_dir=output_dir,
@@ -3801,6 +5367,89 @@ def merge_exported_data(context, param_arrays=None, model_ids=None, model_labels
     return export_file_path
 
 
+def stage_temp_output_files(context, output_dir=None, merge_by_node=False, verbose=False):
+    """
+    Returns the paths of the temp output files exported by workers, in a location the controller can read. When workers
+    export to a node-local temp_output_dir (see init_worker_contexts), one worker on each node copies the temp files
+    from that node to output_dir. If merge_by_node is True, that worker first merges the temp files of all workers on
+    its node into a single file, so that only one file per node is written to (and later read from) output_dir. This
+    can also be used to reduce the number of files the controller must open when temp files are exported directly to
+    output_dir.
+    :param context: :class:'Context'
+    :param output_dir: str (dir)
+    :param merge_by_node: bool
+    :param verbose: bool
+    :return: list of str (paths)
+    """
+    temp_output_info = sorted(set([info for info in context.interface.apply(get_temp_output_info)
+                                   if info[1] is not None]))
+    if not merge_by_node and not any([is_local for host, temp_output_path, is_local in temp_output_info]):
+        return [temp_output_path for host, temp_output_path, is_local in temp_output_info]
+
+    start_time = time.time()
+    stage_groups = dict()
+    if merge_by_node:
+        node_groups = defaultdict(list)
+        for host, temp_output_path, is_local in temp_output_info:
+            node_groups[host].append(temp_output_path)
+        for temp_output_path_list in viewvalues(node_groups):
+            stage_groups[temp_output_path_list[0]] = temp_output_path_list
+    else:
+        for host, temp_output_path, is_local in temp_output_info:
+            stage_groups[temp_output_path] = [temp_output_path]
+    staged_path_list = [staged_path for staged_path in
+                        context.interface.apply(stage_node_temp_output_files, stage_groups, output_dir)
+                        if staged_path is not None]
+    if verbose:
+        print('stage_temp_output_files: staging %i temp output files from %i nodes as %i files took %.1f s' %
+              (len(temp_output_info), len(set([info[0] for info in temp_output_info])), len(staged_path_list),
+               time.time() - start_time))
+        sys.stdout.flush()
+    return staged_path_list
+
+
+def get_temp_output_info():
+    """
+    Executed on each worker. Returns the name of the host, the path to the temp output file exported by this worker (or
+    None if no data has been exported), and whether the file is in a node-local temp_output_dir.
+    :return: tuple of (str, str, bool)
+    """
+    local_context = find_context()
+    if 'temp_output_path' not in local_context() or not os.path.isfile(local_context.temp_output_path):
+        return socket.gethostname(), None, False
+    is_local = 'temp_output_dir' in local_context() and local_context.temp_output_dir is not None
+    return socket.gethostname(), local_context.temp_output_path, is_local
+
+
+def stage_node_temp_output_files(stage_groups, output_dir=None):
+    """
+    Executed on each worker. If the temp output file exported by this worker is the first in a group of files from the
+    same node, this worker merges the group into a single file (if it contains more than one file), and moves the result
+    to output_dir.
+    :param stage_groups: dict: {str (path): list of str (paths)}
+    :param output_dir: str (dir)
+    :return: str (path) or None
+    """
+    local_context = find_context()
+    if 'temp_output_path' not in local_context() or local_context.temp_output_path not in stage_groups:
+        return None
+    temp_output_path_list = stage_groups[local_context.temp_output_path]
+    if len(temp_output_path_list) > 1:
+        node_output_path = '%s_node.hdf5' % local_context.temp_output_path.split('.hdf5')[0]
+        merge_hdf5_temp_output_files(temp_output_path_list, node_output_path)
+        for temp_output_path in temp_output_path_list:
+            os.remove(temp_output_path)
+    else:
+        node_output_path = temp_output_path_list[0]
+    if output_dir is None:
+        output_dir = os.getcwd()
+    if os.path.abspath(os.path.dirname(node_output_path)) == os.path.abspath(output_dir):
+        return node_output_path
+    staged_path = os.path.join(output_dir, os.path.basename(node_output_path))
+    shutil.move(node_output_path, staged_path)
+    return staged_path
+
+
 def write_merge_path_list_to_yaml(context, export_file_path=None, output_dir=None, verbose=False):
     """
 
@@ -3815,9 +5464,7 @@ def write_merge_path_list_to_yaml(context, export_file_path=None, output_dir=Non
         export_file_path = '%s/merged_exported_data_%s_%i.hdf5' % \
                            (output_dir, datetime.datetime.today().strftime('%Y%H%M%S_%m%d'), os.getpid())
 
-    temp_output_path_list = [temp_output_path for temp_output_path in
-                             context.interface.get('context.temp_output_path')
-                             if os.path.isfile(temp_output_path)]
+    temp_output_path_list = stage_temp_output_files(context, output_dir=output_dir, verbose=verbose)
     if len(temp_output_path_list) > 0:
         merge_file_path = '%s.yaml' % context.export_file_path.split('.hdf5')[0]
         data = {'export_file_path': export_file_path, 'temp_output_path_list': temp_output_path_list}
@@ -3934,13 +5581,19 @@ def h5_nested_copy(source, target):
 
 def update_source_contexts(x, local_context=None):
     """
-
+    Calls each update_context function with the provided parameters. Sets local_context.x_changed to False if the
+    previous call on this process was made with the same parameters (for example, by the previous job in a chunk of jobs
+    for the same model; see the affinity option of EvaluationPipeline), so that compute_features functions can skip
+    rebuilding model state that depends only on the parameters.
     :param x: array
     :param local_context: :class:'Context'
     """
     if local_context is None:
         local_context = find_context()
     if hasattr(local_context, 'update_context_funcs'):
+        local_context.x_changed = 'x_array_updated' not in local_context() or \
+                                  not np.array_equal(local_context.x_array_updated, x)
+        local_context.x_array_updated = np.array(x, copy=True)
         local_context.x_array = x
         for update_func in local_context.update_context_funcs:
             update_func(x, local_context)
@@ -6,6 +6,9 @@ Used by nested.optimize
 """
 __author__ = 'Aaron D. Milstein'
 from nested.utils import *
+import concurrent.futures
+import threading
+import socket
 
 
 class IpypInterface(object):
@@ -15,17 +18,52 @@ class IpypInterface(object):
 
     class AsyncResultWrapper(object):
         """
-
+        When ready(), get() returns results as a list in the same order as submission. If a list of per-task
+        :class:'AsyncResult' objects is provided (as by map_async), the completion of each task can be tracked
+        individually by IpypInterface.wait_any. If each task computed a chunk of results, results are still indexed in
+        the order of submission.
         """
 
-        def __init__(self, interface, async_result):
+        def __init__(self, interface, async_result, tag=None, chunks=None, func=None):
             """
-            :param async_result: :class:'ASyncResult'
+            :param async_result: :class:'ASyncResult' or list of :class:'AsyncResult'
+            :param tag: hashable; tasks can be cancelled by IpypInterface.cancel(tag)
+            :param chunks: list of list of int; indexes of the results computed by each chunked task
+            :param func: callable; used to record the measured duration of chunked tasks
             """
             self.interface = interface
             self.async_result = async_result
+            if isinstance(async_result, list):
+                self.tasks = async_result
+            else:
+                self.tasks = [async_result]
+            self.chunked = chunks is not None
+            if chunks is None:
+                chunks = [[index] for index in range(len(self.tasks))]
+            self.chunks = chunks
+            self.locations = get_chunk_locations(chunks)  # index: (task position, offset within chunk)
+            self.chunk_results = {}  # task position: list of results
+            self.func = func
             self._ready = False
             self.stdout = []
+            self.completed = set()  # indexes of results already returned by wait_any
+            self.newly_completed = collections.deque()  # indexes of results not yet returned by wait_any
+            self.cancelled = set()  # indexes of results that will be discarded
+            self.flushed = set()  # positions of tasks with stdout already printed
+            self.tag = tag
+            if tag is not None:
+                interface.tagged_results[tag].append(self)
+            for position, task in enumerate(self.tasks):
+                task.add_done_callback(lambda task, position=position: self.notify(position))
+
+        def notify(self, position):
+            """
+            Called when a task completes. Wakes up any thread blocked in IpypInterface.wait_any.
+            :param position: int
+            """
+            with self.interface.condition:
+                self.newly_completed.extend(self.chunks[position])
+                self.interface.condition.notify_all()
 
         def ready(self, wait=None):
             """
@@ -34,23 +72,69 @@ class IpypInterface(object):
             :return: bool
             """
             try:
-                if not self._ready:
-                    self.stdout = self.async_result.stdout
-                else:
+                if self._ready:
                     return True
-                self._ready = self.async_result.ready()
+                if wait is not None and wait > 0:
+                    self.interface.client.wait(self.tasks, timeout=wait)
+                self._ready = all(task.ready() for task in self.tasks)
             except Exception:
                 traceback.print_exc(file=sys.stdout)
                 self.interface.hard_stop()
-            if not self._ready and wait is not None:
-                time.sleep(wait)
             return self._ready
 
+        def wait(self, timeout=None):
+            """
+            Blocks until all tasks have completed, or until timeout (in seconds) has elapsed.
+            :param timeout: int or float
+            :return: bool
+            """
+            if timeout is None:
+                timeout = -1
+            try:
+                self.interface.client.wait(self.tasks, timeout=timeout)
+            except Exception:
+                traceback.print_exc(file=sys.stdout)
+                self.interface.hard_stop()
+            return self.ready()
+
+        def pending(self):
+            """
+            Returns the number of results that have not yet been returned by IpypInterface.wait_any, or cancelled.
+            :return: int
+            """
+            return len(self.locations) - len(self.completed) - len(self.cancelled)
+
+        def cancel(self):
+            """
+            Tasks not yet returned by IpypInterface.wait_any are aborted by the ipyparallel scheduler if they have not
+            yet started. Tasks that are already running are left to finish. Results of all cancelled tasks are
+            discarded.
+            """
+            self.cancelled.update([index for index in range(len(self.locations))
+                                   if index not in self.completed and index not in self.cancelled])
+            tasks = [task for position, task in enumerate(self.tasks)
+                     if not task.ready() and all(index in self.cancelled for index in self.chunks[position])]
+            if tasks:
+                try:
+                    self.interface.client.abort(jobs=tasks, block=False)
+                except Exception:
+                    traceback.print_exc(file=sys.stdout)
+                    sys.stdout.flush()
+
         def get(self):
+            """
+            Returns None until all tasks have completed, then returns a list of results in the order of original
+            submission. Results of cancelled tasks are returned as None.
+            :return: list
+            """
             if self.ready():
                 self.stdout_flush()
                 try:
-                    result = self.async_result.get()
+                    if isinstance(self.async_result, list):
+                        result = [None if index in self.cancelled else self.result(index)
+                                  for index in range(len(self.locations))]
+                    else:
+                        result = self.async_result.get()
                 except Exception:
                     traceback.print_exc(file=sys.stdout)
                     self.interface.hard_stop()
@@ -58,14 +142,48 @@ class IpypInterface(object):
             else:
                 return None
 
-        def stdout_flush(self):
+        def result(self, index):
+            """
+            Returns the result with the provided index, once the task that computed it has completed.
+            :param index: int
+            :return: dynamic
+            """
+            position, offset = self.locations[index]
+            if not self.chunked:
+                return self.tasks[position].get()
+            if position not in self.chunk_results:
+                results, duration, worker = self.tasks[position].get()
+                record_task_duration(self.interface, self.func, duration, len(results), worker)
+                self.chunk_results[position] = results
+            return self.chunk_results[position][offset]
+
+        def start_time(self, index):
+            """
+            The ipyparallel hub only reports when a task started once it has completed, so start times of running tasks
+            are not available.
+            :param index: int
+            :return: None
+            """
+            return None
+
+        def stdout_flush(self, positions=None):
             """
-            Once an async_result is ready, print the contents of its stdout buffer.
+            Once tasks are ready, print the contents of their stdout buffers. Each buffer is only printed once.
+            :param positions: list of int; default is all tasks
             """
-            for stdout in self.stdout:
-                if stdout:
-                    for line in stdout.splitlines():
-                        print(line)
+            if positions is None:
+                positions = range(len(self.tasks))
+            for position in positions:
+                if position in self.flushed:
+                    continue
+                self.flushed.add(position)
+                task_stdout = self.tasks[position].stdout
+                if not isinstance(task_stdout, list):
+                    task_stdout = [task_stdout]
+                for stdout in task_stdout:
+                    if stdout:
+                        for line in stdout.splitlines():
+                            print(line)
             sys.stdout.flush()
 
     def __init__(self, cluster_id=None, profile='default', procs_per_worker=1, sleep=0, source_file=None,
@@ -95,6 +213,21 @@ class IpypInterface(object):
         self.num_workers = int(self.global_size / self.procs_per_worker)
         self.direct_view = self.client
         self.load_balanced_view = self.client.load_balanced_view()
+        # notified by AsyncResultWrapper objects when submitted tasks complete
+        self.condition = threading.Condition()
+        # AsyncResultWrapper objects submitted by map_async with a tag, and not yet completed or cancelled
+        self.tagged_results = defaultdict(list)
+        # measured duration of a single task, used to choose a chunksize, indexed by function
+        self.task_durations = {}
+        # running average of the measured speed of each worker (see record_worker_speed), indexed by worker name
+        self.worker_speeds = {}
+        # used to generate keys for objects sent to all workers by put
+        self.object_counter = 0
+        # calls scheduled by apply_deferred: list of tuple (epoch, func, args, kwargs)
+        self.deferred_calls = []
+        self.deferred_epoch = 0
+        # epoch of the most recent call scheduled by apply_deferred that has been applied on all workers
+        self.deferred_applied_epoch = 0
         if source_file is None:
             source_file = sys.argv[0]
         source_dir = os.path.dirname(os.path.abspath(source_file))
@@ -113,12 +246,12 @@ class IpypInterface(object):
         self.apply_sync = \
             lambda func, *args, **kwargs: \
                 self._sync_wrapper(self.AsyncResultWrapper(self, self.direct_view[:].apply_async(
-                    parallel_execute_wrapper, func, args, kwargs)))
+                    parallel_execute_wrapper, get_deferred_func(self, func, all_workers=True), args, kwargs)))
         self.apply = self.apply_sync
         self.execute = \
             lambda func, *args, **kwargs: \
                 self._sync_wrapper(self.AsyncResultWrapper(self, self.direct_view[0].apply_async(
-                    parallel_execute_wrapper, func, args, kwargs)))
+                    parallel_execute_wrapper, get_deferred_func(self, func), args, kwargs)))
         self.map = self.map_sync
         self.get = lambda x: self.direct_view[:][x]
         self.apply(ipyp_init_workers, num_workers=self.num_workers)
@@ -127,25 +260,122 @@ class IpypInterface(object):
 
     def _sync_wrapper(self, async_result_wrapper):
         """
-
+        Blocks until all results are ready, without polling from the controller.
         :param async_result_wrapper: :class:'ASyncResultWrapper'
         :return: list
         """
-        while not async_result_wrapper.ready():
-            time.sleep(0.3)
+        async_result_wrapper.wait()
         return async_result_wrapper.get()
 
-    def map_sync(self, func, *args):
+    def map_sync(self, func, *args, **kwargs):
+        """
+        By default, the direct view partitions the sequences of arguments evenly across all engines. If a chunksize is
+        provided, sets of arguments are instead submitted to the load balanced view in chunks (see map_async).
+        :param func: callable
+        :param args: list
+        :param chunksize: int or 'auto'
+        :return: list
+        """
+        func = get_deferred_func(self, func)
+        if kwargs.get('chunksize', None) is not None:
+            return self._sync_wrapper(self.map_async(func, *args, chunksize=kwargs['chunksize']))
         group_size = len(args[0])
         sequences = zip(*args)
         return self._sync_wrapper(self.AsyncResultWrapper(self, self.direct_view[:].map_async(
             parallel_execute_wrapper, [func] * group_size, sequences)))
 
-    def map_async(self, func, *args):
-        group_size = len(args[0])
-        sequences = zip(*args)
-        return self.AsyncResultWrapper(self, self.load_balanced_view.map_async(
-            parallel_execute_wrapper, [func] * group_size, sequences))
+    def map_async(self, func, *args, **kwargs):
+        """
+        Each set of arguments is submitted to the load balanced view as a separate task, so that the completion of each
+        task can be tracked individually by wait_any. If a chunksize is provided, sets of arguments are instead submitted
+        in chunks, and each chunk is executed by a single task. With chunksize='auto', the chunksize is chosen based on
+        the measured duration of previous tasks. If a tag is provided, the submitted tasks can be cancelled with
+        cancel(tag).
+        :param func: callable
+        :param args: list
+        :param chunksize: int or 'auto'
+        :param tag: hashable
+        :return: :class:'AsyncResultWrapper'
+        """
+        func = get_deferred_func(self, func)
+        arg_sets = list(zip(*args))
+        chunksize = kwargs.get('chunksize', None)
+        if chunksize is None:
+            tasks = [self.load_balanced_view.apply_async(parallel_execute_wrapper, func, these_args)
+                     for these_args in arg_sets]
+            return self.AsyncResultWrapper(self, tasks, tag=kwargs.get('tag', None))
+        chunks = get_chunks(len(arg_sets), get_chunksize(self, func, len(arg_sets), chunksize))
+        tasks = [self.load_balanced_view.apply_async(parallel_execute_chunk_wrapper, func,
+                                                     [arg_sets[index] for index in chunk]) for chunk in chunks]
+        return self.AsyncResultWrapper(self, tasks, tag=kwargs.get('tag', None), chunks=chunks, func=func)
+
+    def cancel(self, tag):
+        """
+        Cancels all tasks submitted by map_async with the provided tag that have not yet been returned by wait_any.
+        Tasks that have not yet started are aborted. Tasks that are already running are left to finish. Cancelled tasks
+        are not returned by wait_any.
+        :param tag: hashable
+        """
+        for async_result in self.tagged_results.pop(tag, []):
+            async_result.cancel()
+
+    def wait_any(self, async_results, timeout=None):
+        """
+        Blocks until at least one task submitted with map_async, and not yet returned by a previous call to wait_any,
+        has completed, or until timeout (in seconds) has elapsed. ipyparallel AsyncResult objects are
+        concurrent.futures.Future objects, and notify a shared condition variable when they complete, so the controller
+        does not poll while waiting.
+        :param async_results: list of :class:'AsyncResultWrapper'
+        :param timeout: int or float
+        :return: list of tuple (:class:'AsyncResultWrapper', int, dynamic): (async_result, task index, result)
+        """
+        completed = []
+        if timeout is not None:
+            time_stamp = time.time()
+        with self.condition:
+            while True:
+                for async_result in async_results:
+                    while async_result.newly_completed:
+                        index = async_result.newly_completed.popleft()
+                        if index in async_result.cancelled:
+                            continue
+                        async_result.completed.add(index)
+                        completed.append((async_result, index))
+                if completed or not any(async_result.pending() for async_result in async_results):
+                    break
+                if timeout is None:
+                    self.condition.wait()
+                else:
+                    remaining = timeout - (time.time() - time_stamp)
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+        release_tagged_results(self.tagged_results, async_results)
+        try:
+            results = []
+            for async_result, index in completed:
+                async_result.stdout_flush([async_result.locations[index][0]])
+                results.append((async_result, index, async_result.result(index)))
+            return results
+        except Exception:
+            traceback.print_exc(file=sys.stdout)
+            self.hard_stop()
+
+    def as_completed(self, async_results, timeout=None):
+        """
+        A generator that yields the result of each task submitted with map_async as soon as it completes. Stops early
+        if no task completes within timeout (in seconds).
+        :param async_results: list of :class:'AsyncResultWrapper'
+        :param timeout: int or float
+        :yields: tuple (:class:'AsyncResultWrapper', int, dynamic): (async_result, task index, result)
+        """
+        async_results = list(async_results)
+        while True:
+            completed = self.wait_any(async_results, timeout=timeout)
+            if not completed:
+                return
+            for item in completed:
+                yield item
 
     def print_info(self):
         print('nested: IpypInterface: process id: %i; num workers: %i' % (os.getpid(), self.num_workers))
@@ -162,6 +392,41 @@ class IpypInterface(object):
         content.update(kwargs)
         self.apply(update_worker_contexts, content)
 
+    def put(self, obj):
+        """
+        Sends an object once to all workers, and returns an ObjectHandle that refers to it. Uses an apply operation.
+        Handles passed as arguments to map_sync, map_async, execute, or apply are replaced by the stored object on the
+        workers, so that large arguments shared by many tasks are not sent again with each task.
+        :param obj: picklable
+        :return: :class:'ObjectHandle'
+        """
+        handle = ObjectHandle(self.object_counter)
+        self.object_counter += 1
+        content = {handle.key: obj}
+        self.apply(store_worker_objects, content)
+        store_worker_objects(content)
+        return handle
+
+    def release(self, handle):
+        """
+        Removes an object sent by put from all workers.
+        :param handle: :class:'ObjectHandle'
+        """
+        self.apply(release_worker_objects, [handle.key])
+        release_worker_objects([handle.key])
+
+    def apply_deferred(self, func, *args, **kwargs):
+        """
+        Schedules a function to be applied on each worker before the next task that worker executes, rather than with a
+        blocking apply operation. If the same function is scheduled again before a worker executes its next task, it is
+        only applied once on that worker, with the most recent arguments, so scheduled functions should reset state
+        rather than accumulate it. Workers that receive no tasks do not apply the function until they do.
+        :param func: callable
+        :param args: list
+        :param kwargs: dict
+        """
+        schedule_deferred_call(self, func, args, kwargs)
+
     def synchronize(self, func, *args, **kwargs):
         """
         For API consistency with the ParallelContextInterface method, synchronize executes the same function on all
@@ -169,10 +434,10 @@ class IpypInterface(object):
         :param func: callable
         :return:
         """
+        func = get_deferred_func(self, func, all_workers=True)
         async_result_wrapper = \
             self.AsyncResultWrapper(self, self.direct_view[:].apply_async(parallel_execute_wrapper, func, args, kwargs))
-        while not async_result_wrapper.ready():
-            time.sleep(0.3)
+        async_result_wrapper.wait()
 
     def start(self, disp=False):
         pass
@@ -207,45 +472,136 @@ class MPIFuturesInterface(object):
 
     class AsyncResultWrapper(object):
         """
-        When ready(), get() returns results as a list in the same order as submission.
+        When ready(), get() returns results as a list in the same order as submission. If each future computed a chunk
+        of results, results are still indexed in the order of submission.
         """
 
-        def __init__(self, interface, futures):
+        def __init__(self, interface, futures, tag=None, chunks=None, func=None):
             """
 
             :param futures: list of :class:'mpi4py.futures.Future'
+            :param tag: hashable; futures can be cancelled by MPIFuturesInterface.cancel(tag)
+            :param chunks: list of list of int; indexes of the results computed by each chunked future
+            :param func: callable; used to record the measured duration of chunked futures
             """
             self.interface = interface
             self.futures = futures
+            self.chunked = chunks is not None
+            if chunks is None:
+                chunks = [[index] for index in range(len(futures))]
+            self.chunks = chunks
+            self.locations = get_chunk_locations(chunks)  # index: (future position, offset within chunk)
+            self.chunk_results = {}  # future position: list of results
+            self.func = func
             self._ready = False
+            self.completed = set()  # indexes of results already returned by wait_any
+            self.newly_completed = collections.deque()  # indexes of results not yet returned by wait_any
+            self.cancelled = set()  # indexes of results that will be discarded
+            self.start_times = {}  # future position: time at which the future was first observed running
+            self.tag = tag
+            if tag is not None:
+                interface.tagged_results[tag].append(self)
+            for position, future in enumerate(futures):
+                future.add_done_callback(lambda future, position=position: self.notify(position))
+
+        def notify(self, position):
+            """
+            Called when a future completes. Wakes up any thread blocked in MPIFuturesInterface.wait_any.
+            :param position: int
+            """
+            with self.interface.condition:
+                self.newly_completed.extend(self.chunks[position])
+                self.interface.condition.notify_all()
 
         def ready(self, wait=None):
             """
+            Blocks for at most wait seconds (without polling) for all futures to complete.
             :param wait: int or float
             :return: bool
             """
-            time_stamp = time.time()
+            if self._ready:
+                return True
             if wait is None:
                 wait = 0
             try:
-                while not np.all([future.done() for future in self.futures]):
-                    if time.time() - time_stamp > wait:
-                        return False
+                done, not_done = concurrent.futures.wait(self.futures, timeout=wait)
             except Exception:
                 traceback.print_exc(file=sys.stdout)
                 self.interface.hard_stop()
+            if not_done:
+                return False
             self._ready = True
             return True
 
+        def wait(self, timeout=None):
+            """
+            Blocks until all futures have completed, or until timeout (in seconds) has elapsed.
+            :param timeout: int or float
+            :return: bool
+            """
+            try:
+                concurrent.futures.wait(self.futures, timeout=timeout)
+            except Exception:
+                traceback.print_exc(file=sys.stdout)
+                self.interface.hard_stop()
+            return self.ready()
+
+        def pending(self):
+            """
+            Returns the number of results that have not yet been returned by MPIFuturesInterface.wait_any, or cancelled.
+            :return: int
+            """
+            return len(self.locations) - len(self.completed) - len(self.cancelled)
+
+        def cancel(self):
+            """
+            Futures not yet returned by MPIFuturesInterface.wait_any are cancelled if they have not yet started. Futures
+            that are already running are left to finish. Results of all cancelled futures are discarded.
+            """
+            self.cancelled.update([index for index in range(len(self.locations))
+                                   if index not in self.completed and index not in self.cancelled])
+            for position, future in enumerate(self.futures):
+                if all(index in self.cancelled for index in self.chunks[position]):
+                    future.cancel()
+
+        def result(self, index):
+            """
+            Returns the result with the provided index, once the future that computed it has completed.
+            :param index: int
+            :return: dynamic
+            """
+            position, offset = self.locations[index]
+            if not self.chunked:
+                return self.futures[position].result()
+            if position not in self.chunk_results:
+                results, duration, worker = self.futures[position].result()
+                record_task_duration(self.interface, self.func, duration, len(results), worker)
+                self.chunk_results[position] = results
+            return self.chunk_results[position][offset]
+
+        def start_time(self, index):
+            """
+            Returns the time at which the future that computes the result with the provided index was first observed
+            running on a worker, or None if it has not yet started. The executor marks a future as running when it is
+            sent to a worker, so the precision is limited by how often this method is called.
+            :param index: int
+            :return: float or None
+            """
+            position = self.locations[index][0]
+            if position not in self.start_times and self.futures[position].running():
+                self.start_times[position] = time.time()
+            return self.start_times.get(position, None)
+
         def get(self):
             """
             Returns None until all results have completed, then returns a list of results in the order of original
-            submission.
+            submission. Results of cancelled futures are returned as None.
             :return: list
             """
             if self._ready or self.ready():
                 try:
-                    results = [future.result() for future in self.futures]
+                    results = [None if index in self.cancelled else self.result(index)
+                               for index in range(len(self.locations))]
                 except Exception:
                     traceback.print_exc(file=sys.stdout)
                     self.interface.hard_stop()
@@ -275,6 +631,21 @@ class MPIFuturesInterface(object):
         self.global_size = self.global_comm.size
         self.num_workers = self.global_size - 1
         self.apply_counter = 0
+        # notified by AsyncResultWrapper objects when submitted futures complete
+        self.condition = threading.Condition()
+        # AsyncResultWrapper objects submitted by map_async with a tag, and not yet completed or cancelled
+        self.tagged_results = defaultdict(list)
+        # measured duration of a single task, used to choose a chunksize, indexed by function
+        self.task_durations = {}
+        # running average of the measured speed of each worker (see record_worker_speed), indexed by worker name
+        self.worker_speeds = {}
+        # used to generate keys for objects sent to all workers by put
+        self.object_counter = 0
+        # calls scheduled by apply_deferred: list of tuple (epoch, func, args, kwargs)
+        self.deferred_calls = []
+        self.deferred_epoch = 0
+        # epoch of the most recent call scheduled by apply_deferred that has been applied on all workers
+        self.deferred_applied_epoch = 0
         self.map = self.map_sync
         self.apply = self.apply_sync
         self.init_workers(disp=True)
@@ -319,6 +690,7 @@ class MPIFuturesInterface(object):
         :param kwargs: dict
         :return: dynamic
         """
+        func = get_deferred_func(self, func, all_workers=True)
         apply_key = int(self.apply_counter)
         self.apply_counter += 1
         futures = []
@@ -339,6 +711,7 @@ class MPIFuturesInterface(object):
         :param kwargs: dict
         :return: dynamic
         """
+        func = get_deferred_func(self, func)
         future = self.executor.submit(parallel_execute_wrapper, func, args, kwargs)
         try:
             result = future.result()
@@ -347,16 +720,23 @@ class MPIFuturesInterface(object):
             self.hard_stop()
         return result
 
-    def map_sync(self, func, *sequences):
+    def map_sync(self, func, *sequences, **kwargs):
         """
         This method wraps mpi4py.futures.MPIPoolExecutor.map to implement a synchronous (blocking) map operation.
-        Uses all available processes, and returns results as a list in the same order as the specified sequences.
+        Uses all available processes, and returns results as a list in the same order as the specified sequences. If a
+        chunksize is provided, sets of arguments are submitted in chunks (see map_async).
         :param func: callable
         :param sequences: list
+        :param chunksize: int or 'auto'
         :return: list
         """
+        func = get_deferred_func(self, func)
         if not sequences:
             return None
+        if kwargs.get('chunksize', None) is not None:
+            async_result = self.map_async(func, *sequences, chunksize=kwargs['chunksize'])
+            async_result.wait()
+            return async_result.get()
         futures = []
         for args in zip(*sequences):
             futures.append(self.executor.submit(parallel_execute_wrapper, func, args))
@@ -367,21 +747,97 @@ class MPIFuturesInterface(object):
             self.hard_stop()
         return results
 
-    def map_async(self, func, *sequences):
+    def map_async(self, func, *sequences, **kwargs):
         """
         This method wraps mpi4py.futures.MPIPoolExecutor.submit to implement an asynchronous (non-blocking) map
         operation. Uses all available processes, and returns results as a list in the same order as the specified
-        sequences. Returns an AsyncResultWrapper object to track progress of the submitted jobs.
+        sequences. Returns an AsyncResultWrapper object to track progress of the submitted jobs. If a chunksize is
+        provided, sets of arguments are submitted in chunks, and each chunk is executed by a single future. With
+        chunksize='auto', the chunksize is chosen based on the measured duration of previous jobs. If a tag is provided,
+        the submitted jobs can be cancelled with cancel(tag).
         :param func: callable
         :param sequences: list
+        :param chunksize: int or 'auto'
+        :param tag: hashable
         :return: list
         """
+        func = get_deferred_func(self, func)
         if not sequences:
             return None
-        futures = []
-        for args in zip(*sequences):
-            futures.append(self.executor.submit(parallel_execute_wrapper, func, args))
-        return self.AsyncResultWrapper(self, futures)
+        chunksize = kwargs.get('chunksize', None)
+        if chunksize is None:
+            futures = []
+            for args in zip(*sequences):
+                futures.append(self.executor.submit(parallel_execute_wrapper, func, args))
+            return self.AsyncResultWrapper(self, futures, tag=kwargs.get('tag', None))
+        arg_sets = list(zip(*sequences))
+        chunks = get_chunks(len(arg_sets), get_chunksize(self, func, len(arg_sets), chunksize))
+        futures = [self.executor.submit(parallel_execute_chunk_wrapper, func, [arg_sets[index] for index in chunk])
+                   for chunk in chunks]
+        return self.AsyncResultWrapper(self, futures, tag=kwargs.get('tag', None), chunks=chunks, func=func)
+
+    def cancel(self, tag):
+        """
+        Cancels all jobs submitted by map_async with the provided tag that have not yet been returned by wait_any.
+        Jobs that have not yet started are removed from the executor queue. Jobs that are already running are left to
+        finish. Cancelled jobs are not returned by wait_any.
+        :param tag: hashable
+        """
+        for async_result in self.tagged_results.pop(tag, []):
+            async_result.cancel()
+
+    def wait_any(self, async_results, timeout=None):
+        """
+        Blocks until at least one task submitted with map_async, and not yet returned by a previous call to wait_any,
+        has completed, or until timeout (in seconds) has elapsed. Completed futures notify a shared condition variable,
+        so the controller does not poll while waiting.
+        :param async_results: list of :class:'AsyncResultWrapper'
+        :param timeout: int or float
+        :return: list of tuple (:class:'AsyncResultWrapper', int, dynamic): (async_result, task index, result)
+        """
+        completed = []
+        if timeout is not None:
+            time_stamp = time.time()
+        with self.condition:
+            while True:
+                for async_result in async_results:
+                    while async_result.newly_completed:
+                        index = async_result.newly_completed.popleft()
+                        if index in async_result.cancelled:
+                            continue
+                        async_result.completed.add(index)
+                        completed.append((async_result, index))
+                if completed or not any(async_result.pending() for async_result in async_results):
+                    break
+                if timeout is None:
+                    self.condition.wait()
+                else:
+                    remaining = timeout - (time.time() - time_stamp)
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+        release_tagged_results(self.tagged_results, async_results)
+        try:
+            return [(async_result, index, async_result.result(index)) for async_result, index in completed]
+        except Exception:
+            traceback.print_exc(file=sys.stdout)
+            self.hard_stop()
+
+    def as_completed(self, async_results, timeout=None):
+        """
+        A generator that yields the result of each task submitted with map_async as soon as it completes. Stops early
+        if no task completes within timeout (in seconds).
+        :param async_results: list of :class:'AsyncResultWrapper'
+        :param timeout: int or float
+        :yields: tuple (:class:'AsyncResultWrapper', int, dynamic): (async_result, task index, result)
+        """
+        async_results = list(async_results)
+        while True:
+            completed = self.wait_any(async_results, timeout=timeout)
+            if not completed:
+                return
+            for item in completed:
+                yield item
 
     def get(self, object_name):
         """
@@ -403,6 +859,41 @@ class MPIFuturesInterface(object):
         content.update(kwargs)
         self.apply(update_worker_contexts, content)
 
+    def put(self, obj):
+        """
+        Sends an object once to all workers, and returns an ObjectHandle that refers to it. Uses an apply operation.
+        Handles passed as arguments to map_sync, map_async, execute, or apply are replaced by the stored object on the
+        workers, so that large arguments shared by many tasks are not sent again with each task.
+        :param obj: picklable
+        :return: :class:'ObjectHandle'
+        """
+        handle = ObjectHandle(self.object_counter)
+        self.object_counter += 1
+        content = {handle.key: obj}
+        discard = self.apply(store_worker_objects, content)
+        store_worker_objects(content)
+        return handle
+
+    def release(self, handle):
+        """
+        Removes an object sent by put from all workers.
+        :param handle: :class:'ObjectHandle'
+        """
+        discard = self.apply(release_worker_objects, [handle.key])
+        release_worker_objects([handle.key])
+
+    def apply_deferred(self, func, *args, **kwargs):
+        """
+        Schedules a function to be applied on each worker before the next task that worker executes, rather than with a
+        blocking apply operation. If the same function is scheduled again before a worker executes its next task, it is
+        only applied once on that worker, with the most recent arguments, so scheduled functions should reset state
+        rather than accumulate it. Workers that receive no tasks do not apply the function until they do.
+        :param func: callable
+        :param args: list
+        :param kwargs: dict
+        """
+        schedule_deferred_call(self, func, args, kwargs)
+
     def synchronize(self, func, *args, **kwargs):
         """
         For API consistency with the ParallelContextInterface method, synchronize executes the same function on all
@@ -589,6 +1080,162 @@ def find_nested_object(object_name):
         raise Exception('nested: object: %s not found in remote __main__ namespace' % object_name)
 
 
+
+# objects sent to this process by the put method of a parallel interface, indexed by ObjectHandle.key
+worker_object_store = {}
+
+
+class ObjectHandle(object):
+    """
+    Refers to an object that was sent once to all workers by the put method of a parallel interface. When passed as an
+    argument to map_sync, map_async, execute, or apply, a handle is replaced by the stored object before the function
+    is called on the worker. Only handles passed directly as arguments are resolved, not handles nested inside other
+    arguments.
+    """
+
+    def __init__(self, key, path=()):
+        """
+
+        :param key: int
+        :param path: tuple; sequence of indexes into the stored object
+        """
+        self.key = key
+        self.path = tuple(path)
+
+    def item(self, index):
+        """
+        Returns a handle that refers to an item of the stored object. Allows the items of a stored sequence to be
+        distributed across tasks, without sending the items again with each task.
+        :param index: hashable
+        :return: :class:'ObjectHandle'
+        """
+        return ObjectHandle(self.key, self.path + (index,))
+
+    def resolve(self):
+        """
+        Returns the stored object from the local worker_object_store.
+        :return: dynamic
+        """
+        if self.key not in worker_object_store:
+            raise KeyError('nested.parallel: ObjectHandle: object with key: %i not found on process: %i' %
+                           (self.key, os.getpid()))
+        this_object = worker_object_store[self.key]
+        for index in self.path:
+            this_object = this_object[index]
+        return this_object
+
+    def __repr__(self):
+        return 'ObjectHandle(%i, %s)' % (self.key, str(self.path))
+
+
+def store_worker_objects(content):
+    """
+    Used by the put method of each parallel interface to store objects on each worker.
+    :param content: dict; {ObjectHandle.key: object}
+    """
+    worker_object_store.update(content)
+
+
+def release_worker_objects(keys):
+    """
+    Used by the release method of each parallel interface to remove objects from each worker.
+    :param keys: list of int
+    """
+    for key in keys:
+        worker_object_store.pop(key, None)
+
+
+def resolve_object_handles(args):
+    """
+    Replaces any ObjectHandle in a list of positional arguments or a dictionary of keyword arguments with the object it
+    refers to.
+    :param args: list or dict
+    :return: list or dict
+    """
+    if isinstance(args, dict):
+        return dict((key, value.resolve() if isinstance(value, ObjectHandle) else value)
+                    for key, value in viewitems(args))
+    return [arg.resolve() if isinstance(arg, ObjectHandle) else arg for arg in args]
+
+
+# epoch of the most recent call scheduled by apply_deferred that has been applied on this process
+worker_deferred_epoch = 0
+
+
+class DeferredApply(object):
+    """
+    Wraps a function submitted by a parallel interface, so that calls scheduled with the apply_deferred method of the
+    interface are applied on the worker before the function is executed, unless they have already been applied on that
+    worker. Instances that wrap the same function compare equal, so that the parallel interfaces can track the
+    durations of chunked tasks by function.
+    """
+
+    def __init__(self, func, deferred_calls):
+        """
+
+        :param func: callable
+        :param deferred_calls: list of tuple (int, callable, tuple, dict): (epoch, func, args, kwargs)
+        """
+        self.func = func
+        self.deferred_calls = deferred_calls
+
+    def __call__(self, *args, **kwargs):
+        global worker_deferred_epoch
+        epoch = worker_deferred_epoch
+        for this_epoch, func, these_args, these_kwargs in self.deferred_calls:
+            if this_epoch > worker_deferred_epoch:
+                func(*resolve_object_handles(these_args), **resolve_object_handles(these_kwargs))
+                epoch = max(epoch, this_epoch)
+        worker_deferred_epoch = epoch
+        return self.func(*args, **kwargs)
+
+    def __eq__(self, other):
+        return isinstance(other, DeferredApply) and self.func == other.func
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((DeferredApply, self.func))
+
+
+def schedule_deferred_call(interface, func, args, kwargs):
+    """
+    Used by the apply_deferred method of each parallel interface. A function scheduled again before it has been applied
+    on a worker replaces the earlier call, so that each worker applies it at most once, with the most recent arguments.
+    :param interface: parallel interface
+    :param func: callable
+    :param args: tuple
+    :param kwargs: dict
+    """
+    interface.deferred_epoch += 1
+    interface.deferred_calls = [call for call in interface.deferred_calls if call[1] != func]
+    interface.deferred_calls.append((interface.deferred_epoch, func, args, kwargs))
+
+
+def get_deferred_func(interface, func, all_workers=False):
+    """
+    Used by each parallel interface to wrap the functions it submits to workers once any call has been scheduled with
+    apply_deferred (see DeferredApply). Only calls that have not yet been applied on all workers are sent. Jobs are
+    assigned to workers dynamically, so the controller cannot know which calls the worker that executes a given job has
+    already applied. Instead, a blocking operation that executes the function on every worker (all_workers) applies
+    all scheduled calls on every worker before it returns, so those calls are then dropped, and are not sent with later
+    jobs. ParallelContextInterface also drops calls once every worker has reported applying them (see
+    ParallelContextInterface.record_deferred_epoch).
+    :param interface: parallel interface
+    :param func: callable
+    :param all_workers: bool; the function is executed on every worker before the calling operation returns
+    :return: callable
+    """
+    if not interface.deferred_calls or isinstance(func, DeferredApply):
+        return func
+    deferred_func = DeferredApply(func, list(interface.deferred_calls))
+    if all_workers:
+        interface.deferred_applied_epoch = interface.deferred_epoch
+        interface.deferred_calls = []
+    return deferred_func
+
+
 class ParallelContextInterface(object):
     """
     Class provides an interface to extend the NEURON ParallelContext bulletin board for flexible nested parallel
@@ -597,37 +1244,93 @@ class ParallelContextInterface(object):
 
     class AsyncResultWrapper(object):
         """
-        When ready(), get() returns results as a list in the same order as submission.
+        When ready(), get() returns results as a list in the same order as submission. If each job computed a chunk of
+        results, results are still indexed in the order of submission.
         """
 
-        def __init__(self, interface, keys):
+        def __init__(self, interface, keys, tag=None, chunks=None, func=None, track_start=False):
             """
 
             :param interface: :class: 'ParallelContextInterface'
             :param keys: list
+            :param tag: hashable; jobs can be cancelled by ParallelContextInterface.cancel(tag)
+            :param chunks: list of list of int; indexes of the results computed by each chunked job
+            :param func: callable; used to record the measured duration of chunked jobs
+            :param track_start: bool; workers post a message to the bulletin board when each job starts
             """
             self.interface = interface
             self.keys = keys
-            self.remaining_keys = list(keys)
+            self.remaining_keys = set(keys)
+            self.results = {}
+            self.chunked = chunks is not None
+            if chunks is None:
+                chunks = [[index] for index in range(len(keys))]
+            self.chunks = chunks
+            self.locations = get_chunk_locations(chunks)  # index: (key position, offset within chunk)
+            self.chunk_results = {}  # key position: list of results
+            self.func = func
+            self.completed = set()  # indexes of results already returned by wait_any
+            self.newly_completed = collections.deque()  # indexes of results not yet returned by wait_any
+            self.cancelled = set()  # indexes of results that will be discarded
+            self.cancelled_keys = set()  # cancelled keys not yet retrieved from the bulletin board
+            self.track_start = track_start
+            self.start_times = {}  # key position: time at which the job was first observed running
             self._ready = False
+            self.tag = tag
+            if tag is not None:
+                interface.tagged_results[tag].append(self)
+            for position, key in enumerate(keys):
+                interface.key_owners[key] = (self, position)
+
+        def notify(self, key, position, result):
+            """
+            Called by ParallelContextInterface.receive_result when a result for one of this AsyncResultWrapper's keys is
+            retrieved from the bulletin board. Once all cancelled jobs have returned, the message that marked them as
+            cancelled is removed from the bulletin board.
+            :param key: int
+            :param position: int
+            :param result: dynamic
+            """
+            self.results[key] = result
+            self.remaining_keys.remove(key)
+            self.newly_completed.extend(self.chunks[position])
+            if self.track_start and position not in self.start_times:
+                self.interface.pc.look_take(pc_start_message(key))
+            if key in self.cancelled_keys:
+                self.cancelled_keys.remove(key)
+                if not self.cancelled_keys:
+                    self.interface.pc.take(pc_cancel_message(self.keys[0]))
+
+        def cancel(self):
+            """
+            Jobs not yet returned by ParallelContextInterface.wait_any are cancelled. The bulletin board does not support
+            removing submitted jobs, so a message is posted that instructs workers to skip these jobs if they have not yet
+            started (see pc_cancellable_execute_wrapper). Jobs that are already running are left to finish. Results of
+            all cancelled jobs are discarded.
+            """
+            self.cancelled.update([index for index in range(len(self.locations))
+                                   if index not in self.completed and index not in self.cancelled])
+            keys = set([key for position, key in enumerate(self.keys) if key in self.remaining_keys and
+                        all(index in self.cancelled for index in self.chunks[position])])
+            if keys and not self.cancelled_keys:
+                self.interface.pc.post(pc_cancel_message(self.keys[0]))
+            self.cancelled_keys.update(keys)
 
         def ready(self, wait=None):
             """
             :param wait: int or float
             :return: bool
             """
+            if self._ready:
+                return True
             time_stamp = time.time()
             if wait is None:
                 wait = 0
             try:
-                while len(self.remaining_keys) > 0 and self.interface.pc.working():
-                    key = int(self.interface.pc.userid())
-                    self.interface.collected[key] = self.interface.pc.pyret()
-                    try:
-                        self.remaining_keys.remove(key)
-                    except ValueError:
-                        pass
-                    if time.time() - time_stamp > wait:
+                while len(self.remaining_keys) > 0:
+                    if self.interface.receive_result() is None:
+                        break
+                    if len(self.remaining_keys) > 0 and time.time() - time_stamp > wait:
                         return False
             except Exception:
                 traceback.print_exc(file=sys.stdout)
@@ -635,15 +1338,65 @@ class ParallelContextInterface(object):
             self._ready = True
             return True
 
+        def wait(self, timeout=None):
+            """
+            Blocks until all jobs have been retrieved from the bulletin board, or until timeout (in seconds) has elapsed.
+            :param timeout: int or float
+            :return: bool
+            """
+            if timeout is None:
+                timeout = float('inf')
+            return self.ready(wait=timeout)
+
+        def pending(self):
+            """
+            Returns the number of results that have not yet been returned by ParallelContextInterface.wait_any, or
+            cancelled.
+            :return: int
+            """
+            return len(self.locations) - len(self.completed) - len(self.cancelled)
+
+        def result(self, index):
+            """
+            Returns the result with the provided index, once the job that computed it has been retrieved from the
+            bulletin board.
+            :param index: int
+            :return: dynamic
+            """
+            position, offset = self.locations[index]
+            if not self.chunked:
+                return self.results[self.keys[position]]
+            if position not in self.chunk_results:
+                results, duration, worker = self.results.pop(self.keys[position])
+                record_task_duration(self.interface, self.func, duration, len(results), worker)
+                self.chunk_results[position] = results
+            return self.chunk_results[position][offset]
+
+        def start_time(self, index):
+            """
+            Returns the time at which the job that computes the result with the provided index was first observed
+            running on a worker, or None if it has not yet started, or if the job was not submitted with track_start.
+            The precision is limited by how often this method is called.
+            :param index: int
+            :return: float or None
+            """
+            position = self.locations[index][0]
+            key = self.keys[position]
+            if self.track_start and position not in self.start_times and key in self.remaining_keys and \
+                    self.interface.pc.look_take(pc_start_message(key)):
+                self.start_times[position] = time.time()
+            return self.start_times.get(position, None)
+
         def get(self):
             """
             Returns None until all results have completed, then returns a list of results in the order of original
-            submission.
+            submission. Results of cancelled jobs are returned as None.
             :return: list
             """
             if self._ready or self.ready():
                 try:
-                    return [self.interface.collected.pop(key) for key in self.keys]
+                    return [None if index in self.cancelled else self.result(index)
+                            for index in range(len(self.locations))]
                 except Exception:
                     traceback.print_exc(file=sys.stdout)
                     self.interface.hard_stop()
@@ -689,6 +1442,33 @@ class ParallelContextInterface(object):
         # 'collected' dict acts as a temporary storage container on the master process for results retrieved from
         # the ParallelContext bulletin board.
         self.collected = {}
+        # results for keys submitted by map_async are routed directly to the AsyncResultWrapper that owns them
+        self.key_owners = {}
+        # number of submitted jobs that have not yet been retrieved from the bulletin board
+        self.num_outstanding = 0
+        # seconds between checks for completed jobs when wait_any is called with a timeout
+        self.poll_sleep = 0.05
+        # keys of outstanding jobs submitted by map_async with notify, which post a done message when they complete
+        self.notified_keys = set()
+        # done messages taken from the bulletin board before the result of the corresponding job was retrieved
+        self.num_early_done_messages = 0
+        # results of notified jobs retrieved before a done message was taken from the bulletin board
+        self.num_stale_done_messages = 0
+        # AsyncResultWrapper objects submitted by map_async with a tag, and not yet completed or cancelled
+        self.tagged_results = defaultdict(list)
+        # measured duration of a single job, used to choose a chunksize, indexed by function
+        self.task_durations = {}
+        # running average of the measured speed of each worker (see record_worker_speed), indexed by worker name
+        self.worker_speeds = {}
+        # used to generate keys for objects sent to all workers by put
+        self.object_counter = 0
+        # calls scheduled by apply_deferred: list of tuple (epoch, func, args, kwargs)
+        self.deferred_calls = []
+        self.deferred_epoch = 0
+        # epoch of the most recent call scheduled by apply_deferred that has been applied on all workers
+        self.deferred_applied_epoch = 0
+        # epoch of the most recent call scheduled by apply_deferred reported by each worker, indexed by worker_id
+        self.worker_deferred_epochs = {}
         assert self.rank == self.comm.rank and self.global_rank == self.global_comm.rank and \
                self.global_comm.size // self.procs_per_worker == self.num_workers, \
             'nested: ParallelContextInterface: pc.ids do not match MPI ranks'
@@ -719,6 +1499,80 @@ class ParallelContextInterface(object):
         self.key_counter += 1
         return key
 
+    def submit(self, key, func, *args):
+        """
+        Submits a job to the bulletin board and keeps count of the number of outstanding jobs. Each job reports which
+        calls scheduled by apply_deferred have been applied on the worker that executed it (see
+        pc_reporting_execute_wrapper).
+        :param key: int
+        :param func: callable
+        :param args: list
+        """
+        self.pc.submit(key, pc_reporting_execute_wrapper, func, args)
+        self.num_outstanding += 1
+
+    def record_deferred_epoch(self, worker_id, epoch):
+        """
+        Records the epoch of the most recent call scheduled by apply_deferred that has been applied on a worker. Once
+        every worker has reported, calls that have been applied on all workers are dropped, and are no longer sent
+        with each job.
+        :param worker_id: int
+        :param epoch: int
+        """
+        if epoch <= self.worker_deferred_epochs.get(worker_id, 0):
+            return
+        self.worker_deferred_epochs[worker_id] = epoch
+        if len(self.worker_deferred_epochs) < self.num_workers:
+            return
+        applied_epoch = min(self.worker_deferred_epochs.values())
+        if applied_epoch > self.deferred_applied_epoch:
+            self.deferred_applied_epoch = applied_epoch
+            self.deferred_calls = [call for call in self.deferred_calls if call[0] > applied_epoch]
+
+    def take_done_message(self):
+        """
+        Checks without blocking whether a job submitted with notify has completed, and its result has not yet been
+        retrieved. Done messages are indistinguishable, so they are matched to retrieved results by count: messages
+        that match results already retrieved are discarded first, and a message taken before its result is retrieved
+        is counted until receive_result retrieves the result of a notified job.
+        :return: bool
+        """
+        while self.num_stale_done_messages and self.pc.look_take(PC_DONE_MESSAGE):
+            self.num_stale_done_messages -= 1
+        if self.num_stale_done_messages:
+            return False
+        if self.num_early_done_messages:
+            return True
+        if self.pc.look_take(PC_DONE_MESSAGE):
+            self.num_early_done_messages += 1
+            return True
+        return False
+
+    def receive_result(self):
+        """
+        Blocks until any previously submitted job has completed. If the job was submitted by map_async, its result is
+        passed to the AsyncResultWrapper that owns its key, otherwise it is placed in the 'collected' dict.
+        :return: int (key), or None if no submitted jobs remain
+        """
+        if not self.pc.working():
+            return None
+        key = int(self.pc.userid())
+        worker_id, epoch, result = self.pc.pyret()
+        self.num_outstanding -= 1
+        self.record_deferred_epoch(worker_id, epoch)
+        if key in self.notified_keys:
+            self.notified_keys.remove(key)
+            if self.num_early_done_messages:
+                self.num_early_done_messages -= 1
+            elif not self.pc.look_take(PC_DONE_MESSAGE):
+                self.num_stale_done_messages += 1
+        if key in self.key_owners:
+            async_result, index = self.key_owners.pop(key)
+            async_result.notify(key, index, result)
+        else:
+            self.collected[key] = result
+        return key
+
     def apply_sync(self, func, *args, **kwargs):
         """
         ParallelContext lacks a native method to guarantee execution of a function on all workers. This method
@@ -729,12 +1583,13 @@ class ParallelContextInterface(object):
         :param kwargs: dict
         :return: dynamic
         """
+        func = get_deferred_func(self, func, all_workers=True)
         if self._running:
             apply_key = int(self.get_next_key())
             keys = []
             for i in range(self.num_workers):
                 key = int(self.get_next_key())
-                self.pc.submit(key, pc_apply_wrapper, func, apply_key, args, kwargs)
+                self.submit(key, pc_apply_wrapper, func, apply_key, args, kwargs)
                 keys.append(key)
             results = self.collect_results(keys)
             sys.stdout.flush()
@@ -765,20 +1620,17 @@ class ParallelContextInterface(object):
         """
         try:
             if keys is None:
-                while self.pc.working():
-                    key = int(self.pc.userid())
-                    self.collected[key] = self.pc.pyret()
+                while self.receive_result() is not None:
+                    pass
                 keys = list(self.collected.keys())
                 return {key: self.collected.pop(key) for key in keys}
             else:
-                remaining_keys = [key for key in keys if key not in self.collected]
-                while len(remaining_keys) > 0 and self.pc.working():
-                    key = int(self.pc.userid())
-                    self.collected[key] = self.pc.pyret()
-                    try:
-                        remaining_keys.remove(key)
-                    except ValueError:
-                        pass
+                remaining_keys = set([key for key in keys if key not in self.collected])
+                while len(remaining_keys) > 0:
+                    key = self.receive_result()
+                    if key is None:
+                        break
+                    remaining_keys.discard(key)
                 return [self.collected.pop(key) for key in keys]
         except Exception:
             traceback.print_exc(file=sys.stdout)
@@ -792,49 +1644,152 @@ class ParallelContextInterface(object):
         :param kwargs: dict
         :return: dynamic
         """
+        func = get_deferred_func(self, func)
         key = int(self.get_next_key())
-        self.pc.submit(key, parallel_execute_wrapper, func, args, kwargs)
+        self.submit(key, parallel_execute_wrapper, func, args, kwargs)
         result = self.collect_results([key])[0]
         sys.stdout.flush()
         return result
 
-    def map_sync(self, func, *sequences):
+    def map_sync(self, func, *sequences, **kwargs):
         """
         ParallelContext lacks a native method to apply a function to sequences of arguments, using all available
         processes, and returning the results in the same order as the specified sequence. This method implements a
         synchronous (blocking) map operation. Returns results as a list in the same order as the specified sequences.
+        If a chunksize is provided, sets of arguments are submitted in chunks (see map_async).
         :param func: callable
         :param sequences: list
+        :param chunksize: int or 'auto'
         :return: list
         """
+        func = get_deferred_func(self, func)
         if not sequences:
             return None
+        if kwargs.get('chunksize', None) is not None:
+            async_result = self.map_async(func, *sequences, chunksize=kwargs['chunksize'])
+            async_result.wait()
+            return async_result.get()
         keys = []
         for args in zip(*sequences):
             key = int(self.get_next_key())
-            self.pc.submit(key, parallel_execute_wrapper, func, args)
+            self.submit(key, parallel_execute_wrapper, func, args)
             keys.append(key)
         results = self.collect_results(keys)
         return results
 
-    def map_async(self, func, *sequences):
+    def map_async(self, func, *sequences, **kwargs):
         """
         ParallelContext lacks a native method to apply a function to sequences of arguments, using all available
         processes, and returning the results in the same order as the specified sequence. This method implements an
         asynchronous (non-blocking) map operation. Returns a AsyncResultWrapper object to track progress of the
-        submitted jobs.
+        submitted jobs. If a chunksize is provided, sets of arguments are packed into chunks, and each chunk is
+        submitted to the bulletin board as a single job. With chunksize='auto', the chunksize is chosen based on the
+        measured duration of previous jobs. If a tag is provided, the submitted jobs can be cancelled with cancel(tag).
+        If track_start, workers post a message to the bulletin board when each job starts, so that the start time of
+        running jobs is available from AsyncResultWrapper.start_time. If notify, workers post a message to the bulletin
+        board when each job completes, so that wait_any can return as soon as a result is available when called with a
+        timeout.
         :param func: callable
         :param sequences: list
+        :param chunksize: int or 'auto'
+        :param tag: hashable
+        :param track_start: bool
+        :param notify: bool
         :return: list
         """
+        func = get_deferred_func(self, func)
         if not sequences:
             return None
-        keys = []
-        for args in zip(*sequences):
-            key = int(self.get_next_key())
-            self.pc.submit(key, parallel_execute_wrapper, func, args)
-            keys.append(key)
-        return self.AsyncResultWrapper(self, keys)
+        tag = kwargs.get('tag', None)
+        chunksize = kwargs.get('chunksize', None)
+        track_start = kwargs.get('track_start', False)
+        notify = kwargs.get('notify', False)
+        arg_sets = list(zip(*sequences))
+        if chunksize is None:
+            chunks = None
+            jobs = [(parallel_execute_wrapper, (func, args)) for args in arg_sets]
+        else:
+            chunks = get_chunks(len(arg_sets), get_chunksize(self, func, len(arg_sets), chunksize))
+            jobs = [(parallel_execute_chunk_wrapper, (func, [arg_sets[index] for index in chunk])) for chunk in chunks]
+        keys = [int(self.get_next_key()) for _ in range(len(jobs))]
+        for key, (wrapper, args) in zip(keys, jobs):
+            if track_start:
+                wrapper, args = pc_tracked_execute_wrapper, (key, wrapper, args)
+            if tag is not None:
+                # the first key identifies the message that marks this group of jobs as cancelled
+                wrapper, args = pc_cancellable_execute_wrapper, (keys[0], wrapper, args)
+            if notify:
+                wrapper, args = pc_notified_execute_wrapper, (wrapper, args)
+                self.notified_keys.add(key)
+            self.submit(key, wrapper, *args)
+        return self.AsyncResultWrapper(self, keys, tag=tag, chunks=chunks, func=func, track_start=track_start)
+
+    def cancel(self, tag):
+        """
+        Cancels all jobs submitted by map_async with the provided tag that have not yet been returned by wait_any.
+        Jobs that have not yet started are skipped by the workers. Jobs that are already running are left to finish.
+        Cancelled jobs are not returned by wait_any.
+        :param tag: hashable
+        """
+        for async_result in self.tagged_results.pop(tag, []):
+            async_result.cancel()
+
+    def wait_any(self, async_results, timeout=None):
+        """
+        Blocks until at least one job submitted with map_async, and not yet returned by a previous call to wait_any,
+        has completed, or until timeout (in seconds) has elapsed. Without a timeout, pc.working() blocks until the next
+        job completes, so the controller does not poll while waiting. pc.working() cannot be interrupted, so to enforce
+        a timeout, the controller instead checks every poll_sleep seconds for a single shared message that jobs
+        submitted by map_async with notify post when they complete (see pc_notified_execute_wrapper), and only
+        retrieves a result once one is available. No worker is occupied while the controller waits. Results of jobs
+        submitted without notify are only retrieved by calls without a timeout, or while retrieving a notified result.
+        :param async_results: list of :class:'AsyncResultWrapper'
+        :param timeout: int or float
+        :return: list of tuple (:class:'AsyncResultWrapper', int, dynamic): (async_result, job index, result)
+        """
+        time_stamp = time.time()
+        completed = []
+        try:
+            while True:
+                for async_result in async_results:
+                    while async_result.newly_completed:
+                        index = async_result.newly_completed.popleft()
+                        if index in async_result.cancelled:
+                            continue
+                        async_result.completed.add(index)
+                        completed.append((async_result, index, async_result.result(index)))
+                if completed or not any(async_result.pending() for async_result in async_results):
+                    break
+                if timeout is not None:
+                    remaining = timeout - (time.time() - time_stamp)
+                    if remaining <= 0:
+                        break
+                    if not self.take_done_message():
+                        time.sleep(min(self.poll_sleep, remaining))
+                        continue
+                if self.receive_result() is None:
+                    break
+        except Exception:
+            traceback.print_exc(file=sys.stdout)
+            self.hard_stop()
+        release_tagged_results(self.tagged_results, async_results)
+        return completed
+
+    def as_completed(self, async_results, timeout=None):
+        """
+        A generator that yields the result of each job submitted with map_async as soon as it completes. Stops early
+        if no job completes within timeout (in seconds).
+        :param async_results: list of :class:'AsyncResultWrapper'
+        :param timeout: int or float
+        :yields: tuple (:class:'AsyncResultWrapper', int, dynamic): (async_result, job index, result)
+        """
+        async_results = list(async_results)
+        while True:
+            completed = self.wait_any(async_results, timeout=timeout)
+            if not completed:
+                return
+            for item in completed:
+                yield item
 
     def get(self, object_name):
         """
@@ -845,6 +1800,40 @@ class ParallelContextInterface(object):
         """
         return self.apply_sync(find_nested_object, object_name)
 
+    def put(self, obj):
+        """
+        Sends an object once to all workers, and returns an ObjectHandle that refers to it. Uses a global MPI broadcast
+        operation. Handles passed as arguments to map_sync, map_async, execute, or apply are replaced by the stored
+        object on the workers, so that large arguments shared by many tasks are not sent again with each task.
+        :param obj: picklable
+        :return: :class:'ObjectHandle'
+        """
+        handle = ObjectHandle(self.object_counter)
+        self.object_counter += 1
+        content = {handle.key: obj}
+        self.pc.context(pc_store_worker_objects_wrapper)
+        pc_store_worker_objects_wrapper(content)
+        return handle
+
+    def release(self, handle):
+        """
+        Removes an object sent by put from all workers.
+        :param handle: :class:'ObjectHandle'
+        """
+        self.synchronize(release_worker_objects, [handle.key])
+
+    def apply_deferred(self, func, *args, **kwargs):
+        """
+        Schedules a function to be applied on each worker before the next job that worker executes, rather than with a
+        blocking apply operation. If the same function is scheduled again before a worker executes its next job, it is
+        only applied once on that worker, with the most recent arguments, so scheduled functions should reset state
+        rather than accumulate it. Workers that receive no jobs do not apply the function until they do.
+        :param func: callable
+        :param args: list
+        :param kwargs: dict
+        """
+        schedule_deferred_call(self, func, args, kwargs)
+
     def synchronize(self, func, *args, **kwargs):
         """
         ParallelContext contains a native method to execute a function simultaneously on all ranks in all worker
@@ -856,6 +1845,7 @@ class ParallelContextInterface(object):
         :param args:
         :param kwargs:
         """
+        func = get_deferred_func(self, func, all_workers=True)
         self.pc.context(pc_synchronize_wrapper, func, args, kwargs)
         pc_synchronize_wrapper(func, args, kwargs)
 
@@ -929,7 +1919,7 @@ def parallel_execute_wrapper(func, args, kwargs=None):
     """
     When executing functions remotely, raised Exceptions do not necessarily result in an informative traceback. This
     wrapper is used by ParallelContextInterface and MPIFuturesInterface to first print a traceback on failed workers
-    before the entire interface shuts down.
+    before the entire interface shuts down. Any ObjectHandle in args or kwargs is replaced by the stored object.
     :param func: callable
     :param args: list
     :param kwargs: dict
@@ -938,7 +1928,7 @@ def parallel_execute_wrapper(func, args, kwargs=None):
     if kwargs is None:
         kwargs = dict()
     try:
-        result = func(*args, **kwargs)
+        result = func(*resolve_object_handles(args), **resolve_object_handles(kwargs))
     except Exception as e:
         print('nested: Exception occurred on process: %i. Waiting for pending jobs to complete' % os.getpid())
         traceback.print_exc(file=sys.stdout)
@@ -948,6 +1938,204 @@ def parallel_execute_wrapper(func, args, kwargs=None):
     return result
 
 
+def pc_cancel_message(key):
+    """
+    Returns the name of the bulletin board message that marks a group of jobs submitted by
+    ParallelContextInterface.map_async as cancelled.
+    :param key: int; key of the first job in the group
+    :return: str
+    """
+    return 'nested_cancel_%i' % key
+
+
+def pc_cancellable_execute_wrapper(cancel_key, func, args):
+    """
+    Method used by ParallelContextInterface.map_async to submit jobs that can be cancelled. Before executing the
+    specified function, the root rank of the worker subworld checks the bulletin board for a message that marks the job
+    as cancelled, and shares the outcome with the other ranks in its subworld.
+    :param cancel_key: int
+    :param func: callable; parallel_execute_wrapper or parallel_execute_chunk_wrapper
+    :param args: list
+    :return: dynamic; None if the job was cancelled
+    """
+    interface = pc_find_interface()
+    cancelled = None
+    if interface.comm.rank == 0:
+        cancelled = bool(interface.pc.look(pc_cancel_message(cancel_key)))
+    if interface.comm.size > 1:
+        cancelled = interface.comm.bcast(cancelled, root=0)
+    if cancelled:
+        return None
+    return func(*args)
+
+
+def pc_start_message(key):
+    """
+    Returns the name of the bulletin board message that marks a job submitted by ParallelContextInterface.map_async
+    with track_start as running.
+    :param key: int
+    :return: str
+    """
+    return 'nested_start_%i' % key
+
+
+# name of the bulletin board message posted by each job submitted by ParallelContextInterface.map_async with notify
+PC_DONE_MESSAGE = 'nested_done'
+
+
+def pc_notified_execute_wrapper(func, args):
+    """
+    Method used by ParallelContextInterface.map_async to submit jobs with notify. After executing the specified
+    function, the root rank of the worker subworld posts a message to the bulletin board, so that the controller can
+    check whether a result is available without blocking (see ParallelContextInterface.wait_any). All jobs post the
+    same message, so the controller only checks for a single message, regardless of the number of outstanding jobs.
+    :param func: callable
+    :param args: list
+    :return: dynamic
+    """
+    result = func(*args)
+    interface = pc_find_interface()
+    if interface.comm.rank == 0:
+        interface.pc.post(PC_DONE_MESSAGE)
+    return result
+
+
+def pc_tracked_execute_wrapper(key, func, args):
+    """
+    Method used by ParallelContextInterface.map_async to submit jobs whose start time is tracked. Before executing the
+    specified function, the root rank of the worker subworld posts a message to the bulletin board. The controller
+    removes the message when it first observes it, or when the result of the job is retrieved.
+    :param key: int
+    :param func: callable; parallel_execute_wrapper or parallel_execute_chunk_wrapper
+    :param args: list
+    :return: dynamic
+    """
+    interface = pc_find_interface()
+    if interface.comm.rank == 0:
+        interface.pc.post(pc_start_message(key))
+    return func(*args)
+
+
+def parallel_execute_chunk_wrapper(func, arg_chunk):
+    """
+    Used by the map_sync and map_async methods of each interface to execute a chunk of tasks in a single job. The
+    duration of the job and the name of the worker that executed it are returned so that the controller can choose a
+    chunksize automatically, and measure the speed of each worker.
+    :param func: callable
+    :param arg_chunk: list of list
+    :return: tuple (list, float, str): (results, duration in seconds, worker name)
+    """
+    start_time = time.time()
+    results = [parallel_execute_wrapper(func, args) for args in arg_chunk]
+    return results, time.time() - start_time, get_worker_name()
+
+
+def get_worker_name():
+    """
+    Identifies the process that executed a job.
+    :return: str
+    """
+    return '%s:%i' % (socket.gethostname(), os.getpid())
+
+
+def get_chunks(num_tasks, chunksize):
+    """
+    Divides a number of tasks into consecutive chunks.
+    :param num_tasks: int
+    :param chunksize: int
+    :return: list of list of int
+    """
+    return [list(range(start, min(start + chunksize, num_tasks))) for start in range(0, num_tasks, chunksize)]
+
+
+def get_chunk_locations(chunks):
+    """
+    Used by AsyncResultWrapper objects to find the result for each task in the chunk that computed it.
+    :param chunks: list of list of int
+    :return: list of tuple of int: (chunk position, offset within chunk)
+    """
+    locations = [None] * sum(len(chunk) for chunk in chunks)
+    for position, chunk in enumerate(chunks):
+        for offset, index in enumerate(chunk):
+            locations[index] = (position, offset)
+    return locations
+
+
+def get_chunksize(interface, func, num_tasks, chunksize, target_duration=1.):
+    """
+    With chunksize='auto', tasks are packed into chunks that take approximately target_duration (in seconds) to
+    execute, based on the measured duration of previous tasks executing the same function, without leaving any workers
+    idle. Before any duration has been measured, tasks are divided into 4 chunks per worker.
+    :param interface: :class:'IpypInterface', 'MPIFuturesInterface', or 'ParallelContextInterface'
+    :param func: callable
+    :param num_tasks: int
+    :param chunksize: int or 'auto'
+    :param target_duration: float
+    :return: int
+    """
+    if chunksize != 'auto':
+        return max(1, int(chunksize))
+    max_chunksize = int(math.ceil(float(num_tasks) / max(1, interface.num_workers)))
+    task_duration = interface.task_durations.get(func, None)
+    if task_duration is None:
+        chunksize = num_tasks // (4 * max(1, interface.num_workers))
+    else:
+        chunksize = int(target_duration / max(task_duration, 1e-6))
+    return max(1, min(max_chunksize, chunksize))
+
+
+def record_task_duration(interface, func, duration, num_tasks, worker=None):
+    """
+    Updates a running average of the duration of a single task executing the provided function. If the worker that
+    executed the chunk is provided, the duration expected from tasks executed by all workers is also used to update the
+    measured speed of that worker.
+    :param interface: :class:'IpypInterface', 'MPIFuturesInterface', or 'ParallelContextInterface'
+    :param func: callable
+    :param duration: float; duration of a chunk of tasks (in seconds)
+    :param num_tasks: int; number of tasks in the chunk
+    :param worker: str; name of the worker that executed the chunk (see get_worker_name)
+    """
+    if num_tasks < 1:
+        return
+    task_duration = duration / num_tasks
+    if func in interface.task_durations:
+        if worker is not None:
+            record_worker_speed(interface, worker, interface.task_durations[func] * num_tasks, duration)
+        task_duration = 0.8 * interface.task_durations[func] + 0.2 * task_duration
+    interface.task_durations[func] = task_duration
+
+
+def record_worker_speed(interface, worker, expected_duration, duration):
+    """
+    Updates a running average of the speed of a worker: the ratio of the expected duration of a job, estimated from jobs
+    executed by all workers, to its measured duration on that worker.
+    :param interface: :class:'IpypInterface', 'MPIFuturesInterface', 'ParallelContextInterface', or 'SerialInterface'
+    :param worker: str; name of the worker (see get_worker_name)
+    :param expected_duration: float (in seconds)
+    :param duration: float (in seconds)
+    """
+    if expected_duration <= 0. or duration <= 0.:
+        return
+    speed = expected_duration / duration
+    if worker in interface.worker_speeds:
+        speed = 0.8 * interface.worker_speeds[worker] + 0.2 * speed
+    interface.worker_speeds[worker] = speed
+
+
+def get_worker_speeds(interface):
+    """
+    Returns the measured speed of each worker relative to the median worker, so that a worker with a relative speed of
+    2. executes jobs in half the time of the median worker. Workers that have not yet executed a measured job are not
+    included.
+    :param interface: :class:'IpypInterface', 'MPIFuturesInterface', 'ParallelContextInterface', or 'SerialInterface'
+    :return: dict: {worker name: float}
+    """
+    if not interface.worker_speeds:
+        return {}
+    median_speed = float(np.median(list(interface.worker_speeds.values())))
+    return {worker: speed / median_speed for worker, speed in viewitems(interface.worker_speeds)}
+
+
 def pc_apply_wrapper(func, key, args, kwargs):
     """
     Method used by ParallelContextInterface to implement an 'apply' operation. As long as a module executes 
@@ -976,6 +2164,19 @@ def pc_apply_wrapper(func, key, args, kwargs):
     return result
 
 
+def pc_reporting_execute_wrapper(func, args):
+    """
+    Method used by ParallelContextInterface.submit to submit all jobs. Returns the result of the job together with the
+    id of the worker that executed it, and the epoch of the most recent call scheduled by apply_deferred that has been
+    applied on that worker (see ParallelContextInterface.record_deferred_epoch).
+    :param func: callable
+    :param args: list
+    :return: tuple (int, int, dynamic): (worker_id, epoch, result)
+    """
+    result = func(*args)
+    return pc_find_interface().worker_id, worker_deferred_epoch, result
+
+
 def pc_find_interface():
     """
     ParallelContextInterface apply and get operations require a remote instance of ParallelContextInterface. This method
@@ -1024,6 +2225,23 @@ def pc_update_worker_contexts_wrapper(content=None):
     update_worker_contexts(content)
 
 
+
+def pc_store_worker_objects_wrapper(content=None):
+    """
+    Used by ParallelContextInterface.put to store objects on all ranks across all subworlds. Uses a global MPI
+    broadcast operation, so that each object is sent only once.
+    :param content: dict; {ObjectHandle.key: object}
+    """
+    interface = pc_find_interface()
+    if interface.pc.id_bbs() > 0:
+        interface.pc.post("pc_store_worker_objects")
+    if interface.global_comm.rank == 0:
+        for _ in range(interface.pc.nhost_bbs() - 1):
+            interface.pc.take("pc_store_worker_objects")
+    content = interface.global_comm.bcast(content, root=0)
+    store_worker_objects(content)
+
+
 class SerialInterface(object):
     """
     Class provides a serial interface to locally test parallelized code on a single process.
@@ -1034,12 +2252,17 @@ class SerialInterface(object):
         When ready(), get() returns results as a list in the same order as submission.
         """
 
-        def __init__(self, result):
+        def __init__(self, result, tag=None):
             """
 
             :param result: iterator
+            :param tag: hashable; results can be discarded by SerialInterface.cancel(tag)
             """
             self.result = list(result)
+            self.tag = tag
+            self.completed = set()  # indexes of results already returned by wait_any
+            self.newly_completed = collections.deque(range(len(self.result)))
+            self.cancelled = set()  # indexes of results that will not be returned by wait_any
 
         def ready(self, **kwargs):
             """
@@ -1048,6 +2271,27 @@ class SerialInterface(object):
             """
             return True
 
+        def pending(self):
+            """
+            Returns the number of results that have not yet been returned by SerialInterface.wait_any, or cancelled.
+            :return: int
+            """
+            return len(self.result) - len(self.completed) - len(self.cancelled)
+
+        def cancel(self):
+            """
+            Serial operations are blocking, so cancelled results have already been computed, but are discarded.
+            """
+            self.cancelled.update([index for index in range(len(self.result)) if index not in self.completed])
+
+        def start_time(self, index):
+            """
+            Serial operations are blocking, so no task is ever running while results are pending.
+            :param index: int
+            :return: None
+            """
+            return None
+
         def get(self):
             """
             Returns a list of results in the order of original submission.
@@ -1063,13 +2307,75 @@ class SerialInterface(object):
         self.worker_id = 0
         self.num_workers = 1
         self.global_size = 1
-        self.map_sync = lambda func, *args: list(map(func, *args))
+        self.map_sync = \
+            lambda func, *args, **kwargs: [func(*resolve_object_handles(these_args)) for these_args in zip(*args)]
         self.map = self.map_sync
-        self.map_async = lambda func, *args: self.AsyncResultWrapper(self.map_sync(func, *args))
-        self.apply_sync = lambda func, *args, **kwargs: [func(*args, **kwargs)]
+        self.apply_sync = \
+            lambda func, *args, **kwargs: [func(*resolve_object_handles(args), **resolve_object_handles(kwargs))]
         self.apply = self.apply_sync
-        self.execute = lambda func, *args, **kwargs: func(*args, **kwargs)
+        self.execute = \
+            lambda func, *args, **kwargs: func(*resolve_object_handles(args), **resolve_object_handles(kwargs))
         self.controller_is_worker = True
+        # for API consistency with the other interfaces, map_async results are tracked by tag until returned
+        self.tagged_results = defaultdict(list)
+        # used to generate keys for objects stored by put
+        self.object_counter = 0
+        # for API consistency with the other interfaces, the measured speed of the single worker
+        self.worker_speeds = {}
+
+    def map_async(self, func, *args, **kwargs):
+        """
+        Serial operations are blocking, so all results are ready when map_async returns. For API consistency with the
+        other interfaces, a chunksize is accepted but ignored. If a tag is provided, results not yet returned by wait_any
+        can be discarded with cancel(tag).
+        :param func: callable
+        :param args: list
+        :param chunksize: int or 'auto'
+        :param tag: hashable
+        :return: :class:'AsyncResultWrapper'
+        """
+        tag = kwargs.get('tag', None)
+        async_result = self.AsyncResultWrapper(self.map_sync(func, *args), tag=tag)
+        if tag is not None:
+            self.tagged_results[tag].append(async_result)
+        return async_result
+
+    def cancel(self, tag):
+        """
+        Results submitted by map_async with the provided tag that have not yet been returned by wait_any are
+        discarded.
+        :param tag: hashable
+        """
+        for async_result in self.tagged_results.pop(tag, []):
+            async_result.cancel()
+
+    def wait_any(self, async_results, timeout=None):
+        """
+        Serial operations are blocking, so all results not yet returned by a previous call to wait_any are returned.
+        :param async_results: list of :class:'AsyncResultWrapper'
+        :param timeout: int or float
+        :return: list of tuple (:class:'AsyncResultWrapper', int, dynamic): (async_result, index, result)
+        """
+        completed = []
+        for async_result in async_results:
+            while async_result.newly_completed:
+                index = async_result.newly_completed.popleft()
+                if index in async_result.cancelled:
+                    continue
+                async_result.completed.add(index)
+                completed.append((async_result, index, async_result.result[index]))
+        release_tagged_results(self.tagged_results, async_results)
+        return completed
+
+    def as_completed(self, async_results, timeout=None):
+        """
+        For API consistency with the other interfaces, yields the result of each task submitted with map_async.
+        :param async_results: list of :class:'AsyncResultWrapper'
+        :param timeout: int or float
+        :yields: tuple (:class:'AsyncResultWrapper', int, dynamic): (async_result, index, result)
+        """
+        for item in self.wait_any(async_results, timeout=timeout):
+            yield item
 
     def print_info(self):
         print('nested: SerialInterface: process id: %i' % os.getpid())
@@ -1095,6 +2401,37 @@ class SerialInterface(object):
         content.update(kwargs)
         update_worker_contexts(content)
 
+    def put(self, obj):
+        """
+        Sends an object once to all workers, and returns an ObjectHandle that refers to it. For API consistency with the
+        other interfaces, the object is stored locally. Handles passed as arguments to map_sync, map_async, execute, or
+        apply are replaced by the stored object on the workers, so that large arguments shared by many tasks are not
+        sent again with each task.
+        :param obj: picklable
+        :return: :class:'ObjectHandle'
+        """
+        handle = ObjectHandle(self.object_counter)
+        self.object_counter += 1
+        content = {handle.key: obj}
+        store_worker_objects(content)
+        return handle
+
+    def release(self, handle):
+        """
+        Removes an object sent by put from all workers.
+        :param handle: :class:'ObjectHandle'
+        """
+        release_worker_objects([handle.key])
+
+    def apply_deferred(self, func, *args, **kwargs):
+        """
+        Serial operations are blocking, and the controller is the only worker, so the function is applied immediately.
+        :param func: callable
+        :param args: list
+        :param kwargs: dict
+        """
+        self.apply(func, *args, **kwargs)
+
     def synchronize(self, func, *args, **kwargs):
         """
         For API consistency with the ParallelContextInterface method, synchronize executes the same function on all
@@ -1114,6 +2451,23 @@ class SerialInterface(object):
         pass
 
 
+def release_tagged_results(tagged_results, async_results):
+    """
+    Used by the wait_any method of each interface to stop tracking tagged AsyncResultWrapper objects once all of their
+    tasks have been returned, so that they are no longer affected by cancel(tag).
+    :param tagged_results: defaultdict of list of :class:'AsyncResultWrapper'
+    :param async_results: list of :class:'AsyncResultWrapper'
+    """
+    for async_result in async_results:
+        tag = async_result.tag
+        if tag is None or async_result.pending() or tag not in tagged_results:
+            continue
+        if async_result in tagged_results[tag]:
+            tagged_results[tag].remove(async_result)
+        if not tagged_results[tag]:
+            del tagged_results[tag]
+
+
 def get_parallel_interface(framework='pc', procs_per_worker=1, source_file=None, source_package=None, sleep=0,
                            profile='default', cluster_id=None, **kwargs):
     """
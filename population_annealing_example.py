@@ -50,6 +50,34 @@ def complex_problem(parameters, model_id=None, export=False):
     return features
 
 
+def complex_problem_batch(parameter_block, model_ids=None, export=False):
+    """
+    Vectorized version of complex_problem, which can be specified in the config file as a compute_features_batch
+    function to evaluate a block of models in a single job.
+    :param parameter_block: 2-D array; one row of parameters per model
+    :param model_ids: list of int or str
+    :param export: bool
+    :return: list of dict
+    """
+    parameter_block = np.atleast_2d(parameter_block)
+    print('Process: %i; evaluating %i models' % (os.getpid(), len(parameter_block)))
+    sys.stdout.flush()
+
+    num_params = parameter_block.shape[1]
+    f1 = parameter_block[:, 0]
+    g = 1. + 9. / (num_params - 1.) * np.sum(parameter_block[:, 1:], axis=1)
+    h = 1. - np.sqrt(f1 / g)
+
+    features_list = []
+    for i in range(len(parameter_block)):
+        # Test handling of failure to compute required feature
+        if f1[i] > 1.:
+            features_list.append(dict())
+        else:
+            features_list.append({'f1': f1[i], 'g': g[i], 'h': h[i]})
+    return features_list
+
+
 def get_objectives(features, model_id=None, export=False):
     """
 
@@ -0,0 +1,122 @@
+from nested.optimize_utils import AnalysisResultsTable, get_population_dtype
+import h5py
+import numpy as np
+import os
+import shutil
+import tempfile
+
+
+param_names = ['a', 'b']
+feature_names = ['f']
+objective_names = ['o']
+
+
+def make_batch(model_ids, failed=()):
+    """
+
+    :param model_ids: list of int
+    :param failed: list of int
+    :return: tuple (list of array, structured array, list of str or None)
+    """
+    param_arrays = [np.array([float(model_id), 2. * model_id]) for model_id in model_ids]
+    population_array = np.zeros(len(model_ids), dtype=get_population_dtype(feature_names, objective_names))
+    failure_reasons = []
+    for i, model_id in enumerate(model_ids):
+        population_array['features'][i] = [10. * model_id]
+        population_array['objectives'][i] = [100. * model_id]
+        population_array['failed'][i] = model_id in failed
+        failure_reasons.append('timeout' if model_id in failed else None)
+    return param_arrays, population_array, failure_reasons
+
+
+def test_append_and_resume():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(temp_dir, 'results.hdf5')
+        table = AnalysisResultsTable(file_path, param_names, feature_names, objective_names)
+        param_arrays, population_array, failure_reasons = make_batch([0, 1], failed=[1])
+        table.append(param_arrays, [0, 1], population_array, failure_reasons)
+        assert len(table) == 2 and 0 in table and 2 not in table
+        with h5py.File(file_path, 'r') as f:
+            assert list(f['model_id'][:]) == [0, 1]
+            assert f['features'][0, 0] == 0. and np.isnan(f['features'][1, 0])
+            assert list(f['failed'][:]) == [False, True]
+
+        try:
+            AnalysisResultsTable(file_path, param_names, feature_names, objective_names)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError('existing table was not protected without resume')
+
+        table = AnalysisResultsTable(file_path, param_names, feature_names, objective_names, resume=True)
+        assert len(table) == 2
+        table.check(param_arrays, [0, 1])
+        param_arrays, population_array, failure_reasons = make_batch([2])
+        table.append(param_arrays, [2], population_array, failure_reasons)
+        assert len(AnalysisResultsTable(file_path, param_names, feature_names, objective_names, resume=True)) == 3
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_mismatch_detection():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(temp_dir, 'results.hdf5')
+        table = AnalysisResultsTable(file_path, param_names, feature_names, objective_names)
+        param_arrays, population_array, failure_reasons = make_batch([0])
+        table.append(param_arrays, [0], population_array, failure_reasons)
+
+        try:
+            AnalysisResultsTable(file_path, param_names, ['g'], objective_names, resume=True)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError('mismatched feature_names were not detected')
+
+        try:
+            table.check([np.array([5., 5.])], [0])
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError('mismatched parameters were not detected')
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_rollback_export():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(temp_dir, 'results.hdf5')
+        export_file_path = os.path.join(temp_dir, 'export.hdf5')
+        table = AnalysisResultsTable(file_path, param_names, feature_names, objective_names)
+
+        table.begin_export(export_file_path)
+        with h5py.File(export_file_path, 'a') as f:
+            f.create_group('shared_context')
+            f.create_group('models').create_dataset('0', data=[0.])
+        param_arrays, population_array, failure_reasons = make_batch([0])
+        table.append(param_arrays, [0], population_array, failure_reasons, export_file_path=export_file_path)
+        assert table.rollback_export(export_file_path) == 0
+
+        # interrupted after merging the second batch, before appending it to the table
+        table.begin_export(export_file_path)
+        with h5py.File(export_file_path, 'a') as f:
+            f['models'].create_dataset('1', data=[1.])
+            f.create_group('extra').create_dataset('x', data=[1.])
+
+        table = AnalysisResultsTable(file_path, param_names, feature_names, objective_names, resume=True)
+        assert table.rollback_export(export_file_path) == 2
+        with h5py.File(export_file_path, 'r') as f:
+            assert sorted(f.keys()) == ['models', 'shared_context']
+            assert list(f['models'].keys()) == ['0']
+        assert table.rollback_export(export_file_path) == 0
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    test_append_and_resume()
+    test_mismatch_detection()
+    test_rollback_export()
+    print('test_analysis_results_table: all tests passed')
@@ -0,0 +1,96 @@
+from nested.optimize_utils import EvaluationCache
+import numpy as np
+import os
+import shutil
+import tempfile
+import time
+
+
+def make_cache(temp_dir, **kwargs):
+    """
+
+    :param temp_dir: str (dir path)
+    :return: :class:'EvaluationCache'
+    """
+    return EvaluationCache(os.path.join(temp_dir, 'cache.hdf5'), **kwargs)
+
+
+def test_round_trip():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cache = make_cache(temp_dir)
+        x = np.array([1., 2.])
+        cache.put([x], [{'a': 1.5}], [{'obj': 0.25}])
+        assert cache.get([x, np.array([3., 4.])]) == [({'a': 1.5}, {'obj': 0.25}), None]
+        assert cache.hits == 1 and cache.misses == 1
+
+        # entries persist in the file
+        cache = make_cache(temp_dir)
+        assert cache.get([x]) == [({'a': 1.5}, {'obj': 0.25})]
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_failed_models_not_cached():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cache = make_cache(temp_dir)
+        population = [np.array([float(i)]) for i in range(3)]
+        cache.put(population, [{'a': 1.}, {'failed': 'timeout'}, {}], [{'failed': 'screened'}, {'obj': 1.}, {}])
+        assert cache.get(population) == [None, None, None]
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_kwargs_in_key():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        x = np.array([1.])
+        make_cache(temp_dir, kwargs={'cell_type': 'A'}).put([x], [{'a': 1.}], [{'obj': 1.}])
+        assert make_cache(temp_dir, kwargs={'cell_type': 'A'}).get([x])[0] is not None
+        assert make_cache(temp_dir, kwargs={'cell_type': 'B'}).get([x])[0] is None
+        assert make_cache(temp_dir).get([x])[0] is None
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_buffered_put():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cache = make_cache(temp_dir)
+        x = np.array([1., 2.])
+        cache.put([x], [{'a': 1.5}], [{'obj': 0.25}], flush=False)
+        assert not os.path.isfile(cache.file_path)
+        assert cache.get([x]) == [({'a': 1.5}, {'obj': 0.25})]
+        cache.flush()
+        assert make_cache(temp_dir).get([x]) == [({'a': 1.5}, {'obj': 0.25})]
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_eviction():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cache = make_cache(temp_dir, max_size=2)
+        population = [np.array([float(i)]) for i in range(3)]
+        cache.put(population[:1], [{'a': 0.}], [{'obj': 0.}])
+        time.sleep(0.01)
+        cache.put(population[1:2], [{'a': 1.}], [{'obj': 1.}])
+        time.sleep(0.01)
+        # reading model 0 makes model 1 the least recently used
+        assert cache.get(population[:1])[0] is not None
+        time.sleep(0.01)
+        cache.put(population[2:], [{'a': 2.}], [{'obj': 2.}])
+        results = make_cache(temp_dir, max_size=2).get(population)
+        assert results[0] is not None and results[1] is None and results[2] is not None
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    test_round_trip()
+    test_failed_models_not_cached()
+    test_kwargs_in_key()
+    test_buffered_put()
+    test_eviction()
+    print('test_evaluation_cache: all tests passed')
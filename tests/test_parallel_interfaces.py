@@ -107,6 +107,67 @@ def main(cli, interactive):
     sys.stdout.flush()
     time.sleep(1.)
 
+    time_stamp = time.time()
+    print(': context.interface.as_completed([context.interface.map_async(test, range(%i, %i), range(%i, %i))])' %
+          (start1, end1, start2, end2))
+    pending = [context.interface.map_async(test, list(range(start1, end1)), list(range(start2, end2)))]
+    num_completed = 0
+    for async_result, index, result in context.interface.as_completed(pending):
+        print('index: %i; %s' % (index, result))
+        num_completed += 1
+    if num_completed != end1 - start1 or pending[0].get() is None:
+        raise RuntimeError('as_completed returned %i / %i results' % (num_completed, end1 - start1))
+    print('\n: as_completed took %.1f s\n' % (time.time() - time_stamp))
+    sys.stdout.flush()
+    time.sleep(1.)
+
+    time_stamp = time.time()
+    end3 = start1 + 4 * int(context.interface.global_size)
+    print(': context.interface.cancel(\'cancel_test\') after first result of '
+          'context.interface.map_async(test, range(%i, %i), range(%i, %i), tag=\'cancel_test\')' %
+          (start1, end3, start1, end3))
+    pending = [context.interface.map_async(test, list(range(start1, end3)), list(range(start1, end3)),
+                                           tag='cancel_test')]
+    completed = context.interface.wait_any(pending)
+    context.interface.cancel('cancel_test')
+    num_completed = len(completed) + len(list(context.interface.as_completed(pending)))
+    if pending[0].pending():
+        raise RuntimeError('cancel: %i / %i results returned after cancel' % (num_completed, end3 - start1))
+    print('\n: %i / %i jobs returned before cancel took effect; took %.1f s\n' %
+          (num_completed, end3 - start1, time.time() - time_stamp))
+    sys.stdout.flush()
+    time.sleep(1.)
+
+    if hasattr(context.interface, 'task_durations'):
+        time_stamp = time.time()
+        print(': get_worker_speeds(context.interface) after context.interface.map_sync(test, range(%i, %i), '
+              'range(%i, %i), chunksize=1), repeated twice' % (start1, end3, start1, end3))
+        for i in range(2):
+            context.interface.map_sync(test, list(range(start1, end3)), list(range(start1, end3)), chunksize=1)
+        worker_speeds = get_worker_speeds(context.interface)
+        pprint.pprint(worker_speeds)
+        if not worker_speeds:
+            raise RuntimeError('get_worker_speeds: no worker speeds were measured from chunked jobs')
+        print('\n: measured the speed of %i / %i workers; took %.1f s\n' %
+              (len(worker_speeds), context.interface.num_workers, time.time() - time_stamp))
+        sys.stdout.flush()
+        time.sleep(1.)
+
+    time_stamp = time.time()
+    print(': context.interface.map_sync(test, range(%i, %i), [handle.item(i) for i in range(%i, %i)]), where handle = '
+          'context.interface.put(range(%i, %i))' % (start1, end1, start1, end1, start2, end2))
+    handle = context.interface.put(list(range(start2, end2)))
+    result8 = context.interface.map_sync(test, list(range(start1, end1)),
+                                         [handle.item(i) for i in range(end1 - start1)])
+    pprint.pprint(result8)
+    if any('args: %s,' % str([first, second, None]) not in result
+           for first, second, result in zip(range(start1, end1), range(start2, end2), result8)):
+        raise RuntimeError('put: ObjectHandle arguments were not resolved to the stored objects')
+    context.interface.release(handle)
+    print('\n: put and map_sync took %.1f s\n' % (time.time() - time_stamp))
+    sys.stdout.flush()
+    time.sleep(1.)
+
     time_stamp = time.time()
     print(': context.interface.apply(test, 1, 2, third=3)')
     pprint.pprint(context.interface.apply(test, 1, 2, third=3))